@@ -0,0 +1,140 @@
+"""
+Bulk admin edits: one MERGE vs one `update` per plugin.
+
+Uses the fake Databricks connector from bench_databricks_pool.py (SQLite
+table, MERGE rewritten to UPDATE ... FROM) with `--statement-ms` of latency
+per statement, the Databricks round trip that dominates admin edits. For a
+batch of `--batch` reorders/rewords it checks that `update_many`:
+  - issues exactly one MERGE and one SELECT,
+  - bumps the registry version once,
+  - leaves table, Redis cache and snapshot agreeing,
+  - keeps fields that were not sent and rejects a batch with a missing plugin,
+and prints the time for the batch against N single updates.
+
+Run from compass/backend:
+    python benchmarks/bench_bulk_update.py [--batch 50] [--statement-ms 80]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_databricks_pool import FakeConnector, check  # noqa: E402
+from bench_registry_sync import BACKEND_SRC, TABLE, MemoryRedis, create_table, make_row  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=500, help="plugins in the table")
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--statement-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-bulk-"))
+    placeholder = workdir / "plugins.json"
+    placeholder.write_text('{"plugins": []}', encoding="utf-8")
+    os.environ.update(
+        {"COMPASS_ENV": "DEV", "PLUGIN_REGISTRY_SOURCE": "local", "PLUGIN_REGISTRY_LOCAL_FILE": str(placeholder)}
+    )
+    sys.path.insert(0, str(BACKEND_SRC))
+
+    from db.databricks_pool import DatabricksConnectionPool
+    from plugin_registry.models import PluginBulkUpdate, PluginUpdate
+    from plugin_registry.registry import VERSION_KEY, PluginRegistry
+
+    db_path = workdir / "registry.db"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    create_table(conn)
+    rows = [make_row(index) for index in range(args.size)]
+    columns = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO {TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row[column] for column in columns) for row in rows],
+    )
+
+    connector = FakeConnector(db_path, handshake_seconds=0, statement_seconds=args.statement_ms / 1000)
+    cache = MemoryRedis()
+    registry = PluginRegistry(
+        source="databricks",
+        table_name=TABLE,
+        redis_client=cache,
+        pool=DatabricksConnectionPool(connector),
+    )
+    registry.sync()
+
+    targets = rows[: args.batch]
+    print(f"{args.batch} plugin edits, {args.statement_ms:.0f} ms per Databricks statement")
+
+    started = time.perf_counter()
+    for index, row in enumerate(targets):
+        registry.update(row["workspace_id"], row["plugin_id"], PluginUpdate(plugin_name=f"Single {index}"))
+    single_seconds = time.perf_counter() - started
+
+    bulk = PluginBulkUpdate.model_validate(
+        {
+            "updates": [
+                # Reverse the order inside each workspace; reword every other plugin.
+                {
+                    "workspace_id": row["workspace_id"],
+                    "plugin_id": row["plugin_id"],
+                    "position": 26 - row["position"],
+                    **({"description": f"Reworded {index}"} if index % 2 == 0 else {}),
+                }
+                for index, row in enumerate(targets)
+            ]
+        }
+    )
+    connector.statements.clear()
+    version_before = int(cache.get(VERSION_KEY))
+    started = time.perf_counter()
+    records = registry.update_many(bulk.updates, updated_by="bench@example.com")
+    bulk_seconds = time.perf_counter() - started
+
+    statements = [query.split()[0] for query in connector.statements]
+    check(statements == ["MERGE", "SELECT"], f"bulk update ran {statements}")
+    check(int(cache.get(VERSION_KEY)) == version_before + 1, "registry version bumped once")
+    check([(r.workspace_id, r.plugin_id) for r in records] == [(i.workspace_id, i.plugin_id) for i in bulk.updates],
+          "records returned in request order")
+
+    table = {
+        (ws, plugin): (name, description, position, updated_by)
+        for ws, plugin, name, description, position, updated_by in conn.execute(
+            f"SELECT workspace_id, plugin_id, plugin_name, description, position, updated_by FROM {TABLE}"
+        )
+    }
+    snapshot = {
+        (p.workspace_id, p.plugin_id): (p.plugin_name, p.description, p.position, p.updated_by)
+        for p in registry.get_all()
+    }
+    check(snapshot == table, f"snapshot (from the Redis cache) matches the table")
+    for index, (item, row) in enumerate(zip(bulk.updates, targets)):
+        name, description, position, updated_by = table[(item.workspace_id, item.plugin_id)]
+        expected_description = f"Reworded {index}" if index % 2 == 0 else row["description"]
+        if (name, description, position, updated_by) != (
+            f"Single {index}", expected_description, 26 - row["position"], "bench@example.com"
+        ):
+            raise AssertionError(f"unexpected row for {item.plugin_id}: {table[(item.workspace_id, item.plugin_id)]}")
+    print("  ok  unsent fields kept, sent fields applied")
+
+    bad = PluginBulkUpdate.model_validate(
+        {"updates": [{"workspace_id": targets[0]["workspace_id"], "plugin_id": targets[0]["plugin_id"], "position": 1},
+                     {"workspace_id": "nope", "plugin_id": "missing", "position": 1}]}
+    )
+    connector.statements.clear()
+    try:
+        registry.update_many(bad.updates, updated_by="bench@example.com")
+    except LookupError:
+        pass
+    check(connector.statements == [], "batch with a missing plugin is rejected before any write")
+
+    print(f"\n{args.batch} single updates: {single_seconds * 1000:.0f} ms; one bulk update: {bulk_seconds * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
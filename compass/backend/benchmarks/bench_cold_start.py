@@ -0,0 +1,298 @@
+"""
+Hub cold start: module import time, startup warm-up and first-request latency.
+
+Three parts:
+  1. imports  `import main` in fresh interpreters (median of `--import-runs`)
+              and checks that heavy modules stay out of it: the
+              `databricks.sql` client (paid by warm-up instead) and the
+              /debug profiling router (only imported when mounted).
+  2. registry a worker registry (Databricks source, fake connector with
+              `--handshake-ms` per connect, cache already filled by another
+              worker): first read and first admin write, without and with
+              `HubWarmup.run()` beforehand.
+  3. http     the Hub under uvicorn in a fresh process (local registry,
+              simulated plugin service), with HUB_WARMUP_ENABLED off and on:
+              time to /ready, first /plugins/ and first two chat turns.
+
+Run from compass/backend:
+    python benchmarks/bench_cold_start.py [--import-runs 5] [--handshake-ms 300] \\
+        [--import-budget-ms 1500]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_databricks_pool import FakeConnector, check  # noqa: E402
+from bench_registry_sync import BACKEND_SRC, TABLE, MemoryRedis, create_table, make_row  # noqa: E402
+
+HEAVY_MODULES = ("databricks.sql.client", "routers.debug_routes", "observability.profiling")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+DATABRICKS_PROBE = """
+import json, time
+started = time.perf_counter()
+try:
+    import databricks.sql.client
+except ImportError:
+    print("null")
+else:
+    print(json.dumps(time.perf_counter() - started))
+"""
+
+
+def local_env(workdir: Path, **extra: str) -> dict[str, str]:
+    placeholder = workdir / "plugins.json"
+    if not placeholder.exists():
+        placeholder.write_text('{"plugins": []}', encoding="utf-8")
+    return {
+        **os.environ,
+        "COMPASS_ENV": "DEV",
+        "PLUGIN_REGISTRY_SOURCE": "local",
+        "PLUGIN_REGISTRY_LOCAL_FILE": str(placeholder),
+        **extra,
+    }
+
+
+def run_probe(code: str, env: dict[str, str]):
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_SRC, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# ==========================================================================
+# 1. Import time
+# ==========================================================================
+
+
+def bench_imports(args: argparse.Namespace, workdir: Path) -> None:
+    print(f"imports ({args.import_runs} fresh interpreters)")
+    env = local_env(workdir)
+    samples = [run_probe(IMPORT_PROBE, env) for _ in range(args.import_runs)]
+    median_ms = statistics.median(sample["seconds"] for sample in samples) * 1000
+    print(f"      import main: median {median_ms:.0f} ms")
+
+    loaded = sorted({name for sample in samples for name in sample["loaded"]})
+    check(not loaded, f"import main leaves out {', '.join(HEAVY_MODULES)}" + (f" (loaded: {loaded})" if loaded else ""))
+    if args.import_budget_ms is not None:
+        check(median_ms <= args.import_budget_ms, f"import main within {args.import_budget_ms:.0f} ms budget")
+
+    client_seconds = run_probe(DATABRICKS_PROBE, env)
+    if client_seconds is not None:
+        print(f"      databricks.sql.client import: {client_seconds * 1000:.0f} ms (paid by warm-up, off the request path)")
+
+
+# ==========================================================================
+# 2. Registry warm-up
+# ==========================================================================
+
+
+def bench_registry(args: argparse.Namespace, workdir: Path) -> None:
+    os.environ.update(local_env(workdir))
+    sys.path.insert(0, str(BACKEND_SRC))
+
+    from load_test import InMemorySessionStore
+
+    import routers.auth
+    from db.databricks_pool import DatabricksConnectionPool
+    from plugin_registry.models import PluginUpdate
+    from plugin_registry.refresher import RegistryRefresher
+    from plugin_registry.registry import PluginRegistry
+    from warmup import HubWarmup
+
+    routers.auth.session_db = InMemorySessionStore()
+
+    db_path = workdir / "registry.db"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    create_table(conn)
+    rows = [make_row(index) for index in range(args.size)]
+    columns = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO {TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row[column] for column in columns) for row in rows],
+    )
+
+    connector = FakeConnector(db_path, handshake_seconds=args.handshake_ms / 1000)
+    cache = MemoryRedis()
+
+    def worker() -> PluginRegistry:
+        return PluginRegistry(
+            source="databricks",
+            table_name=TABLE,
+            redis_client=cache,
+            pool=DatabricksConnectionPool(connector),
+        )
+
+    worker().sync()  # another worker already filled the shared cache
+
+    def first_requests(registry: PluginRegistry) -> tuple[float, float, int]:
+        started = time.perf_counter()
+        registry.get_grouped()
+        read = time.perf_counter() - started
+        opened = connector.opened
+        started = time.perf_counter()
+        registry.update(rows[0]["workspace_id"], rows[0]["plugin_id"], PluginUpdate(description="edited"))
+        return read, time.perf_counter() - started, connector.opened - opened
+
+    print(f"\nregistry ({args.size} plugins, {args.handshake_ms:.0f} ms Databricks handshake)")
+    cold_read, cold_write, _ = first_requests(worker())
+
+    warm = worker()
+    started = time.perf_counter()
+    warmup = HubWarmup(warm, RegistryRefresher(warm))
+    asyncio.run(warmup.run())
+    warmup_seconds = time.perf_counter() - started
+    steps = {name: step["state"] for name, step in warmup.status()["steps"].items()}
+    check(warmup.ready, f"warm-up ready in {warmup_seconds * 1000:.0f} ms: {steps}")
+    warm_read, warm_write, opened = first_requests(warm)
+    check(opened == 0, "first admin write after warm-up reuses the pre-opened connection")
+
+    print(f"      first read:  {cold_read * 1000:7.1f} ms cold, {warm_read * 1000:7.1f} ms warm")
+    print(f"      first write: {cold_write * 1000:7.1f} ms cold, {warm_write * 1000:7.1f} ms warm")
+
+
+# ==========================================================================
+# 3. First requests over HTTP (child process per mode)
+# ==========================================================================
+
+
+def run_child(mode: str) -> None:
+    """Start the Hub in this process and print first-request timings as JSON."""
+    import httpx
+
+    from load_test import (
+        SERVICE_KEY,
+        InMemorySessionStore,
+        PLUGIN_ID,
+        WORKSPACE_ID,
+        bearer_token,
+        build_plugin_service,
+        free_port,
+        serve_in_thread,
+        write_registry,
+    )
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-cold-"))
+    registry_file, services_file = write_registry(workdir)
+    service_port, hub_port = free_port(), free_port()
+    os.environ.update(
+        {
+            "COMPASS_ENV": "DEV",
+            "PLUGIN_REGISTRY_SOURCE": "local",
+            "PLUGIN_REGISTRY_LOCAL_FILE": str(registry_file),
+            "PLUGIN_SERVICES_LOCAL_FILE": str(services_file),
+            f"SERVICE_URL_{SERVICE_KEY.upper()}": f"http://127.0.0.1:{service_port}",
+            "HUB_WARMUP_ENABLED": "true" if mode == "warm" else "false",
+        }
+    )
+    sys.path.insert(0, str(BACKEND_SRC))
+
+    started = time.perf_counter()
+    import main as hub_main  # noqa: E402 - settings read the environment at import
+    import routers.auth
+    import routers.plugin_routes
+
+    import_seconds = time.perf_counter() - started
+    routers.auth.session_db = InMemorySessionStore()
+    routers.plugin_routes.session_db = InMemorySessionStore()
+
+    service = build_plugin_service(ttft_seconds=0, tokens=3, tokens_per_sec=0, frame_bytes=8, error_rate=0)
+    serve_in_thread(service, service_port, "plugin-service")
+    started = time.perf_counter()
+    serve_in_thread(hub_main.app, hub_port, "hub")
+
+    headers = {"Authorization": bearer_token("coldstart@example.com")}
+    result: dict = {"import_ms": import_seconds * 1000}
+    with httpx.Client(base_url=f"http://127.0.0.1:{hub_port}", timeout=30, trust_env=False) as client:
+        while True:
+            ready = client.get("/ready")
+            if ready.status_code == 200:
+                break
+            time.sleep(0.005)
+        result["ready_ms"] = (time.perf_counter() - started) * 1000
+        result["ready"] = ready.json()
+
+        started = time.perf_counter()
+        client.get("/plugins/", headers=headers).raise_for_status()
+        result["first_menu_ms"] = (time.perf_counter() - started) * 1000
+
+        for turn in ("first_chat_ttff_ms", "second_chat_ttff_ms"):
+            body = {
+                "workspace": WORKSPACE_ID,
+                "plugin": PLUGIN_ID,
+                "conversation": [{"role": "user", "content": turn}],
+            }
+            started = time.perf_counter()
+            with client.stream("POST", "/chats/new/stream", json=body, headers=headers) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line and turn not in result:
+                        result[turn] = (time.perf_counter() - started) * 1000
+
+    print(json.dumps(result))
+
+
+def bench_http(args: argparse.Namespace) -> None:
+    print(f"\nhttp (fresh Hub process per mode, median of {args.http_runs})")
+    runs: dict[str, list[dict]] = {"cold": [], "warm": []}
+    for _ in range(args.http_runs):
+        for mode in runs:
+            child = subprocess.run(
+                [sys.executable, __file__, "--child", mode], capture_output=True, text=True, check=True
+            )
+            runs[mode].append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    warm_steps = runs["warm"][-1]["ready"]["steps"]
+    check(all(step["state"] in {"ok", "skipped"} for step in warm_steps.values()),
+          f"/ready 200 after warm-up: { {name: step['state'] for name, step in warm_steps.items()} }")
+    check(warm_steps["upstream"].get("detail", {}).get("reachable") == 1, "plugin service connection opened during warm-up")
+
+    print(f"      {'':22}{'cold':>9}{'warm':>9}")
+    for key in ("ready_ms", "first_menu_ms", "first_chat_ttff_ms", "second_chat_ttff_ms"):
+        cold = statistics.median(run[key] for run in runs["cold"])
+        warm = statistics.median(run[key] for run in runs["warm"])
+        print(f"      {key:<22}{cold:9.1f}{warm:9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--import-runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=None, help="fail if median import is slower")
+    parser.add_argument("--size", type=int, default=2000, help="plugins in the registry table")
+    parser.add_argument("--handshake-ms", type=float, default=300.0)
+    parser.add_argument("--http-runs", type=int, default=3)
+    parser.add_argument("--child", choices=("cold", "warm"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-cold-"))
+    bench_imports(args, workdir)
+    bench_registry(args, workdir)
+    bench_http(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Databricks connection pool: handshake savings and failure handling.
+
+A fake connector stands in for `databricks.sql.connect`: every connect
+sleeps `--handshake-ms` (the HTTP session setup the pool avoids), queries
+run against a shared SQLite table (MERGE is rewritten to SQLite's
+UPDATE ... FROM), and connections can be killed server-side to simulate
+expired sessions. The script checks that:
+  - an admin `update` (UPDATE + re-read) pays the handshake once, then never,
+  - a call on a killed connection is retried once on a fresh connection,
+  - idle connections past the health-check age are probed and replaced,
+  - connections past max lifetime or max idle are closed,
+  - concurrent callers never hold more than `max_size` connections,
+and prints per-update latency without and with pooling.
+
+Run from compass/backend:
+    python benchmarks/bench_databricks_pool.py [--handshake-ms 150] [--updates 20]
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_registry_sync import BACKEND_SRC, TABLE, MemoryRedis, create_table, make_row  # noqa: E402
+
+
+# ==========================================================================
+# Fake connector
+# ==========================================================================
+
+MERGE_PATTERN = re.compile(
+    r"MERGE INTO (?P<table>\S+) AS t\s+USING \(VALUES (?P<values>.*?)\)\s+AS s\((?P<columns>[^)]*)\)"
+    r"\s+ON (?P<on>.*?)\s+WHEN MATCHED THEN UPDATE SET (?P<set>.*)",
+    re.DOTALL,
+)
+
+
+def merge_to_sqlite(query: str) -> str:
+    """Rewrite the registry's `MERGE ... WHEN MATCHED THEN UPDATE` into SQLite; params keep their order."""
+    match = MERGE_PATTERN.search(query)
+    if match is None:
+        return query
+    return (
+        f"WITH s({match['columns']}) AS (VALUES {match['values']}) "
+        f"UPDATE {match['table']} AS t SET {match['set'].strip()} FROM s WHERE {match['on']}"
+    )
+
+
+
+class FakeConnector:
+    """Callable like `databricks.sql.connect`; tracks opened/open connections."""
+
+    def __init__(self, path: Path, handshake_seconds: float, statement_seconds: float = 0.0) -> None:
+        self.path = path
+        self.handshake_seconds = handshake_seconds
+        self.statement_seconds = statement_seconds
+        self.statements: list[str] = []
+        self.down = False  # refuse new connections, e.g. a stopped warehouse
+        self.opened = 0
+        self.open_now = 0
+        self.max_open = 0
+        self.connections: list["FakeConnection"] = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> "FakeConnection":
+        if self.down:
+            raise ConnectionError("warehouse is not running")
+        time.sleep(self.handshake_seconds)
+        connection = FakeConnection(self)
+        with self._lock:
+            self.opened += 1
+            self.open_now += 1
+            self.max_open = max(self.max_open, self.open_now)
+            self.connections.append(connection)
+        return connection
+
+    def kill_all(self) -> None:
+        """Expire every session server-side, as a Databricks warehouse restart would."""
+        for connection in self.connections:
+            connection.killed = True
+
+    def closed(self, connection: "FakeConnection") -> None:
+        with self._lock:
+            self.open_now -= 1
+
+
+class FakeConnection:
+    def __init__(self, connector: FakeConnector) -> None:
+        self.connector = connector
+        self.killed = False
+        self.closed = False
+        self._db = sqlite3.connect(connector.path, check_same_thread=False)
+
+    def cursor(self) -> "FakeCursor":
+        if self.closed:
+            raise ConnectionError("connection already closed")
+        return FakeCursor(self)
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._db.close()
+            self.connector.closed(self)
+
+
+class FakeCursor:
+    def __init__(self, connection: FakeConnection) -> None:
+        self._connection = connection
+        self._cursor = connection._db.cursor()
+
+    @property
+    def description(self) -> Any:
+        return self._cursor.description
+
+    def execute(self, query: str, params: Any = ()) -> None:
+        if self._connection.killed:
+            raise ConnectionError("Invalid SessionHandle: session expired")
+        connector = self._connection.connector
+        connector.statements.append(query)
+        time.sleep(connector.statement_seconds)
+        self._cursor.execute(merge_to_sqlite(query), params)
+
+    def fetchall(self) -> list[tuple]:
+        return self._cursor.fetchall()
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+# ==========================================================================
+# Scenarios
+# ==========================================================================
+
+
+def events() -> dict[str, float]:
+    from observability.metrics import databricks_pool_events_total
+
+    return {key[0]: child.value for key, child in databricks_pool_events_total._children.items()}
+
+
+def event_delta(before: dict[str, float], name: str) -> float:
+    return events().get(name, 0) - before.get(name, 0)
+
+
+def check(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+    print(f"  ok  {message}")
+
+
+def make_registry(connector: FakeConnector, **pool_options: Any):
+    from db.databricks_pool import DatabricksConnectionPool
+    from plugin_registry.registry import PluginRegistry
+
+    registry = PluginRegistry(
+        source="databricks",
+        table_name=TABLE,
+        redis_client=MemoryRedis(),
+        pool=DatabricksConnectionPool(connector, **pool_options),
+    )
+    registry.sync()
+    return registry
+
+
+def time_updates(registry: Any, count: int) -> list[float]:
+    from plugin_registry.models import PluginUpdate
+
+    samples = []
+    for index in range(count):
+        started = time.perf_counter()
+        registry.update(make_row(index)["workspace_id"], f"plugin_{index:06d}", PluginUpdate(description=f"v{index}"))
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--handshake-ms", type=float, default=150.0)
+    parser.add_argument("--size", type=int, default=200, help="plugins in the table")
+    parser.add_argument("--updates", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-pool-"))
+    placeholder = workdir / "plugins.json"
+    placeholder.write_text('{"plugins": []}', encoding="utf-8")
+    os.environ.update(
+        {"COMPASS_ENV": "DEV", "PLUGIN_REGISTRY_SOURCE": "local", "PLUGIN_REGISTRY_LOCAL_FILE": str(placeholder)}
+    )
+    sys.path.insert(0, str(BACKEND_SRC))
+
+    db_path = workdir / "registry.db"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    create_table(conn)
+    rows = [make_row(index) for index in range(args.size)]
+    columns = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO {TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row[column] for column in columns) for row in rows],
+    )
+    handshake = args.handshake_ms / 1000
+
+    print(f"handshake {args.handshake_ms:.0f} ms, {args.updates} admin updates")
+
+    # max_idle_seconds=0 closes every connection on release: the old connect-per-call behaviour.
+    unpooled = FakeConnector(db_path, handshake)
+    unpooled_times = time_updates(make_registry(unpooled, max_idle_seconds=0), args.updates)
+
+    pooled = FakeConnector(db_path, handshake)
+    registry = make_registry(pooled)
+    pooled_times = time_updates(registry, args.updates)
+    check(pooled.opened == 1, f"pooled updates opened {pooled.opened} connection(s) (unpooled: {unpooled.opened})")
+
+    before = events()
+    pooled.kill_all()
+    time_updates(registry, 1)
+    check(event_delta(before, "retried") == 1 and event_delta(before, "closed_stale") == 1,
+          "killed session is discarded and the call retried on a fresh connection")
+
+    probe = FakeConnector(db_path, 0)
+    probed = make_registry(probe, health_check_after_seconds=0.05)
+    time.sleep(0.1)
+    probe.kill_all()
+    before = events()
+    probed.get_all()
+    probed.sync(full=True)
+    check(event_delta(before, "closed_unhealthy") == 1 and event_delta(before, "retried") == 0,
+          "idle connection past the health-check age fails SELECT 1 and is replaced before use")
+
+    aging = FakeConnector(db_path, 0)
+    aged = make_registry(aging, max_lifetime_seconds=0.05)
+    idler = make_registry(aging, max_idle_seconds=0.05)
+    time.sleep(0.1)
+    before = events()
+    aged.sync(full=True)
+    check(event_delta(before, "closed_lifetime") == 1, "connection past max lifetime is closed on checkout")
+    idler.sync(full=True)
+    check(event_delta(before, "closed_idle") == 1, "connection idle past max idle is closed on checkout")
+
+    bounded = FakeConnector(db_path, 0.02)
+    limited = make_registry(bounded, max_size=2)
+    threads = [threading.Thread(target=lambda: limited.sync(full=True)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check(bounded.max_open <= 2, f"8 concurrent syncs held at most {bounded.max_open} connections (max_size 2)")
+    print(f"      pool after load: {limited.pool_stats()}")
+
+    unpooled_ms = statistics.median(unpooled_times) * 1000
+    pooled_ms = statistics.median(pooled_times) * 1000
+    print(f"\nmedian admin update: {unpooled_ms:.1f} ms without pooling, {pooled_ms:.1f} ms pooled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Contract v1 (NDJSON) vs v2 (length-prefixed MessagePack) framing benchmark.
+
+Simulates a 1,000-token answer (one `llm` frame per token plus citations) and
+reports, per answer:
+  - plugin service CPU to encode frames
+  - Hub CPU to decode upstream frames and emit browser NDJSON
+  - bytes on the Hub <-> plugin service wire
+
+Run from compass/backend:
+    python benchmarks/bench_frame_codec.py [--tokens 1000] [--repeat 50] [--json out.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_SRC = Path(__file__).resolve().parents[1] / "src"
+PLUGIN_SERVICE = Path(__file__).resolve().parents[3] / "compass_plugins" / "service"
+sys.path.insert(0, str(BACKEND_SRC))
+sys.path.insert(0, str(PLUGIN_SERVICE))
+
+from app.contracts import CitationFrame, LLMFrame  # noqa: E402
+from schemas.frames import (  # noqa: E402
+    LengthPrefixedFrameDecoder,
+    decode_ndjson_line,
+    encode_ndjson_line,
+)
+
+
+CHUNK_SIZE = 4096
+
+
+def build_frames(tokens: int, citations: int) -> list:
+    frames = [LLMFrame(content=f"token{i % 97} ") for i in range(tokens)]
+    for i in range(citations):
+        frames.append(
+            CitationFrame(
+                content={
+                    "index": i,
+                    "source": f"handbook_{i}.pdf",
+                    "chunk_text": "Lorem ipsum dolor sit amet " * 20,
+                    "preview": "Lorem ipsum dolor sit amet ...",
+                    "similarity": 0.8,
+                }
+            )
+        )
+    return frames
+
+
+def chunked(payload: bytes) -> list[bytes]:
+    return [payload[i:i + CHUNK_SIZE] for i in range(0, len(payload), CHUNK_SIZE)]
+
+
+def encode_v1(frames: list) -> bytes:
+    return b"".join(frame.serialize().encode("utf-8") for frame in frames)
+
+
+def encode_v2(frames: list) -> bytes:
+    return b"".join(frame.serialize_v2() for frame in frames)
+
+
+def hub_v1(chunks: list[bytes]) -> int:
+    # Mirrors httpx aiter_lines + json.loads; lines are forwarded as-is.
+    emitted = 0
+    pending = ""
+    for chunk in chunks:
+        pending += chunk.decode("utf-8")
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            if line:
+                decode_ndjson_line(line)
+                emitted += len(line) + 1
+    return emitted
+
+
+def hub_v2(chunks: list[bytes]) -> int:
+    emitted = 0
+    decoder = LengthPrefixedFrameDecoder()
+    for chunk in chunks:
+        for frame in decoder.feed(chunk):
+            emitted += len(encode_ndjson_line(frame)) + 1
+    decoder.close()
+    return emitted
+
+
+def cpu_ms(fn, arg, repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.process_time() - started) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--citations", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", type=Path, default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    frames = build_frames(args.tokens, args.citations)
+    v1_bytes = encode_v1(frames)
+    v2_bytes = encode_v2(frames)
+    v1_chunks = chunked(v1_bytes)
+    v2_chunks = chunked(v2_bytes)
+
+    results = {
+        "tokens": args.tokens,
+        "citations": args.citations,
+        "repeat": args.repeat,
+        "v1": {
+            "wire_bytes": len(v1_bytes),
+            "service_encode_cpu_ms": cpu_ms(encode_v1, frames, args.repeat),
+            "hub_decode_cpu_ms": cpu_ms(hub_v1, v1_chunks, args.repeat),
+        },
+        "v2": {
+            "wire_bytes": len(v2_bytes),
+            "service_encode_cpu_ms": cpu_ms(encode_v2, frames, args.repeat),
+            "hub_decode_cpu_ms": cpu_ms(hub_v2, v2_chunks, args.repeat),
+        },
+    }
+
+    print(f"{'':<8}{'wire bytes':>12}{'svc encode ms':>16}{'hub decode ms':>16}")
+    for version in ("v1", "v2"):
+        row = results[version]
+        print(
+            f"{version:<8}{row['wire_bytes']:>12}"
+            f"{row['service_encode_cpu_ms']:>16.3f}{row['hub_decode_cpu_ms']:>16.3f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Per-frame cost of the Hub's stream metrics.
+
+Replays the `_pump_stream` loop over a simulated 1,000-token answer twice —
+bare, and with the first-frame/frames/bytes/duration instrumentation — and
+reports the added CPU per stream and per frame. Also times the primitives
+(`Counter.inc`, `Histogram.observe`) and a full `/metrics` render.
+
+Run from compass/backend:
+    python benchmarks/bench_metrics_overhead.py [--tokens 1000] [--repeat 200] [--json out.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_SRC = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(BACKEND_SRC))
+
+from observability.metrics import LATENCY_BUCKETS, SIZE_BUCKETS, MetricsRegistry  # noqa: E402
+from schemas.frames import LLMFrame  # noqa: E402
+
+
+LABELS = ("bench-plugin", "compass_plugins")
+
+
+def build_frames(tokens: int) -> list[str]:
+    return [LLMFrame(content=f"token{i % 97} ").serialize() for i in range(tokens)]
+
+
+def pump_bare(frames: list[str], sink: list[str]) -> None:
+    for frame in frames:
+        sink.append(frame)
+
+
+def make_pump_instrumented(registry: MetricsRegistry):
+    first_frame = registry.histogram("bench_first_frame_seconds", "", ("plugin_id", "service_key"), LATENCY_BUCKETS)
+    duration = registry.histogram("bench_duration_seconds", "", ("plugin_id", "service_key"), LATENCY_BUCKETS)
+    frame_hist = registry.histogram("bench_frames", "", ("plugin_id", "service_key"), SIZE_BUCKETS)
+    byte_hist = registry.histogram("bench_bytes", "", ("plugin_id", "service_key"), SIZE_BUCKETS)
+
+    def pump(frames: list[str], sink: list[str]) -> None:
+        started = time.perf_counter()
+        frame_count = 0
+        byte_count = 0
+        for frame in frames:
+            if frame_count == 0:
+                first_frame.labels(*LABELS).observe(time.perf_counter() - started)
+            frame_count += 1
+            byte_count += len(frame.encode("utf-8"))
+            sink.append(frame)
+        duration.labels(*LABELS).observe(time.perf_counter() - started)
+        frame_hist.labels(*LABELS).observe(frame_count)
+        byte_hist.labels(*LABELS).observe(byte_count)
+
+    return pump
+
+
+def cpu_ns(fn, args: tuple, repeat: int) -> float:
+    fn(*args)  # warm-up
+    started = time.process_time_ns()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.process_time_ns() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", type=Path, default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    frames = build_frames(args.tokens)
+    registry = MetricsRegistry()
+    pump_instrumented = make_pump_instrumented(registry)
+
+    counter = registry.counter("bench_total", "", ("plugin_id", "service_key"))
+    histogram = registry.histogram("bench_seconds", "", ("plugin_id", "service_key"), LATENCY_BUCKETS)
+    primitive_repeat = args.repeat * 100
+
+    bare_ns = cpu_ns(lambda: pump_bare(frames, []), (), args.repeat)
+    instrumented_ns = cpu_ns(lambda: pump_instrumented(frames, []), (), args.repeat)
+    results = {
+        "tokens": args.tokens,
+        "repeat": args.repeat,
+        "pump_bare_us": bare_ns / 1000,
+        "pump_instrumented_us": instrumented_ns / 1000,
+        "overhead_per_stream_us": (instrumented_ns - bare_ns) / 1000,
+        "overhead_per_frame_ns": (instrumented_ns - bare_ns) / args.tokens,
+        "counter_inc_ns": cpu_ns(lambda: counter.labels(*LABELS).inc(), (), primitive_repeat),
+        "histogram_observe_ns": cpu_ns(lambda: histogram.labels(*LABELS).observe(0.123), (), primitive_repeat),
+        "render_us": cpu_ns(registry.render, (), args.repeat) / 1000,
+    }
+
+    for key, value in results.items():
+        print(f"{key:<28}{value:>14.3f}" if isinstance(value, float) else f"{key:<28}{value:>14}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Plugin service bulkheads: a CPU-heavy plugin next to a light one.
+
+Drives the plugin service's PluginDispatcher (no HTTP) with two synthetic
+handlers on one event loop:
+  - heavy: builds a large context per request (`--cpu-ms` of pure-Python
+    work through `run_stage`), max_concurrency `--heavy-concurrency`
+  - light: async-only, streams a few frames
+
+`--heavy` requests and `--light` requests start together; the heavy
+handler's execution mode is varied (event_loop, thread, process) and the
+light plugin's per-request latency is reported. It also checks that the
+heavy plugin never exceeds its concurrency, that a full queue is rejected
+as PLUGIN_BUSY, and that the per-plugin metrics are recorded.
+
+Run from compass/backend:
+    python benchmarks/bench_plugin_bulkheads.py [--cpu-ms 40] [--heavy 16] [--light 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import AsyncGenerator
+
+PLUGIN_SERVICE = Path(__file__).resolve().parents[3] / "compass_plugins" / "service"
+sys.path.insert(0, str(PLUGIN_SERVICE))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.contracts import BaseFrame, ErrorFrame, LLMFrame, PluginServiceRequest  # noqa: E402
+from app.dispatcher import PluginDispatcher  # noqa: E402
+from app.metrics import plugin_queue_wait_seconds, plugin_rejected_total  # noqa: E402
+from app.plugins.base import ExecutionProfile, PluginHandler  # noqa: E402
+from bench_databricks_pool import check  # noqa: E402
+
+
+def build_context(cpu_ms: float) -> int:
+    """Pure-Python stand-in for context building / parsing (holds the GIL)."""
+    deadline = time.process_time() + cpu_ms / 1000
+    total = 0
+    while time.process_time() < deadline:
+        total += sum(len(str(i)) for i in range(1000))
+    return total
+
+
+class HeavyHandler(PluginHandler):
+    def __init__(self, profile: ExecutionProfile, cpu_ms: float) -> None:
+        self.execution_profile = profile
+        self._cpu_ms = cpu_ms
+        self.active = 0
+        self.peak = 0
+
+    @property
+    def plugin_ids(self) -> set[str]:
+        return {"heavy"}
+
+    async def stream(self, request: PluginServiceRequest) -> AsyncGenerator[BaseFrame, None]:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            size = await self.run_stage(build_context, self._cpu_ms)
+            yield LLMFrame(content=str(size))
+        finally:
+            self.active -= 1
+
+
+class LightHandler(PluginHandler):
+    execution_profile = ExecutionProfile(max_concurrency=64, max_queue=1000)
+
+    @property
+    def plugin_ids(self) -> set[str]:
+        return {"light"}
+
+    async def stream(self, request: PluginServiceRequest) -> AsyncGenerator[BaseFrame, None]:
+        for index in range(3):
+            await asyncio.sleep(0.001)
+            yield LLMFrame(content=f"t{index} ")
+
+
+def make_request(plugin_id: str, index: int) -> PluginServiceRequest:
+    return PluginServiceRequest(
+        request_id=f"{plugin_id}-{index}",
+        plugin_id=plugin_id,
+        workspace_id="ws",
+        conversation_id="c",
+        user_email="bench@example.com",
+        roles=[],
+        conversation=[{"role": "user", "content": "hello"}],
+        user_inputs=[],
+        instructions="",
+        conversation_seed=[],
+        user_inputs_schema=[],
+    )
+
+
+async def consume(dispatcher: PluginDispatcher, request: PluginServiceRequest) -> tuple[float, list[BaseFrame]]:
+    started = time.perf_counter()
+    frames = [frame async for frame in dispatcher.stream(request)]
+    return time.perf_counter() - started, frames
+
+
+async def run_mode(args: argparse.Namespace, mode: str) -> dict:
+    heavy = HeavyHandler(ExecutionProfile(mode=mode, max_concurrency=args.heavy_concurrency, max_queue=1000), args.cpu_ms)
+    dispatcher = PluginDispatcher([heavy, LightHandler()])
+    try:
+        # Process pools spawn their workers on first use; keep that out of the timing.
+        await consume(dispatcher, make_request("heavy", -1))
+        heavy.peak = 0
+
+        async def light_after(delay: float, index: int):
+            await asyncio.sleep(delay)
+            return await consume(dispatcher, make_request("light", index))
+
+        started = time.perf_counter()
+        heavy_tasks = [asyncio.create_task(consume(dispatcher, make_request("heavy", i))) for i in range(args.heavy)]
+        # Light requests arrive spread over the heavy burst.
+        spread = args.cpu_ms / 1000 * args.heavy / 2
+        light = await asyncio.gather(*(light_after(spread * i / args.light, i) for i in range(args.light)))
+        await asyncio.gather(*heavy_tasks)
+        wall = time.perf_counter() - started
+    finally:
+        dispatcher.shutdown()
+
+    latencies = sorted(seconds * 1000 for seconds, _ in light)
+    return {
+        "light_p50": statistics.median(latencies),
+        "light_p95": latencies[int(len(latencies) * 0.95) - 1],
+        "light_max": latencies[-1],
+        "wall": wall,
+        "peak": heavy.peak,
+    }
+
+
+async def check_rejection() -> None:
+    heavy = HeavyHandler(ExecutionProfile(mode="thread", max_concurrency=1, max_queue=1, queue_timeout_seconds=30), 50)
+    dispatcher = PluginDispatcher([heavy])
+    try:
+        first = asyncio.create_task(consume(dispatcher, make_request("heavy", 0)))
+        queued = asyncio.create_task(consume(dispatcher, make_request("heavy", 1)))
+        await asyncio.sleep(0.01)
+        _, frames = await consume(dispatcher, make_request("heavy", 2))
+        rejected = isinstance(frames[0], ErrorFrame) and frames[0].content["code"] == "PLUGIN_BUSY"
+        check(rejected and frames[0].content["retryable"], "full queue rejects with a retryable PLUGIN_BUSY frame")
+        await asyncio.gather(first, queued)
+        check(dispatcher.check_capacity("heavy") is None, "capacity frees up once the queue drains")
+    finally:
+        dispatcher.shutdown()
+
+    timed = PluginDispatcher([HeavyHandler(ExecutionProfile(mode="thread", max_concurrency=1, queue_timeout_seconds=0.02), 100)])
+    try:
+        slow = asyncio.create_task(consume(timed, make_request("heavy", 0)))
+        await asyncio.sleep(0.01)
+        _, frames = await consume(timed, make_request("heavy", 1))
+        check(frames[0].content.get("details", {}).get("reason") == "queue_timeout", "a wait past queue_timeout_seconds is rejected")
+        await slow
+    finally:
+        timed.shutdown()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    print(f"{args.heavy} heavy ({args.cpu_ms:.0f} ms CPU, concurrency {args.heavy_concurrency}) + {args.light} light requests")
+    print(f"      {'heavy mode':<12}{'light p50 ms':>13}{'p95 ms':>9}{'max ms':>9}{'wall s':>8}{'peak':>6}")
+    results = {}
+    for mode in ("event_loop", "thread", "process"):
+        results[mode] = result = await run_mode(args, mode)
+        print(f"      {mode:<12}{result['light_p50']:13.1f}{result['light_p95']:9.1f}"
+              f"{result['light_max']:9.1f}{result['wall']:8.2f}{result['peak']:6d}")
+
+    check(all(result["peak"] <= args.heavy_concurrency for result in results.values()),
+          f"heavy plugin never ran more than {args.heavy_concurrency} requests at once")
+    check(results["process"]["light_p95"] < results["event_loop"]["light_p95"],
+          "process mode keeps the light plugin's p95 below event_loop mode")
+    await check_rejection()
+    check(plugin_queue_wait_seconds.labels("heavy").count > 0
+          and plugin_rejected_total.labels("heavy", "queue_full").value >= 1,
+          "queue wait and rejections recorded per plugin_id")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cpu-ms", type=float, default=40.0)
+    parser.add_argument("--heavy", type=int, default=16)
+    parser.add_argument("--heavy-concurrency", type=int, default=4)
+    parser.add_argument("--light", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
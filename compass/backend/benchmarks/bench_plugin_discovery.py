@@ -0,0 +1,219 @@
+"""
+Plugin service startup vs number of registered plugins: lazy vs eager handlers.
+
+Generates `--plugins` synthetic handler modules in a temporary directory,
+each with an import cost standing in for its dependencies (`--import-ms` of
+work and a lookup table), and registers them through an installed
+distribution's `compass_plugins.handlers` entry points. For each plugin
+count, fresh processes import app.dispatcher (which builds the dispatcher)
+and report:
+  - startup: time and private memory (USS) after import
+  - first request: one request to a single plugin
+with lazy loading (the default) and eager loading (every handler warmed at
+startup, as when the dispatcher imported them all). Lazy startup should stay
+flat as plugins are added.
+
+In this process it then checks that nothing is imported before a request,
+that plugin_ids sharing a handler share one instance, and that a broken
+handler answers PLUGIN_UNAVAILABLE and fails warm-up.
+
+Run from compass/backend:
+    python benchmarks/bench_plugin_discovery.py [--plugins 10 50 200] [--import-ms 5]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PLUGIN_SERVICE = Path(__file__).resolve().parents[3] / "compass_plugins" / "service"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_databricks_pool import check  # noqa: E402
+from bench_registry_shared import private_mb  # noqa: E402
+
+PACKAGE = "bench_plugins"
+
+HANDLER_MODULE = '''\
+import time
+from typing import AsyncGenerator
+
+from app.contracts import BaseFrame, LLMFrame, PluginServiceRequest
+from app.plugins.base import PluginHandler
+
+# Stand-in for importing the plugin's own dependencies.
+_deadline = time.perf_counter() + {import_ms} / 1000
+while time.perf_counter() < _deadline:
+    pass
+VOCABULARY = {{f"token-{{index}}": index for index in range(20000)}}
+
+
+class Handler(PluginHandler):
+    @property
+    def plugin_ids(self) -> set[str]:
+        return {{"{plugin_id}"}}
+
+    async def stream(self, request: PluginServiceRequest) -> AsyncGenerator[BaseFrame, None]:
+        yield LLMFrame(content=str(len(VOCABULARY)))
+'''
+
+
+def plugin_id(index: int) -> str:
+    return f"bench_plugin_{index:04d}"
+
+
+def write_plugins(root: Path, count: int, import_ms: float) -> None:
+    """A package of `count` handler modules plus a dist-info declaring their entry points."""
+    package = root / PACKAGE
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    for index in range(count):
+        source = HANDLER_MODULE.format(import_ms=import_ms, plugin_id=plugin_id(index))
+        (package / f"plugin_{index:04d}.py").write_text(source)
+
+    dist_info = root / f"{PACKAGE}-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(f"Metadata-Version: 2.1\nName: {PACKAGE}\nVersion: 1.0\n")
+    lines = ["[compass_plugins.handlers]"]
+    lines += [f"{plugin_id(index)} = {PACKAGE}.plugin_{index:04d}:Handler" for index in range(count)]
+    (dist_info / "entry_points.txt").write_text("\n".join(lines) + "\n")
+
+
+def make_request(plugin: str):
+    from app.contracts import PluginServiceRequest
+
+    return PluginServiceRequest(
+        request_id="bench",
+        plugin_id=plugin,
+        workspace_id="ws",
+        conversation_id="c",
+        user_email="bench@example.com",
+        roles=[],
+        conversation=[{"role": "user", "content": "hello"}],
+        user_inputs=[],
+        instructions="",
+        conversation_seed=[],
+        user_inputs_schema=[],
+    )
+
+
+async def first_frames(dispatcher, plugin: str) -> list:
+    return [frame async for frame in dispatcher.stream(make_request(plugin))]
+
+
+def run_child(eager: bool) -> None:
+    """One service start: import the dispatcher, optionally warm every handler, one request."""
+    memory = private_mb()
+    started = time.perf_counter()
+    from app.dispatcher import dispatcher
+
+    if eager:
+        # Only the synthetic plugins, so both runs leave the built-ins alone.
+        dispatcher.warm(sorted(plugin for plugin in dispatcher.plugin_ids if plugin.startswith("bench_plugin_")))
+    startup = time.perf_counter() - started
+    startup_mb = private_mb() - memory
+
+    started = time.perf_counter()
+    frames = asyncio.run(first_frames(dispatcher, plugin_id(0)))
+    first = time.perf_counter() - started
+    print(json.dumps({
+        "startup_ms": startup * 1000,
+        "startup_mb": startup_mb,
+        "first_ms": first * 1000,
+        "registered": len(dispatcher.plugin_ids),
+        "loaded": len(dispatcher.loaded()),
+        "frame": frames[0].type,
+    }))
+
+
+def run_start(root: Path, eager: bool) -> dict:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(root), str(PLUGIN_SERVICE)])}
+    args = [sys.executable, __file__, "--child"] + (["--eager"] if eager else [])
+    result = subprocess.run(args, env=env, stdout=subprocess.PIPE, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check_behaviour(root: Path) -> None:
+    sys.path[:0] = [str(root), str(PLUGIN_SERVICE)]
+    from app.dispatcher import PluginDispatcher
+    from app.plugins.discovery import BUILTIN_HANDLERS, HandlerLoadError
+
+    # The load failures below are expected; keep their tracebacks out of the report.
+    logging.getLogger("app.dispatcher").setLevel(logging.CRITICAL)
+
+    dispatcher = PluginDispatcher()
+    bench_ids = {plugin for plugin in dispatcher.plugin_ids if plugin.startswith("bench_plugin_")}
+    check(not dispatcher.loaded() and not any(name.startswith(f"{PACKAGE}.") for name in sys.modules),
+          f"{len(dispatcher.plugin_ids)} plugins registered ({len(bench_ids)} via entry points), none imported")
+
+    frames = asyncio.run(first_frames(dispatcher, plugin_id(1)))
+    check(frames[0].type == "llm" and dispatcher.loaded() == {plugin_id(1)}
+          and f"{PACKAGE}.plugin_0001" in sys.modules and f"{PACKAGE}.plugin_0002" not in sys.modules,
+          "first request imports only that plugin's handler")
+
+    handler = dispatcher.resolve("dscoe_search_assistant")
+    check(dispatcher.resolve("document_search_assistant") is handler,
+          "plugin_ids sharing a target share one handler instance")
+
+    mismatched = PluginDispatcher(targets={"other": f"{PACKAGE}.plugin_0003:Handler"})
+    frames = asyncio.run(first_frames(mismatched, "other"))
+    check(frames[0].type == "error" and frames[0].content["code"] == "PLUGIN_UNAVAILABLE",
+          "a target that does not serve its registered plugin_id answers PLUGIN_UNAVAILABLE")
+
+    broken = PluginDispatcher(targets={"broken": f"{PACKAGE}.missing:Handler", **BUILTIN_HANDLERS})
+    frames = asyncio.run(first_frames(broken, "broken"))
+    check(frames[0].type == "error" and frames[0].content["code"] == "PLUGIN_UNAVAILABLE",
+          "a handler that fails to import answers PLUGIN_UNAVAILABLE")
+    try:
+        broken.warm(["broken"])
+        warm_failed = False
+    except HandlerLoadError:
+        warm_failed = True
+    check(warm_failed, "warming a broken handler fails (GET /ready stays 503)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plugins", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--import-ms", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.eager)
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-discovery-"))
+    print(f"synthetic handlers with {args.import_ms:.0f} ms import cost (medians of {args.repeat} starts)")
+    print(f"      {'plugins':>7}  {'loading':<8}{'startup ms':>11}{'startup MB':>11}{'first req ms':>13}{'loaded':>7}")
+    lazy_startup = []
+    for count in args.plugins:
+        root = workdir / f"plugins_{count}"
+        write_plugins(root, count, args.import_ms)
+        for eager in (False, True):
+            runs = [run_start(root, eager) for _ in range(args.repeat)]
+
+            def median(key: str) -> float:
+                return statistics.median(run[key] for run in runs)
+
+            if not eager:
+                lazy_startup.append(median("startup_ms"))
+            print(f"      {count:7d}  {'eager' if eager else 'lazy':<8}{median('startup_ms'):11.1f}"
+                  f"{median('startup_mb'):11.1f}{median('first_ms'):13.1f}{runs[-1]['loaded']:7d}")
+
+    check(max(lazy_startup) < min(lazy_startup) * 1.5 + 20,
+          f"lazy startup stays flat from {args.plugins[0]} to {args.plugins[-1]} plugins")
+    check_behaviour(workdir / f"plugins_{args.plugins[-1]}")
+
+
+if __name__ == "__main__":
+    main()
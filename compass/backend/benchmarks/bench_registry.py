@@ -0,0 +1,254 @@
+"""
+Registry-scale microbenchmarks for plugin records and menu building.
+
+Generates synthetic registries (default 100 to 50,000 plugins spread over
+workspaces of ~25 plugins, with small or large text/JSON fields) and
+measures, per call:
+  - PluginRecord.from_payload          (one row)
+  - RegistrySnapshot.build             (whole registry, shuffled input)
+  - PluginRegistry.get_grouped         (all workspaces; 2 workspaces enabled-only)
+  - PluginMenuEntry.from_record        (one record)
+  - get_plugin_catalog                 (GET /plugins handler for a user who sees 2 workspaces)
+
+Each case reports median/min time per call and, from a separate tracemalloc
+pass, peak bytes and net blocks allocated per call.
+
+Regression check: pass `--baseline previous.json`; any case whose median is
+more than `--max-regression` (default 25%) slower than the baseline is listed
+and the script exits with status 1.
+
+Run from compass/backend:
+    python benchmarks/bench_registry.py [--sizes 100,1000,10000,50000] \\
+        [--field-sizes small,large] [--json out.json] [--baseline old.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+BACKEND_SRC = Path(__file__).resolve().parents[1] / "src"
+SERVICE_KEY = "bench_plugins"
+PLUGINS_PER_WORKSPACE = 25
+
+FIELD_SIZES = {
+    # (description chars, instructions chars, user_inputs entries, seed messages)
+    "small": (60, 200, 1, 1),
+    "large": (600, 4000, 12, 6),
+}
+
+
+# ==========================================================================
+# Synthetic registry
+# ==========================================================================
+
+
+def workspace_ids(count: int) -> list[str]:
+    # "general" and "dscoe" are visible to the benchmark user via USER_ROLE_MAP.
+    named = ["general", "dscoe"]
+    return named[:count] + [f"ws_{index:05d}" for index in range(max(count - len(named), 0))]
+
+
+def make_payload(index: int, workspace_id: str, field_size: str, rng: random.Random) -> dict[str, Any]:
+    description_len, instructions_len, inputs, seeds = FIELD_SIZES[field_size]
+    return {
+        "plugin_id": f"plugin_{index:06d}",
+        "plugin_name": f"Plugin {index}",
+        "workspace_id": workspace_id,
+        "workspace_name": workspace_id.replace("_", " ").title(),
+        "workspace_description": "Synthetic workspace",
+        "description": "d" * description_len,
+        "instructions": "i" * instructions_len,
+        "conversation_seed": [
+            {"role": "user" if n % 2 == 0 else "assistant", "content": f"seed message {n}"}
+            for n in range(seeds)
+        ],
+        "user_inputs": [
+            {"name": f"input_{n}", "type": "select", "label": f"Input {n}", "options": ["a", "b", "c"]}
+            for n in range(inputs)
+        ],
+        "service_key": SERVICE_KEY,
+        "service_type": "external",
+        "plugin_type": "general",
+        "position": rng.randint(1, PLUGINS_PER_WORKSPACE),
+        "enabled": rng.random() > 0.1,
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+
+
+def make_payloads(size: int, field_size: str, seed: int = 7) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    workspaces = workspace_ids(max(size // PLUGINS_PER_WORKSPACE, 2))
+    return [make_payload(index, workspaces[index % len(workspaces)], field_size, rng) for index in range(size)]
+
+
+# ==========================================================================
+# Measurement
+# ==========================================================================
+
+
+def time_per_call(fn: Callable[[], Any], min_seconds: float, min_rounds: int) -> dict[str, float]:
+    fn()  # warm caches
+    samples: list[float] = []
+    budget_end = time.perf_counter() + min_seconds
+    while len(samples) < min_rounds or time.perf_counter() < budget_end:
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return {
+        "rounds": len(samples),
+        "median_us": statistics.median(samples) * 1_000_000,
+        "min_us": min(samples) * 1_000_000,
+    }
+
+
+def allocations_per_call(fn: Callable[[], Any]) -> dict[str, int]:
+    tracemalloc.start()
+    try:
+        before_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        del result
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak - baseline, "net_blocks": after_blocks - before_blocks}
+
+
+def run_cases(size: int, field_size: str, args: argparse.Namespace) -> dict[str, dict]:
+    from plugin_registry.models import PluginMenuEntry, PluginRecord
+    from plugin_registry.registry import PluginRegistry
+    from plugin_registry.snapshot import RegistrySnapshot
+    import routers.plugin_routes as plugin_routes
+
+    payloads = make_payloads(size, field_size)
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-registry-"))
+    registry_file = workdir / "plugins.json"
+    registry_file.write_text(json.dumps({"plugins": payloads}), encoding="utf-8")
+
+    registry = PluginRegistry(source="local", local_file=str(registry_file))
+    registry.get_all()  # parse the file once; reads below hit the mtime cache
+    plugin_routes.plugin_registry = registry
+
+    records = [PluginRecord.from_payload(payload) for payload in payloads]
+    shuffled = list(records)
+    random.Random(3).shuffle(shuffled)
+    visible = {"general", "dscoe"}
+    loop = asyncio.new_event_loop()
+    user = {"user_email": "bench@example.com"}
+
+    payload_cycle = iter(range(1 << 62))
+    record_cycle = iter(range(1 << 62))
+
+    cases: dict[str, Callable[[], Any]] = {
+        "from_payload": lambda: PluginRecord.from_payload(payloads[next(payload_cycle) % size]),
+        "snapshot_build": lambda: RegistrySnapshot.build(shuffled, version=None),
+        "get_grouped_all": lambda: registry.get_grouped(),
+        "get_grouped_2_workspaces": lambda: registry.get_grouped(workspace_filter=visible, enabled_only=True),
+        "menu_entry_from_record": lambda: PluginMenuEntry.from_record(records[next(record_cycle) % size]),
+        "get_plugin_catalog": lambda: loop.run_until_complete(
+            plugin_routes.get_plugin_catalog(user=user, include_unroutable=False)
+        ),
+    }
+
+    results: dict[str, dict] = {}
+    try:
+        for name, fn in cases.items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = {
+                **time_per_call(fn, args.min_seconds, args.min_rounds),
+                **allocations_per_call(fn),
+            }
+    finally:
+        loop.close()
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    regressions: list[str] = []
+    for key, cases in results.items():
+        for name, row in cases.items():
+            previous = baseline.get(key, {}).get(name)
+            if not previous:
+                continue
+            ratio = row["median_us"] / previous["median_us"] if previous["median_us"] else 1.0
+            if ratio > 1 + max_regression:
+                regressions.append(
+                    f"{key} {name}: {previous['median_us']:.1f} -> {row['median_us']:.1f} us "
+                    f"({(ratio - 1) * 100:+.0f}%)"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000,50000")
+    parser.add_argument("--field-sizes", default="small,large")
+    parser.add_argument("--only", default="", help="comma-separated case names to run")
+    parser.add_argument("--min-seconds", type=float, default=0.3, help="timing budget per case")
+    parser.add_argument("--min-rounds", type=int, default=5)
+    parser.add_argument("--json", type=Path, default=None, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, default=None, help="previous --json output to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+    args.only = {name for name in args.only.split(",") if name}
+
+    placeholder = Path(tempfile.mkdtemp(prefix="compass-bench-registry-")) / "plugins.json"
+    placeholder.write_text('{"plugins": []}', encoding="utf-8")
+    os.environ.update(
+        {
+            "COMPASS_ENV": "DEV",
+            "PLUGIN_REGISTRY_SOURCE": "local",
+            "PLUGIN_REGISTRY_LOCAL_FILE": str(placeholder),
+            "ENFORCE_ROLE_CHECKS": "true",
+            f"SERVICE_URL_{SERVICE_KEY.upper()}": "http://127.0.0.1:9",
+        }
+    )
+    sys.path.insert(0, str(BACKEND_SRC))
+
+    import routers.plugin_routes as plugin_routes
+
+    class SessionStore:
+        def hget(self, name: str, key: str) -> str:
+            return "dscoe.User"
+
+    plugin_routes.session_db = SessionStore()
+
+    results: dict[str, dict] = {}
+    print(f"{'registry':<16}{'case':<28}{'median us':>14}{'min us':>12}{'peak KiB':>12}{'blocks':>10}")
+    for field_size in args.field_sizes.split(","):
+        for size in (int(value) for value in args.sizes.split(",")):
+            key = f"{size}/{field_size}"
+            results[key] = run_cases(size, field_size, args)
+            for name, row in results[key].items():
+                print(
+                    f"{key:<16}{name:<28}{row['median_us']:>14.1f}{row['min_us']:>12.1f}"
+                    f"{row['peak_bytes'] / 1024:>12.1f}{row['net_blocks']:>10}"
+                )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        regressions = find_regressions(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.max_regression:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nno regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Local registry file: background watcher vs per-read file checks.
+
+Builds a local-source PluginRegistry over a `--size` plugin file and:
+  - times get_one / get_grouped per call with the watcher off (every read
+    stats the file) and on (reads use the published records), counting
+    filesystem stat calls during the reads,
+  - writes invalid JSON and checks reads keep serving the last good
+    version, then writes a valid edit and checks it is published (and the
+    snapshot rebuilt) by the watcher without any read touching the file.
+
+Run from compass/backend:
+    python benchmarks/bench_registry_local_watch.py [--size 2000] [--repeat 5000]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_databricks_pool import check  # noqa: E402
+from bench_registry_sync import BACKEND_SRC, make_row  # noqa: E402
+
+WATCH_INTERVAL_SECONDS = 0.05
+
+
+class StatCounter:
+    """Counts Path.stat calls on one file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.calls = 0
+        self._stat = pathlib.Path.stat
+
+    def __enter__(self) -> "StatCounter":
+        counter, original = self, self._stat
+
+        def stat(path, *args, **kwargs):
+            if path == counter.path:
+                counter.calls += 1
+            return original(path, *args, **kwargs)
+
+        pathlib.Path.stat = stat
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        pathlib.Path.stat = self._stat
+
+
+def write_plugins(path: Path, size: int, label: str) -> None:
+    plugins = [{**make_row(index), "plugin_name": f"{label} {index}"} for index in range(size)]
+    path.write_text(json.dumps({"plugins": plugins}), encoding="utf-8")
+
+
+def per_call_us(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1_000_000
+
+
+async def wait_for(condition, timeout: float = 5.0) -> float:
+    started = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError("condition not met")
+        await asyncio.sleep(0.005)
+    return time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace, local_file: Path) -> None:
+    from observability.metrics import registry_snapshot_builds_total
+    from plugin_registry.registry import PluginRegistry
+
+    target = make_row(args.size // 2)
+    workspaces = {target["workspace_id"]}
+
+    def reads(registry: PluginRegistry) -> tuple[float, float, int]:
+        with StatCounter(local_file) as stats:
+            one = per_call_us(lambda: registry.get_one(target["workspace_id"], target["plugin_id"]), args.repeat)
+            grouped = per_call_us(lambda: registry.get_grouped(workspaces, enabled_only=True), args.repeat)
+        return one, grouped, stats.calls
+
+    print(f"per call (median of {args.repeat}), {args.size} plugins")
+    print(f"      {'mode':<10}{'get_one us':>12}{'get_grouped us':>16}{'stat calls':>12}")
+    unwatched = PluginRegistry(source="local", local_file=str(local_file))
+    one, grouped, stats = reads(unwatched)
+    print(f"      {'per-read':<10}{one:12.1f}{grouped:16.1f}{stats:12d}")
+
+    registry = PluginRegistry(source="local", local_file=str(local_file))
+    watcher = registry.local_watcher()
+    registry.get_all()
+    watcher.start()
+    try:
+        one, grouped, stats = reads(registry)
+        print(f"      {'watched':<10}{one:12.1f}{grouped:16.1f}{stats:12d}  ({watcher.mode})")
+        check(stats == 0, "watched reads never stat the local file")
+
+        def name() -> str:
+            return registry.get_one(target["workspace_id"], target["plugin_id"]).plugin_name
+
+        before = name()
+        local_file.write_text('{"plugins": [', encoding="utf-8")
+        await asyncio.sleep(WATCH_INTERVAL_SECONDS * 4)
+        check(name() == before, "invalid JSON keeps serving the last good version")
+        unwatched.get_all()  # per-read mode logs once and keeps its version too
+        check(unwatched.get_one(target["workspace_id"], target["plugin_id"]).plugin_name == before,
+              "per-read mode also keeps the last good version")
+
+        builds = registry_snapshot_builds_total.labels("local").value
+        write_plugins(local_file, args.size, "Edited")
+        seconds = await wait_for(lambda: registry_snapshot_builds_total.labels("local").value > builds)
+        with StatCounter(local_file) as stats:
+            edited = name()
+        check(edited == f"Edited {args.size // 2}" and stats.calls == 0,
+              f"valid edit published and snapshot rebuilt by the watcher after {seconds * 1000:.0f} ms")
+    finally:
+        await watcher.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-local-watch-"))
+    local_file = workdir / "plugins.local.json"
+    write_plugins(local_file, args.size, "Local")
+    os.environ.update(
+        {
+            "COMPASS_ENV": "DEV",
+            "PLUGIN_REGISTRY_SOURCE": "local",
+            "PLUGIN_REGISTRY_LOCAL_FILE": str(local_file),
+            "PLUGIN_REGISTRY_LOCAL_WATCH_INTERVAL_SECONDS": str(WATCH_INTERVAL_SECONDS),
+        }
+    )
+    sys.path.insert(0, str(BACKEND_SRC))
+    # The rejected edit is logged with a traceback; keep the output readable.
+    logging.basicConfig(level=logging.CRITICAL)
+
+    asyncio.run(run(args, local_file))
+
+
+if __name__ == "__main__":
+    main()
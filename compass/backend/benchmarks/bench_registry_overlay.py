@@ -0,0 +1,157 @@
+"""
+Overlay registry: materialized merged view vs the pure sources.
+
+Fills a Databricks stand-in (SQLite, fake connector) with `--size` plugins,
+syncs it into an in-memory Redis, and writes a local overlay file that
+overrides `--overrides` of them and adds as many new ones. The script:
+  - checks the overlay view equals "Databricks, then local wins by key",
+  - times get_one / get_grouped per call for overlay, databricks and local
+    sources reading the same records,
+  - edits the local file and checks the rebuild re-merges without reading
+    the Redis cache (no MGET), then
+  - edits a Databricks plugin and checks the rebuild re-reads Redis once
+    and keeps local overrides on top.
+
+Run from compass/backend:
+    python benchmarks/bench_registry_overlay.py [--size 10000] [--overrides 50]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_databricks_pool import FakeConnector, check  # noqa: E402
+from bench_registry_sync import BACKEND_SRC, TABLE, MemoryRedis, create_table, make_row  # noqa: E402
+
+
+class CountingRedis(MemoryRedis):
+    """MemoryRedis that counts full-cache reads (MGET)."""
+
+    mget_calls = 0
+
+    def mget(self, keys: list[str]) -> list:
+        self.mget_calls += 1
+        return super().mget(keys)
+
+
+def write_local(path: Path, rows: list[dict[str, Any]], label: str) -> None:
+    payload = [{**row, "plugin_name": f"{label} {row['plugin_id']}"} for row in rows]
+    path.write_text(json.dumps({"plugins": payload}), encoding="utf-8")
+    # Some filesystems keep coarse mtimes; make every edit visible.
+    stamp = time.time() + write_local.edits
+    os.utime(path, (stamp, stamp))
+    write_local.edits += 1
+
+
+write_local.edits = 1
+
+
+def per_call_us(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--overrides", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-overlay-"))
+    local_file = workdir / "plugins.local.json"
+    local_file.write_text('{"plugins": []}', encoding="utf-8")
+    os.environ.update(
+        {"COMPASS_ENV": "DEV", "PLUGIN_REGISTRY_SOURCE": "local", "PLUGIN_REGISTRY_LOCAL_FILE": str(local_file)}
+    )
+    sys.path.insert(0, str(BACKEND_SRC))
+
+    from db.databricks_pool import DatabricksConnectionPool
+    from plugin_registry.models import PluginUpdate
+    from plugin_registry.registry import PluginRegistry
+
+    db_path = workdir / "registry.db"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    create_table(conn)
+    rows = [make_row(index) for index in range(args.size)]
+    columns = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO {TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row[column] for column in columns) for row in rows],
+    )
+
+    overridden = rows[:: max(args.size // args.overrides, 1)][: args.overrides]
+    added = [make_row(args.size + index) for index in range(args.overrides)]
+    write_local(local_file, overridden + added, "Local")
+
+    cache = CountingRedis()
+
+    def registry(source: str, local: Path = local_file) -> PluginRegistry:
+        return PluginRegistry(
+            source=source,
+            table_name=TABLE,
+            local_file=str(local),
+            redis_client=cache,
+            pool=DatabricksConnectionPool(FakeConnector(db_path, handshake_seconds=0)),
+        )
+
+    overlay = registry("overlay")
+    overlay.sync()
+    databricks = registry("databricks")
+
+    expected = {(p.workspace_id, p.plugin_id): p.plugin_name for p in databricks.get_all()}
+    expected.update({(row["workspace_id"], row["plugin_id"]): f"Local {row['plugin_id']}" for row in overridden + added})
+    merged = {(p.workspace_id, p.plugin_id): p.plugin_name for p in overlay.get_all()}
+    check(merged == expected, f"overlay view = Databricks ({args.size}) with local winning ({len(overridden)} overridden, {len(added)} added)")
+
+    # The local source reads the same records from a file of the full catalog.
+    full_file = workdir / "plugins.full.json"
+    full_file.write_text(json.dumps({"plugins": [p.model_dump(mode="json") for p in overlay.get_all()]}), encoding="utf-8")
+    local = registry("local", full_file)
+
+    target = rows[args.size // 2]
+    workspaces = {target["workspace_id"], rows[0]["workspace_id"]}
+    print(f"\nper call (median of {args.repeat}), {len(merged)} plugins")
+    print(f"      {'source':<12}{'get_one us':>12}{'get_grouped us':>16}")
+    for name, reg in (("overlay", overlay), ("databricks", databricks), ("local", local)):
+        reg.get_all()  # build the snapshot
+        one = per_call_us(lambda: reg.get_one(target["workspace_id"], target["plugin_id"]), args.repeat)
+        grouped = per_call_us(lambda: reg.get_grouped(workspaces, enabled_only=True), args.repeat)
+        print(f"      {name:<12}{one:12.1f}{grouped:16.1f}")
+
+    reads = cache.mget_calls
+    write_local(local_file, overridden + added, "Edited")
+    started = time.perf_counter()
+    names = {p.plugin_id: p.plugin_name for p in overlay.get_all()}
+    rebuild_ms = (time.perf_counter() - started) * 1000
+    check(names[overridden[0]["plugin_id"]] == f"Edited {overridden[0]['plugin_id']}"
+          and cache.mget_calls == reads,
+          f"local edit re-merged in {rebuild_ms:.1f} ms without reading the Redis cache")
+
+    plain = next(row for row in rows if row not in overridden)
+    databricks.update(plain["workspace_id"], plain["plugin_id"], PluginUpdate(plugin_name="From Databricks"))
+    reads = cache.mget_calls
+    started = time.perf_counter()
+    names = {p.plugin_id: p.plugin_name for p in overlay.get_all()}
+    rebuild_ms = (time.perf_counter() - started) * 1000
+    check(names[plain["plugin_id"]] == "From Databricks"
+          and names[overridden[0]["plugin_id"]] == f"Edited {overridden[0]['plugin_id']}"
+          and cache.mget_calls == reads + 1,
+          f"Databricks edit re-read the cache once ({rebuild_ms:.1f} ms); local overrides still win")
+
+
+if __name__ == "__main__":
+    main()
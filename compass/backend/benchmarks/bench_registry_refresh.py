@@ -0,0 +1,182 @@
+"""
+Stale-while-revalidate registry refresh: reads never wait on Databricks.
+
+Runs a RegistryRefresher against the fake Databricks connector from
+bench_databricks_pool.py (SQLite table, `--statement-ms` per statement) and
+an in-memory Redis, while a reader calls `get_grouped` in a tight loop on
+the event loop thread. It walks through:
+  1. a row edited in the table shows up after the next periodic sync,
+  2. `invalidate_cache()` keeps serving the last good snapshot ("refreshing")
+     until the background full sync lands,
+  3. Redis errors serve the last good snapshot ("redis_error"),
+  4. a Databricks outage past max staleness keeps serving ("max_age"),
+and reports the slowest read seen, which should stay far below one
+Databricks statement.
+
+Run from compass/backend:
+    python benchmarks/bench_registry_refresh.py [--statement-ms 200] [--size 2000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_databricks_pool import FakeConnector, check  # noqa: E402
+from bench_registry_sync import BACKEND_SRC, TABLE, MemoryRedis, create_table, make_row  # noqa: E402
+
+REFRESH_INTERVAL_SECONDS = 1.0
+MAX_STALENESS_SECONDS = 1.5
+
+
+class FlakyRedis(MemoryRedis):
+    """MemoryRedis whose calls can be made to fail like an unreachable server."""
+
+    down = False
+
+    def __getattribute__(self, name: str):
+        attr = super().__getattribute__(name)
+        if callable(attr) and not name.startswith("_") and super().__getattribute__("down"):
+            import redis
+
+            def fail(*_args, **_kwargs):
+                raise redis.ConnectionError("Error 111 connecting to redis")
+
+            return fail
+        return attr
+
+
+def stale_reads() -> dict[str, float]:
+    from observability.metrics import registry_stale_reads_total
+
+    return {key[0]: child.value for key, child in registry_stale_reads_total._children.items()}
+
+
+class Reader:
+    """Reads the registry on the event loop thread, like request handlers do."""
+
+    def __init__(self, registry) -> None:
+        self.registry = registry
+        self.slowest = 0.0
+        self.reads = 0
+
+    def read(self) -> dict[str, str]:
+        started = time.perf_counter()
+        groups = self.registry.get_grouped()
+        self.slowest = max(self.slowest, time.perf_counter() - started)
+        self.reads += 1
+        return {p.plugin_id: p.plugin_name for group in groups for p in group.plugins}
+
+    async def wait_for(self, predicate, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate(self.read()):
+                return True
+            await asyncio.sleep(0.005)
+        return False
+
+
+async def scenario(args: argparse.Namespace, db_path: Path) -> None:
+    from db.databricks_pool import DatabricksConnectionPool
+    from plugin_registry.refresher import RegistryRefresher
+    from plugin_registry.registry import PluginRegistry
+
+    connector = FakeConnector(db_path, handshake_seconds=0, statement_seconds=args.statement_ms / 1000)
+    cache = FlakyRedis()
+    registry = PluginRegistry(
+        source="databricks",
+        table_name=TABLE,
+        redis_client=cache,
+        pool=DatabricksConnectionPool(connector),
+        max_staleness_seconds=MAX_STALENESS_SECONDS,
+    )
+    refresher = RegistryRefresher(registry)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+
+    # Cold start: nothing to serve yet, so the first read may hydrate inline.
+    registry.warm_cache()
+    reader = Reader(registry)
+    reader.read()
+    reader.slowest = 0.0
+    refresher.start()
+
+    conn.execute(f"UPDATE {TABLE} SET plugin_name = 'edited', updated_at = '2030-01-01T00:00:00+00:00' "
+                 "WHERE plugin_id = 'plugin_000001'")
+    seen = await reader.wait_for(lambda names: names["plugin_000001"] == "edited", REFRESH_INTERVAL_SECONDS * 3)
+    check(seen, "edited row served after the next periodic sync")
+
+    before = stale_reads().get("refreshing", 0)
+    registry.invalidate_cache()
+    conn.execute(f"UPDATE {TABLE} SET plugin_name = 'after invalidate' WHERE plugin_id = 'plugin_000002'")
+    names = reader.read()
+    check(names["plugin_000002"] != "after invalidate" and stale_reads().get("refreshing", 0) > before,
+          "invalidate_cache serves the last good snapshot while the refresher rebuilds")
+    seen = await reader.wait_for(lambda names: names["plugin_000002"] == "after invalidate", 5)
+    check(seen, "full sync after invalidation is served once it lands")
+
+    before = stale_reads().get("redis_error", 0)
+    cache.down = True
+    names = reader.read()
+    cache.down = False
+    check(len(names) == args.size and stale_reads().get("redis_error", 0) > before,
+          "Redis error serves the last good snapshot")
+
+    before = stale_reads().get("max_age", 0)
+    connector.down = True
+    connector.kill_all()
+    logging.disable(logging.ERROR)  # the refresher logs each failed sync
+    await asyncio.sleep(MAX_STALENESS_SECONDS + REFRESH_INTERVAL_SECONDS)
+    names = reader.read()
+    logging.disable(logging.NOTSET)
+    connector.down = False
+    check(bool(names) and stale_reads().get("max_age", 0) > before,
+          f"Databricks outage past max staleness still serves reads (data age {registry.data_age_seconds():.1f}s)")
+
+    await refresher.stop()
+    print(f"\n{reader.reads} reads; slowest {reader.slowest * 1000:.2f} ms "
+          f"(one Databricks statement: {args.statement_ms:.0f} ms)")
+    check(reader.slowest * 1000 < args.statement_ms / 2, "no read waited on Databricks")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--statement-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-refresh-"))
+    placeholder = workdir / "plugins.json"
+    placeholder.write_text('{"plugins": []}', encoding="utf-8")
+    os.environ.update(
+        {
+            "COMPASS_ENV": "DEV",
+            "PLUGIN_REGISTRY_SOURCE": "local",
+            "PLUGIN_REGISTRY_LOCAL_FILE": str(placeholder),
+            "PLUGIN_REGISTRY_REFRESH_INTERVAL_SECONDS": str(REFRESH_INTERVAL_SECONDS),
+        }
+    )
+    sys.path.insert(0, str(BACKEND_SRC))
+
+    db_path = workdir / "registry.db"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    create_table(conn)
+    rows = [make_row(index) for index in range(args.size)]
+    columns = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO {TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row[column] for column in columns) for row in rows],
+    )
+
+    print(f"registry of {args.size} plugins, {args.statement_ms:.0f} ms per Databricks statement")
+    asyncio.run(scenario(args, db_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Node-shared registry snapshot: N worker processes, one build.
+
+Fills a Databricks stand-in (SQLite, fake connector) with `--size` plugins
+and starts `--workers` fresh processes, first with a private snapshot per
+worker, then with PLUGIN_REGISTRY_SHARED_SNAPSHOT_DIR set. Each worker syncs
+its own in-memory Redis (same data, same version, as if they shared one),
+then all of them read at the same moment: first snapshot, a menu read
+(get_grouped over a few workspaces) and a full get_all, with the private
+memory (USS) each step added. The shared run must build exactly once.
+
+In this process it then checks that a mapped snapshot reads the same
+records and groups as a private build, and that an admin edit publishes the
+next generation while a reader still holding the previous one keeps working,
+and that a reader does not wait while another process holds the build lock.
+
+Run from compass/backend:
+    python benchmarks/bench_registry_shared.py [--size 10000] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_databricks_pool import FakeConnector, check  # noqa: E402
+from bench_registry_sync import BACKEND_SRC, TABLE, MemoryRedis, create_table, make_row  # noqa: E402
+
+MENU_WORKSPACES = 3
+
+
+def private_mb() -> float:
+    """Memory only this process holds (Private_Clean + Private_Dirty), Linux only."""
+    fields = {}
+    with open("/proc/self/smaps_rollup", encoding="utf-8") as handle:
+        for line in handle:
+            name, _, value = line.partition(":")
+            fields[name] = value
+    return sum(int(fields[name].split()[0]) for name in ("Private_Clean", "Private_Dirty")) / 1024
+
+
+def make_registry(db_path: Path, cache: MemoryRedis, **kwargs):
+    from db.databricks_pool import DatabricksConnectionPool
+    from plugin_registry.registry import PluginRegistry
+
+    return PluginRegistry(
+        source="databricks",
+        table_name=TABLE,
+        redis_client=cache,
+        pool=DatabricksConnectionPool(FakeConnector(db_path, handshake_seconds=0)),
+        **kwargs,
+    )
+
+
+def run_child(db_path: Path, start_at: float) -> None:
+    """One worker: sync, wait for the others, then time the first reads; prints JSON."""
+    sys.path.insert(0, str(BACKEND_SRC))
+    from observability.metrics import registry_shared_snapshots_total, registry_snapshot_builds_total
+    from plugin_registry.registry import VERSION_KEY
+
+    cache = MemoryRedis()
+    cache.set(VERSION_KEY, 1000)  # same counter in every worker, as with one shared Redis
+    registry = make_registry(db_path, cache)
+    registry.sync()
+    time.sleep(max(start_at - time.time(), 0))
+
+    memory = private_mb()
+    started = time.perf_counter()
+    registry.snapshot()
+    first = time.perf_counter() - started
+    first_mb = private_mb() - memory
+
+    workspaces = {f"ws_{index:05d}" for index in range(MENU_WORKSPACES)}
+    started = time.perf_counter()
+    registry.get_grouped(workspaces, enabled_only=True)
+    menu = time.perf_counter() - started
+
+    started = time.perf_counter()
+    registry.get_all()
+    full = time.perf_counter() - started
+    full_mb = private_mb() - memory
+
+    print(json.dumps({
+        "first_ms": first * 1000,
+        "menu_ms": menu * 1000,
+        "get_all_ms": full * 1000,
+        "first_mb": first_mb,
+        "full_mb": full_mb,
+        "built": registry_snapshot_builds_total.labels("databricks").value,
+        "attached": registry_shared_snapshots_total.labels("attached").value,
+    }))
+
+
+def run_workers(count: int, db_path: Path, shared_dir: str) -> list[dict]:
+    env = {**os.environ, "COMPASS_ENV": "DEV", "PLUGIN_REGISTRY_SHARED_SNAPSHOT_DIR": shared_dir}
+    start_at = time.time() + 3.0
+    children = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--child", str(db_path), "--start-at", str(start_at)],
+            env=env,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(count)
+    ]
+    results = []
+    for child in children:
+        stdout, _ = child.communicate()
+        if child.returncode:
+            raise RuntimeError(f"worker exited with {child.returncode}")
+        results.append(json.loads(stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.start_at)
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-shared-"))
+    shared_dir = workdir / "shared"
+    db_path = workdir / "registry.db"
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    create_table(conn)
+    rows = [make_row(index) for index in range(args.size)]
+    columns = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO {TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row[column] for column in columns) for row in rows],
+    )
+
+    runs = {
+        "private": run_workers(args.workers, db_path, ""),
+        "shared": run_workers(args.workers, db_path, str(shared_dir)),
+    }
+    shared = runs["shared"]
+    rows_by_mode = {
+        "private": runs["private"],
+        "shared/built": [result for result in shared if result["built"]],
+        "shared/mapped": [result for result in shared if not result["built"]],
+    }
+    print(f"{args.workers} workers, {args.size} plugins (medians per worker; CPUs: {os.cpu_count()})")
+    print(f"      {'worker':<15}{'n':>3}{'first ms':>10}{'menu ms':>9}{'get_all ms':>12}{'first MB':>10}{'full MB':>9}")
+    for mode, results in rows_by_mode.items():
+        if not results:
+            continue
+
+        def median(key: str) -> float:
+            return statistics.median(result[key] for result in results)
+
+        print(f"      {mode:<15}{len(results):3d}{median('first_ms'):10.1f}{median('menu_ms'):9.2f}"
+              f"{median('get_all_ms'):12.1f}{median('first_mb'):10.1f}{median('full_mb'):9.1f}")
+    print(f"      snapshot builds: private {int(sum(r['built'] for r in runs['private']))}, "
+          f"shared {int(sum(r['built'] for r in shared))}")
+    check(sum(result["built"] for result in shared) == 1
+          and sum(result["attached"] for result in shared) == args.workers - 1,
+          f"shared: one worker built, {args.workers - 1} mapped its file")
+
+    # In-process checks: two registries on one Redis, as two workers.
+    os.environ.update({"COMPASS_ENV": "DEV", "PLUGIN_REGISTRY_SOURCE": "local"})
+    sys.path.insert(0, str(BACKEND_SRC))
+    from plugin_registry.models import PluginUpdate
+    from plugin_registry.shared_snapshot import SharedRegistrySnapshot
+
+    cache = MemoryRedis()
+    builder = make_registry(db_path, cache, shared_snapshot_dir=str(shared_dir))
+    builder.sync()
+    private = make_registry(db_path, cache)
+    mapped = make_registry(db_path, cache, shared_snapshot_dir=str(shared_dir))
+    builder.get_all()
+    old = mapped.snapshot()
+    check(isinstance(old, SharedRegistrySnapshot), f"second registry mapped generation {old.generation}")
+
+    def dump(registry, **filters) -> list:
+        return [group.model_dump() for group in registry.get_grouped(**filters)]
+
+    filtered = {"ws_00001", "ws_00002", "missing"}
+    check([p.model_dump() for p in mapped.get_all()] == [p.model_dump() for p in private.get_all()]
+          and dump(mapped, enabled_only=True) == dump(private, enabled_only=True)
+          and dump(mapped, workspace_filter=filtered) == dump(private, workspace_filter=filtered),
+          "mapped snapshot reads the same records and groups as a private build")
+
+    target = rows[args.size // 2]
+    builder.update(target["workspace_id"], target["plugin_id"], PluginUpdate(plugin_name="Edited"))
+    builder.get_all()
+    new = mapped.snapshot()
+    check(isinstance(new, SharedRegistrySnapshot) and new.generation == old.generation + 1
+          and new.get_one(target["workspace_id"], target["plugin_id"]).plugin_name == "Edited",
+          f"admin edit published generation {new.generation}; the other registry mapped it")
+    check(old.get_one(target["workspace_id"], target["plugin_id"]).plugin_name == target["plugin_name"],
+          "a reader still holding the previous generation keeps reading it")
+
+    # Another worker (here: another process) is building the next version.
+    lock_path = next(shared_dir.glob("*.lock"))
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import fcntl, sys, time; h = open(sys.argv[1], 'a'); fcntl.flock(h, fcntl.LOCK_EX); "
+         "print('locked', flush=True); time.sleep(30)", str(lock_path)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        holder.stdout.readline()
+        target = rows[args.size // 3]
+        builder.update(target["workspace_id"], target["plugin_id"], PluginUpdate(plugin_name="Edited again"))
+        started = time.perf_counter()
+        during = mapped.snapshot()
+        waited_ms = (time.perf_counter() - started) * 1000
+        check(during is new and waited_ms < 1000,
+              f"while another worker holds the build lock, a reader serves its previous snapshot ({waited_ms:.1f} ms)")
+    finally:
+        holder.kill()
+        holder.wait()
+    after = mapped.snapshot()
+    check(after.get_one(target["workspace_id"], target["plugin_id"]).plugin_name == "Edited again",
+          "once the lock is free the next read builds the new version")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Full vs delta registry sync against a SQLite stand-in for Databricks.
+
+A SQLite table with the plugin_registry columns plays the Databricks
+cursor (`?` params and `cursor.description` match the connector), and a
+small in-memory class plays the Redis cache. The script:
+  1. seeds N plugins and runs a full sync,
+  2. updates `--changed` rows and times a delta sync against a full one,
+  3. deletes rows and checks that only a full reconciliation drops them,
+asserting after every step that the registry snapshot matches the table.
+
+Run from compass/backend:
+    python benchmarks/bench_registry_sync.py [--size 10000] [--changed 10] [--rounds 5]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+BACKEND_SRC = Path(__file__).resolve().parents[1] / "src"
+TABLE = "plugin_registry"
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+# ==========================================================================
+# Stand-ins
+# ==========================================================================
+
+
+class MemoryRedis:
+    """The subset of redis.Redis (decode_responses=True) the registry uses."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, str] = {}
+        self._sets: dict[str, set[str]] = {}
+        self._expires: dict[str, float] = {}  # only honoured by set(nx=True), for locks
+
+    def get(self, key: str) -> Optional[str]:
+        return self._values.get(key)
+
+    def mget(self, keys: list[str]) -> list[Optional[str]]:
+        return [self._values.get(key) for key in keys]
+
+    def mset(self, mapping: dict[str, Any]) -> bool:
+        self._values.update((key, str(value)) for key, value in mapping.items())
+        return True
+
+    def incr(self, key: str) -> int:
+        value = int(self._values.get(key, 0)) + 1
+        self._values[key] = str(value)
+        return value
+
+    def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if key in self._values or key in self._sets)
+
+    def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            removed += (self._values.pop(key, None) is not None) + (self._sets.pop(key, None) is not None)
+        return removed
+
+    def sadd(self, key: str, *members: str) -> int:
+        target = self._sets.setdefault(key, set())
+        before = len(target)
+        target.update(members)
+        return len(target) - before
+
+    def srem(self, key: str, *members: str) -> int:
+        target = self._sets.get(key, set())
+        before = len(target)
+        target.difference_update(members)
+        return before - len(target)
+
+    def smembers(self, key: str) -> set[str]:
+        return set(self._sets.get(key, set()))
+
+    def set(self, key: str, value: Any, nx: bool = False, ex: Optional[int] = None) -> bool:
+        # Defined last: shadows `set` in the class body.
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._values.pop(key, None)
+            del self._expires[key]
+        if nx and key in self._values:
+            return False
+        self._values[key] = str(value)
+        if ex is not None:
+            self._expires[key] = time.monotonic() + ex
+        return True
+
+
+class SqliteDatabricks:
+    """Connection factory whose connections behave like databricks.sql ones."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.queries: list[str] = []
+
+    def __call__(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.set_trace_callback(self.queries.append)
+        return conn
+
+
+def create_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            workspace_id TEXT, workspace_name TEXT, workspace_description TEXT,
+            plugin_id TEXT, plugin_name TEXT, description TEXT, instructions TEXT,
+            conversation_seed TEXT, user_inputs TEXT, service_key TEXT,
+            service_type TEXT, plugin_type TEXT, position INTEGER, enabled INTEGER,
+            updated_by TEXT, updated_at TEXT,
+            PRIMARY KEY (workspace_id, plugin_id)
+        )
+        """
+    )
+    conn.execute(f"CREATE INDEX {TABLE}_updated_at ON {TABLE} (updated_at)")
+
+
+def make_row(index: int) -> dict[str, Any]:
+    return {
+        "workspace_id": f"ws_{index // 25:05d}",
+        "workspace_name": f"Workspace {index // 25}",
+        "workspace_description": "Synthetic workspace",
+        "plugin_id": f"plugin_{index:06d}",
+        "plugin_name": f"Plugin {index}",
+        "description": "d" * 120,
+        "instructions": "i" * 600,
+        "conversation_seed": json.dumps([{"role": "user", "content": "hello"}]),
+        "user_inputs": json.dumps([]),
+        "service_key": "bench_plugins",
+        "service_type": "external",
+        "plugin_type": "general",
+        "position": index % 25 + 1,
+        "enabled": 1,
+        "updated_by": "seed",
+        "updated_at": BASE_TIME.isoformat(),
+    }
+
+
+# ==========================================================================
+# Checks
+# ==========================================================================
+
+
+def table_state(conn: sqlite3.Connection) -> dict[tuple[str, str], str]:
+    rows = conn.execute(f"SELECT workspace_id, plugin_id, plugin_name FROM {TABLE}").fetchall()
+    return {(ws, plugin): name for ws, plugin, name in rows}
+
+
+def assert_matches(registry: Any, conn: sqlite3.Connection, label: str) -> None:
+    cached = {(p.workspace_id, p.plugin_id): p.plugin_name for p in registry.get_all()}
+    expected = table_state(conn)
+    if cached != expected:
+        missing = len(expected.keys() - cached.keys())
+        extra = len(cached.keys() - expected.keys())
+        stale = sum(1 for key in expected.keys() & cached.keys() if expected[key] != cached[key])
+        raise AssertionError(f"{label}: snapshot differs (missing={missing} extra={extra} stale={stale})")
+    print(f"  ok  {label}: snapshot matches table ({len(expected)} plugins)")
+
+
+def timed(fn) -> tuple[Any, float]:
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--changed", type=int, default=10, help="rows updated between syncs")
+    parser.add_argument("--deleted", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-bench-sync-"))
+    placeholder = workdir / "plugins.json"
+    placeholder.write_text('{"plugins": []}', encoding="utf-8")
+    os.environ.update(
+        {
+            "COMPASS_ENV": "DEV",
+            "PLUGIN_REGISTRY_SOURCE": "local",
+            "PLUGIN_REGISTRY_LOCAL_FILE": str(placeholder),
+        }
+    )
+    sys.path.insert(0, str(BACKEND_SRC))
+
+    from plugin_registry.registry import PluginRegistry
+
+    database = SqliteDatabricks(workdir / "registry.db")
+    conn = sqlite3.connect(database.path, isolation_level=None)
+    create_table(conn)
+    rows = [make_row(index) for index in range(args.size)]
+    columns = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO {TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row[column] for column in columns) for row in rows],
+    )
+
+    registry = PluginRegistry(
+        source="databricks",
+        table_name=TABLE,
+        sync_mode="delta",
+        full_sync_interval_seconds=3600,
+        redis_client=MemoryRedis(),
+        connect=database,
+    )
+
+    print(f"registry of {args.size} plugins, {args.changed} changed per round")
+    result, elapsed = timed(registry.sync)
+    assert result.mode == "full", result
+    print(f"  initial {result.mode} sync: {result.rows} rows in {elapsed * 1000:.1f} ms")
+    assert_matches(registry, conn, "after initial full sync")
+
+    delta_times: list[float] = []
+    full_times: list[float] = []
+    for round_index in range(1, args.rounds + 1):
+        stamp = (BASE_TIME + timedelta(minutes=round_index)).isoformat()
+        step = max(args.size // max(args.changed, 1), 1)
+        for index in range(round_index, args.size, step)[: args.changed]:
+            conn.execute(
+                f"UPDATE {TABLE} SET plugin_name = ?, updated_at = ? WHERE plugin_id = ?",
+                (f"Plugin {index} r{round_index}", stamp, f"plugin_{index:06d}"),
+            )
+
+        database.queries.clear()
+        result, elapsed = timed(registry.sync)
+        assert result.mode == "delta", result
+        assert any("WHERE updated_at >" in query for query in database.queries), database.queries
+        delta_times.append(elapsed)
+        assert_matches(registry, conn, f"round {round_index} delta ({result.rows} rows)")
+
+        _, elapsed = timed(lambda: registry.sync(full=True))
+        full_times.append(elapsed)
+
+    doomed = [key for key, _ in zip(table_state(conn), range(args.deleted))]
+    for workspace_id, plugin_id in doomed:
+        conn.execute(f"DELETE FROM {TABLE} WHERE workspace_id = ? AND plugin_id = ?", (workspace_id, plugin_id))
+
+    result = registry.sync()
+    cached = {(p.workspace_id, p.plugin_id) for p in registry.get_all()}
+    assert result.mode == "delta" and all(key in cached for key in doomed), "delta sync should not see deletes"
+    print(f"  ok  delta sync after {len(doomed)} deletes keeps them until reconciliation")
+
+    result = registry.sync(full=True)
+    assert result.removed == len(doomed), result
+    assert_matches(registry, conn, f"full reconciliation ({result.removed} removed)")
+
+    registry.invalidate_cache()
+    result = registry.sync()
+    assert result.mode == "full", "invalidate_cache should force the next sync to reconcile"
+    print("  ok  invalidate_cache forces a full reconciliation")
+
+    delta_ms = statistics.median(delta_times) * 1000
+    full_ms = statistics.median(full_times) * 1000
+    print(f"\nmedian delta sync {delta_ms:.2f} ms, full sync {full_ms:.2f} ms ({full_ms / delta_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
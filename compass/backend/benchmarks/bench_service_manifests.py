@@ -0,0 +1,215 @@
+"""
+Plugin service manifests: what the Hub saves by knowing a service's plugins and capacity.
+
+Starts, in one process (uvicorn threads):
+  - the real plugin service (compass_plugins/service) as `compass_plugins`
+  - two simulated replicas of `sim_plugins` serving plugin "slow", with
+    room for `--capacity-a` and `--capacity-b` concurrent streams; beyond
+    that they answer 503 like a full bulkhead
+
+and drives the Hub's upstream code directly, first without manifests (as
+before), then after the Hub fetched them:
+  1) a chat for a plugin the service does not host: round trip ending in
+     UNKNOWN_PLUGIN vs a local `resolver.serves` check
+  2) `--streams` concurrent streams for "slow": 503s answered by the
+     replicas, Hub retries, and streams that failed (and how fast)
+
+Run from compass/backend:
+    python benchmarks/bench_service_manifests.py [--capacity-a 2] [--capacity-b 8] [--streams 12]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_databricks_pool import check  # noqa: E402
+from load_test import BACKEND_SRC, free_port, serve_in_thread  # noqa: E402
+
+PLUGIN_SERVICE = Path(__file__).resolve().parents[3] / "compass_plugins" / "service"
+
+
+def build_replica(capacity: int, stream_seconds: float) -> FastAPI:
+    app = FastAPI()
+    app.state.active = 0
+    app.state.rejected = 0
+    app.state.served = 0
+
+    @app.get("/manifest")
+    def manifest() -> dict:
+        return {
+            "contract_versions": ["v1"],
+            "features": [],
+            "plugins": {"slow": {"mode": "event_loop", "max_concurrency": capacity, "max_queue": 0}},
+        }
+
+    @app.post("/plugin/response")
+    async def plugin_response(request: Request):
+        await request.body()
+        if app.state.active >= capacity:
+            app.state.rejected += 1
+            return JSONResponse({"code": "PLUGIN_BUSY", "retryable": True}, status_code=503)
+        app.state.active += 1
+        app.state.served += 1
+
+        async def stream():
+            try:
+                yield json.dumps({"type": "llm", "content": "first "}) + "\n"
+                await asyncio.sleep(stream_seconds)
+                yield json.dumps({"type": "llm", "content": "last"}) + "\n"
+            finally:
+                app.state.active -= 1
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+def make_payload(plugin_id: str, index: int) -> dict:
+    from schemas.plugin_service import PluginServiceRequest
+
+    return PluginServiceRequest(
+        request_id=f"bench-{plugin_id}-{index}",
+        plugin_id=plugin_id,
+        workspace_id="general",
+        conversation_id="c",
+        user_email="bench@example.com",
+        roles=[],
+        conversation=[{"role": "user", "content": "hello"}],
+        user_inputs=[],
+        instructions="",
+        conversation_seed=[],
+        user_inputs_schema=[],
+    ).model_dump()
+
+
+async def unknown_plugin_round_trip(client, count: int) -> tuple[float, str]:
+    from upstream.streams import open_plugin_stream
+
+    timings = []
+    code = ""
+    for index in range(count):
+        started = time.perf_counter()
+        stream = await open_plugin_stream(client, "compass_plugins", make_payload("retired_plugin", index))
+        try:
+            frame, _ = stream.first_frame
+            code = frame["content"]["code"]
+        finally:
+            await stream.aclose()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, code
+
+
+async def run_streams(client, count: int) -> dict:
+    from config.service_resolver import ServiceResolverError
+    from upstream.stats import upstream_stats
+    from upstream.streams import UpstreamAttemptError, open_plugin_stream
+
+    retries_before = upstream_stats.retries
+
+    async def one(index: int) -> tuple[bool, float]:
+        started = time.perf_counter()
+        try:
+            stream = await open_plugin_stream(client, "sim_plugins", make_payload("slow", index))
+        except (UpstreamAttemptError, ServiceResolverError):
+            return False, time.perf_counter() - started
+        try:
+            async for _ in stream.iter_frames():
+                pass
+        finally:
+            await stream.aclose()
+        return True, time.perf_counter() - started
+
+    results = await asyncio.gather(*(one(index) for index in range(count)))
+    failed = [seconds for ok, seconds in results if not ok]
+    return {
+        "ok": sum(ok for ok, _ in results),
+        "failed": len(failed),
+        "failed_ms": statistics.median(failed) * 1000 if failed else 0.0,
+        "retries": upstream_stats.retries - retries_before,
+    }
+
+
+async def main_async(args: argparse.Namespace, replicas: list[FastAPI]) -> None:
+    from config.service_resolver import resolver
+    from upstream.client import upstream_client
+    from upstream.manifests import manifest_monitor
+    from upstream.streams import contract_version
+
+    upstream_client.open()
+    try:
+        async with upstream_client.session() as client:
+            before_ms, code = await unknown_plugin_round_trip(client, args.repeat)
+            before = await run_streams(client, args.streams)
+            rejected_before = sum(replica.state.rejected for replica in replicas)
+
+            counts = await manifest_monitor.refresh_all()
+            check(counts == {"ok": 3}, f"fetched 3 replica manifests: {counts}")
+
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                served = resolver.serves("compass_plugins", "retired_plugin")
+            after_us = (time.perf_counter() - started) / args.repeat * 1e6
+            after = await run_streams(client, args.streams)
+            rejected_after = sum(replica.state.rejected for replica in replicas) - rejected_before
+    finally:
+        await upstream_client.aclose()
+
+    print("unroutable plugin (service does not host it)")
+    print(f"      without manifest: {before_ms:8.2f} ms round trip, answered {code}")
+    print(f"      with manifest:    {after_us / 1000:8.4f} ms local check, routable={served}")
+    print(f"{args.streams} concurrent streams, replicas with room for {args.capacity_a} and {args.capacity_b}")
+    print(f"      {'':<18}{'ok':>4}{'failed':>8}{'503s':>6}{'retries':>9}{'failed after ms':>17}")
+    for label, result, rejected in (("without manifest", before, rejected_before), ("with manifest", after, rejected_after)):
+        print(f"      {label:<18}{result['ok']:4d}{result['failed']:8d}{rejected:6d}"
+              f"{result['retries']:9d}{result['failed_ms']:17.1f}")
+
+    capacity = args.capacity_a + args.capacity_b
+    check(code == "UNKNOWN_PLUGIN" and not served and resolver.serves("compass_plugins", "compass_assistant"),
+          "manifest hides the unhosted plugin and keeps the hosted ones")
+    check(after["ok"] == min(args.streams, capacity) and rejected_after == 0,
+          "with manifests every stream lands on a replica with room; no 503 round trips")
+    check(contract_version("sim_plugins") == "v1", "contract v2 is not requested from a v1-only service")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity-a", type=int, default=2)
+    parser.add_argument("--capacity-b", type=int, default=8)
+    parser.add_argument("--streams", type=int, default=12)
+    parser.add_argument("--stream-seconds", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    service_port, port_a, port_b = free_port(), free_port(), free_port()
+    os.environ.update({
+        "COMPASS_ENV": "DEV",
+        "PLUGIN_CONTRACT_VERSION": "v2",
+        "PLUGIN_STREAM_HEDGE_ENABLED": "false",
+        "SERVICE_URL_COMPASS_PLUGINS": f"http://127.0.0.1:{service_port}",
+        "SERVICE_URL_SIM_PLUGINS": f"http://127.0.0.1:{port_a},http://127.0.0.1:{port_b}",
+        # The plugin service's own warm-up is not under test.
+        "WARMUP_ENABLED": "false",
+    })
+    sys.path.insert(0, str(PLUGIN_SERVICE))
+    sys.path.insert(0, str(BACKEND_SRC))
+    from app.main import app as plugin_service
+
+    replicas = [build_replica(args.capacity_a, args.stream_seconds), build_replica(args.capacity_b, args.stream_seconds)]
+    serve_in_thread(plugin_service, service_port, "plugin-service")
+    serve_in_thread(replicas[0], port_a, "replica-a")
+    serve_in_thread(replicas[1], port_b, "replica-b")
+    asyncio.run(main_async(args, replicas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Plugin service vector search against the installed Databricks SDK.
+
+Drives `VectorSearchService` with a real `VectorSearchIndex` from the
+installed databricks-vectorsearch package. Only its HTTP call is replaced,
+by one that answers in the query API's response shape (manifest next to
+result), so argument checks and request building are the SDK's own. Checks
+that:
+  - warm-up priming (WARMUP_PRIME_REQUESTS) passes the SDK's required
+    arguments and sends the configured columns
+  - a search sends the plugin_id filter and turns the rows into citations
+    (a search that fails is swallowed and returns none)
+
+Run from compass/backend:
+    python benchmarks/bench_vector_search.py
+"""
+
+import contextlib
+import io
+import logging
+import os
+import sys
+import warnings
+from pathlib import Path
+
+PLUGIN_SERVICE = Path(__file__).resolve().parents[3] / "compass_plugins" / "service"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_databricks_pool import check  # noqa: E402
+
+WORKSPACE = "https://bench.cloud.databricks.com"
+INDEX = "main.compass.bench_index"
+
+
+def make_index(calls: list[dict]):
+    from databricks.vector_search.index import VectorSearchIndex
+
+    # The constructor prints a notice about token authentication.
+    with contextlib.redirect_stdout(io.StringIO()):
+        index = VectorSearchIndex(
+            workspace_url=WORKSPACE,
+            index_url=f"{WORKSPACE}/api/2.0/vector-search/indexes/{INDEX}",
+            name=INDEX,
+            endpoint_name="bench",
+            personal_access_token="bench-token",
+        )
+
+    def issue_request(**request):
+        calls.append(request)
+        columns = request["json"]["columns"] + ["score"]
+        row = {"chunk_text": "Compass routes chats to plugins.", "source": "compass.md", "score": 0.87}
+        return {
+            "manifest": {"column_count": len(columns), "columns": [{"name": name} for name in columns]},
+            "result": {"row_count": 1, "data_array": [[row.get(name) for name in columns]]},
+        }
+
+    index._issue_request = issue_request
+    index.describe = lambda: {"status": {"ready": True, "detailed_state": "ONLINE"}}
+    return index
+
+
+class BenchClient:
+    """Stands in for VectorSearchClient; `get_index` is the only call the service makes."""
+
+    def __init__(self, index) -> None:
+        self._index = index
+
+    def get_index(self, endpoint_name: str, index_name: str):
+        return self._index
+
+
+def main() -> None:
+    os.environ.update({
+        "DATABRICKS_HOST": WORKSPACE,
+        "DATABRICKS_TOKEN": "bench-token",
+        "DATABRICKS_VECTOR_SEARCH_ENDPOINT": "bench",
+        "DATABRICKS_VECTOR_SEARCH_INDEX": INDEX,
+        "VECTOR_SEARCH_COLUMNS": "chunk_text,source",
+    })
+    # The SDK announces its rename on import; not under test.
+    warnings.simplefilter("ignore", DeprecationWarning)
+    logging.disable(logging.INFO)
+    sys.path.insert(0, str(PLUGIN_SERVICE))
+    from app.services.vector_search import VectorSearchService
+
+    calls: list[dict] = []
+    service = VectorSearchService()
+    service._client = BenchClient(make_index(calls))
+
+    state = service.warm(prime=True)
+    check(state == {"index": INDEX, "state": "ONLINE"} and len(calls) == 1, "warm-up primes the index with one query")
+    check(calls[0]["json"]["columns"] == ["chunk_text", "source"] and calls[0]["json"]["num_results"] == 1,
+          "priming sends VECTOR_SEARCH_COLUMNS and asks for one result")
+
+    citations = service.search("how are chats routed?", "document_search_assistant")
+    check(len(citations) == 1 and citations[0]["source"] == "compass.md" and citations[0]["similarity"] == 0.87,
+          "a search returns the hit as a citation")
+    check(calls[-1]["json"]["filters_json"] == '{"plugin_id": "document_search_assistant"}',
+          "a search filters on plugin_id")
+
+
+if __name__ == "__main__":
+    main()
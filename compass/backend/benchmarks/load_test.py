@@ -0,0 +1,390 @@
+"""
+Hub load test against a simulated plugin service.
+
+Starts, in one process:
+  - a simulated plugin service (uvicorn, own thread) with configurable
+    time-to-first-token, tokens/sec, frame size and error rate
+  - the Hub app (uvicorn, own thread) with PLUGIN_REGISTRY_SOURCE=local,
+    a generated one-plugin registry and an in-memory stand-in for Redis
+and then drives N concurrent `/chats/new/stream` clients over real sockets.
+
+Reports throughput, p50/p95/p99 time-to-first-frame and total stream time,
+per-frame Hub overhead and RSS. Per-frame overhead is the time between the
+first and last frame minus the simulated token interval, divided by the
+frames after the first, averaged over successful streams; time-to-first-frame
+overhead is reported separately as TTFF minus the simulated TTFT.
+
+All three parties share one process and CPU, so absolute numbers are a lower
+bound on capacity; compare runs made with the same flags on the same machine.
+
+Run from compass/backend:
+    python benchmarks/load_test.py [--concurrency 50] [--requests 500] \\
+        [--ttft-ms 200] [--tokens 200] [--tokens-per-sec 50] [--frame-bytes 8] \\
+        [--error-rate 0.0] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+BACKEND_SRC = Path(__file__).resolve().parents[1] / "src"
+SERVICE_KEY = "bench_plugins"
+PLUGIN_ID = "bench_assistant"
+WORKSPACE_ID = "general"
+
+
+# ==========================================================================
+# Simulated plugin service
+# ==========================================================================
+
+
+def build_plugin_service(
+    ttft_seconds: float,
+    tokens: int,
+    tokens_per_sec: float,
+    frame_bytes: int,
+    error_rate: float,
+) -> FastAPI:
+    app = FastAPI()
+    token_text = ("x" * max(frame_bytes - 1, 0)) + " "
+    interval = 1.0 / tokens_per_sec if tokens_per_sec > 0 else 0.0
+
+    @app.get("/")
+    def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.post("/plugin/response")
+    async def plugin_response(request: Request):
+        await request.body()
+        if error_rate and random.random() < error_rate:
+            return JSONResponse({"detail": "simulated failure"}, status_code=503)
+
+        async def stream():
+            await asyncio.sleep(ttft_seconds)
+            line = json.dumps({"type": "llm", "content": token_text}) + "\n"
+            for index in range(tokens):
+                if index and interval:
+                    await asyncio.sleep(interval)
+                yield line
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+# ==========================================================================
+# Process helpers
+# ==========================================================================
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(app, port: int, name: str) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+    )
+    threading.Thread(target=server.run, name=name, daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{name} did not start on port {port}")
+        time.sleep(0.05)
+    return server
+
+
+def _proc_status_mb(field: str) -> float | None:
+    try:
+        with open("/proc/self/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024  # kB
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _maxrss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / 1_048_576 if sys.platform == "darwin" else peak / 1024
+
+
+# Current and peak RSS come from the same source (/proc VmRSS/VmHWM, else
+# ru_maxrss for both) so the peak is never reported below the current value.
+def rss_mb() -> float:
+    current = _proc_status_mb("VmRSS")
+    return _maxrss_mb() if current is None else current
+
+
+def peak_rss_mb() -> float:
+    peak = _proc_status_mb("VmHWM")
+    return _maxrss_mb() if peak is None else peak
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=BACKEND_SRC,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bearer_token(user_email: str) -> str:
+    claims = base64.urlsafe_b64encode(json.dumps({"preferred_username": user_email}).encode()).decode()
+    return f"Bearer header.{claims.rstrip('=')}.signature"
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def write_registry(directory: Path) -> tuple[Path, Path]:
+    registry = directory / "plugins.bench.json"
+    registry.write_text(
+        json.dumps(
+            {
+                "plugins": [
+                    {
+                        "plugin_id": PLUGIN_ID,
+                        "plugin_name": "Bench Assistant",
+                        "workspace_id": WORKSPACE_ID,
+                        "workspace_name": "General",
+                        "service_key": SERVICE_KEY,
+                        "service_type": "external",
+                        "plugin_type": "general",
+                        "position": 1,
+                        "enabled": True,
+                    }
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    services = directory / "services.bench.json"
+    services.write_text(json.dumps({"services": []}), encoding="utf-8")
+    return registry, services
+
+
+class InMemorySessionStore:
+    """Stands in for the Redis session DB used for role lookups."""
+
+    def hget(self, name: str, key: str) -> str:
+        return "SuperAdmins"
+
+    def ping(self) -> bool:
+        return True
+
+
+# ==========================================================================
+# Driver
+# ==========================================================================
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    queue: asyncio.Queue,
+    headers: dict[str, str],
+    results: list[dict],
+) -> None:
+    while True:
+        try:
+            index = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        # Unique prompts so single-flight does not merge concurrent turns.
+        body = {
+            "workspace": WORKSPACE_ID,
+            "plugin": PLUGIN_ID,
+            "conversation": [{"role": "user", "content": f"load test request {index}"}],
+        }
+        started = time.perf_counter()
+        first_frame: float | None = None
+        frames = 0
+        errors = 0
+        status_code = 0
+        try:
+            async with client.stream("POST", "/chats/new/stream", json=body, headers=headers) as response:
+                status_code = response.status_code
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    if first_frame is None:
+                        first_frame = time.perf_counter() - started
+                    frames += 1
+                    if '"type": "error"' in line or '"type":"error"' in line:
+                        errors += 1
+        except httpx.HTTPError as exc:
+            results.append({"ok": False, "error": type(exc).__name__})
+            continue
+
+        results.append(
+            {
+                "ok": status_code == 200 and errors == 0 and frames > 0,
+                "status_code": status_code,
+                "ttff": first_frame,
+                "total": time.perf_counter() - started,
+                "frames": frames,
+            }
+        )
+
+
+async def drive(hub_url: str, concurrency: int, requests: int) -> tuple[list[dict], float, float]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(index)
+
+    headers = {"Authorization": bearer_token("loadtest@example.com")}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    timeout = httpx.Timeout(timeout=120.0)
+    results: list[dict] = []
+
+    async with httpx.AsyncClient(base_url=hub_url, limits=limits, timeout=timeout, trust_env=False) as client:
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        await asyncio.gather(*(run_client(client, queue, headers, results) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+
+    return results, wall, cpu
+
+
+def summarize(results: list[dict], wall: float, cpu: float, args: argparse.Namespace) -> dict:
+    ok = [row for row in results if row["ok"]]
+    ttff = [row["ttff"] * 1000 for row in ok if row["ttff"] is not None]
+    totals = [row["total"] * 1000 for row in ok]
+    frames = sum(row["frames"] for row in ok)
+
+    interval = 1 / args.tokens_per_sec if args.tokens_per_sec > 0 else 0.0
+    overheads = [
+        ((row["total"] - row["ttff"]) / (row["frames"] - 1) - interval) * 1_000_000
+        for row in ok
+        if row["frames"] > 1 and row["ttff"] is not None
+    ]
+
+    def pcts(values: list[float]) -> dict:
+        return {f"p{p}": percentile(values, p) for p in (50, 95, 99)}
+
+    return {
+        "requests": len(results),
+        "succeeded": len(ok),
+        "failed": len(results) - len(ok),
+        "wall_seconds": wall,
+        "process_cpu_seconds": cpu,
+        "throughput_rps": len(ok) / wall if wall else None,
+        "frames_per_second": frames / wall if wall else None,
+        "ttff_ms": pcts(ttff),
+        "ttff_overhead_ms": pcts([value - args.ttft_ms for value in ttff]),
+        "stream_total_ms": pcts(totals),
+        "per_frame_overhead_us": statistics.fmean(overheads) if overheads else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--ttft-ms", type=float, default=200.0)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="0 = as fast as possible")
+    parser.add_argument("--frame-bytes", type=int, default=8, help="characters of content per llm frame")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls answered 503")
+    parser.add_argument("--warmup", type=int, default=5, help="requests sent before measuring")
+    parser.add_argument("--json", type=Path, default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="compass-load-"))
+    registry_file, services_file = write_registry(workdir)
+    service_port, hub_port = free_port(), free_port()
+
+    os.environ.update(
+        {
+            "COMPASS_ENV": "DEV",
+            "PLUGIN_REGISTRY_SOURCE": "local",
+            "PLUGIN_REGISTRY_LOCAL_FILE": str(registry_file),
+            "PLUGIN_SERVICES_LOCAL_FILE": str(services_file),
+            f"SERVICE_URL_{SERVICE_KEY.upper()}": f"http://127.0.0.1:{service_port}",
+        }
+    )
+    sys.path.insert(0, str(BACKEND_SRC))
+
+    import main as hub_main  # noqa: E402 - settings read the environment at import
+    import routers.auth
+    import routers.debug_routes
+    import routers.plugin_routes
+
+    routers.auth.session_db = InMemorySessionStore()
+    routers.plugin_routes.session_db = InMemorySessionStore()
+    routers.debug_routes.session_db = InMemorySessionStore()
+
+    plugin_service = build_plugin_service(
+        ttft_seconds=args.ttft_ms / 1000,
+        tokens=args.tokens,
+        tokens_per_sec=args.tokens_per_sec,
+        frame_bytes=args.frame_bytes,
+        error_rate=args.error_rate,
+    )
+    serve_in_thread(plugin_service, service_port, "plugin-service")
+    serve_in_thread(hub_main.app, hub_port, "hub")
+    hub_url = f"http://127.0.0.1:{hub_port}"
+
+    rss_before = rss_mb()
+    if args.warmup:
+        asyncio.run(drive(hub_url, min(args.concurrency, args.warmup), args.warmup))
+    results, wall, cpu = asyncio.run(drive(hub_url, args.concurrency, args.requests))
+
+    report = {
+        "revision": git_revision(),
+        "config": {key: value for key, value in vars(args).items() if key != "json"},
+        "results": summarize(results, wall, cpu, args),
+        "rss_mb": {"before": rss_before, "after": rss_mb(), "peak": peak_rss_mb()},
+    }
+
+    summary = report["results"]
+    print(f"requests        {summary['succeeded']}/{summary['requests']} ok in {summary['wall_seconds']:.2f}s")
+    print(f"throughput      {summary['throughput_rps']:.1f} req/s, {summary['frames_per_second']:.0f} frames/s")
+    for key in ("ttff_ms", "stream_total_ms"):
+        row = summary[key]
+        if row["p50"] is not None:
+            print(f"{key:<16}p50 {row['p50']:.1f}  p95 {row['p95']:.1f}  p99 {row['p99']:.1f}")
+    if summary["per_frame_overhead_us"] is not None:
+        print(f"frame overhead  {summary['per_frame_overhead_us']:.1f} us/frame")
+    rss = report["rss_mb"]
+    print(f"rss             {rss['before']:.1f} -> {rss['after']:.1f} MB (peak {rss['peak']:.1f} MB)")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Lightweight file watching for runtime config files.
+
+Invokes a callback when the file's `(st_mtime_ns, st_size)` signature changes
+(including the file appearing or disappearing). Change detection uses
+`watchfiles` (inotify / FSEvents / kqueue) when it is installed, watching the
+parent directory so editors that save by rename are seen too; otherwise, or if
+the native watcher fails, the signature is polled on an interval.
+
+Callbacks are expected to build new state off to the side and swap it in
+atomically, so a failed reload leaves the previous state untouched.
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import watchfiles
+except ImportError:  # pragma: no cover - native watching is optional
+    watchfiles = None
+
+
+logger = logging.getLogger(__name__)
+
+FileSignature = Optional[tuple[int, int]]
+
+# Native events are coalesced for this long, so a save that truncates and
+# rewrites the file triggers one reload.
+NATIVE_DEBOUNCE_MS = 50
+
+
+def file_signature(path: Path) -> FileSignature:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class FileWatcher:
+    """Background watcher bound to one file and one reload callback."""
+
+    def __init__(
+        self,
+        path: Path,
+        on_change: Callable[[], None],
+        interval_seconds: float,
+        name: str,
+        native: bool = True,
+    ) -> None:
+        self._path = path
+        self._on_change = on_change
+        self._interval = interval_seconds
+        self._name = name
+        self._native = native
+        self._signature: FileSignature = None
+        self._task: asyncio.Task | None = None
+        self.mode: str | None = None  # "native" | "polling" while running
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._interval <= 0 or self._task is not None:
+            return
+        self._signature = file_signature(self._path)
+        native = self._native and watchfiles is not None and self._path.parent.is_dir()
+        self.mode = "native" if native else "polling"
+        self._task = asyncio.create_task(self._run(), name=f"file-watcher:{self._name}")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.mode = None
+
+    def poll(self) -> bool:
+        """Run the callback if the file changed since the last poll. Returns True on reload."""
+        signature = file_signature(self._path)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            self._on_change()
+        except Exception:
+            logger.exception("Reload of %s failed; keeping previous state", self._path)
+            return False
+        logger.info("Reloaded %s after file change", self._path)
+        return True
+
+    async def _run(self) -> None:
+        if self.mode == "native":
+            try:
+                await self._watch_native()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Native watch of %s failed; falling back to polling", self._path)
+        await self._watch_polling()
+
+    async def _watch_native(self) -> None:
+        name = self._path.name
+        # Catch a change made between start() and the watch being set up.
+        self.poll()
+        async for _ in watchfiles.awatch(
+            self._path.parent,
+            watch_filter=lambda _change, changed: Path(changed).name == name,
+            debounce=NATIVE_DEBOUNCE_MS,
+            recursive=False,
+        ):
+            self.poll()
+
+    async def _watch_polling(self) -> None:
+        self.mode = "polling"
+        while True:
+            await asyncio.sleep(self._interval)
+            self.poll()
@@ -1,7 +1,12 @@
 import json
 import os
+import random
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Iterable
 
+from config.file_watch import FileWatcher
 from config.settings import settings
 
 
@@ -9,6 +14,10 @@ class ServiceResolverError(ValueError):
     """Raised when a service_key cannot be resolved to a URL."""
 
 
+class NoAvailableEndpointError(ServiceResolverError):
+    """Raised when every replica of a service_key is ejected or failing health probes."""
+
+
 def _normalize_service_key(value: str) -> str:
     # Keep canonical key shape across env vars + files + registry values.
     return value.strip().lower().replace("-", "_")
@@ -19,49 +28,328 @@ def _resolve_path(raw_path: str) -> Path:
     return path if path.is_absolute() else (Path.cwd() / path)
 
 
+def _split_urls(raw: Any) -> list[str]:
+    """Accept a single URL, a comma-separated string, or a list of URLs."""
+    if isinstance(raw, (list, tuple)):
+        values = [str(item) for item in raw]
+    elif raw is None:
+        values = []
+    else:
+        values = str(raw).split(",")
+
+    urls: list[str] = []
+    for value in values:
+        url = value.strip()
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+@dataclass(frozen=True)
+class ServiceManifest:
+    """What a plugin service replica reports at GET /manifest (see upstream.manifests)."""
+
+    plugin_ids: frozenset[str]
+    contract_versions: tuple[str, ...]
+    features: frozenset[str]
+    # Streams per plugin one replica runs or queues (max_concurrency + max_queue);
+    # only for plugins whose handler the service has loaded.
+    capacities: dict[str, int] = field(default_factory=dict, hash=False)
+
+    @classmethod
+    def from_payload(cls, data: Any) -> "ServiceManifest":
+        """Parse a manifest response body; raises ValueError when it is malformed."""
+        if not isinstance(data, dict) or not isinstance(data.get("plugins"), dict):
+            raise ValueError("manifest must be an object with a 'plugins' object")
+        try:
+            capacities = {
+                str(plugin_id): int(limits.get("max_concurrency", 0)) + int(limits.get("max_queue", 0))
+                for plugin_id, limits in data["plugins"].items()
+                if isinstance(limits, dict)
+            }
+        except TypeError as exc:  # e.g. a null limit
+            raise ValueError(f"invalid plugin limits: {exc}") from exc
+        return cls(
+            plugin_ids=frozenset(str(plugin_id) for plugin_id in data["plugins"]),
+            contract_versions=tuple(str(version) for version in data.get("contract_versions") or ("v1",)),
+            features=frozenset(str(feature) for feature in data.get("features") or ()),
+            capacities=capacities,
+        )
+
+    def serves(self, plugin_id: str) -> bool:
+        return plugin_id in self.plugin_ids
+
+    def capacity(self, plugin_id: str) -> int | None:
+        return self.capacities.get(plugin_id)
+
+
+class ServiceEndpoint:
+    """
+    One replica URL behind a service_key.
+
+    Tracks outstanding streams for load balancing and a consecutive-failure
+    circuit breaker:
+      closed    -> routable
+      open      -> ejected until `service_breaker_reset_seconds` elapse
+      half_open -> one trial request is let through; success closes the
+                   breaker, failure re-opens it. `acquire` hands the trial
+                   caller a token and only that token's `release` /
+                   `record_*` frees the slot, so streams started before the
+                   breaker opened cannot admit a second trial.
+
+    Background health probes (see upstream.health) add an independent
+    up/down/unknown signal: a replica whose last probe failed is not routable
+    even while its breaker is closed, and a successful probe closes the breaker.
+
+    Once its manifest is known (see upstream.manifests), a replica is not
+    picked for a plugin whose streams from this worker already fill the
+    plugin's capacity there.
+    """
+
+    def __init__(self, service_key: str, url: str) -> None:
+        self.service_key = service_key
+        self.url = url
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._trial: object | None = None  # token of the half-open trial in flight
+
+        # Health probe state
+        self.health = "unknown"
+        self.latency_ms: float | None = None
+        self.probe_failures = 0
+        self.next_probe_at = 0.0
+
+        # Manifest state; None until fetched, or when the service has no manifest
+        self.manifest: ServiceManifest | None = None
+        self.plugin_outstanding: dict[str, int] = {}
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= settings.service_breaker_reset_seconds:
+            return "half_open"
+        return "open"
+
+    def is_available(self) -> bool:
+        if self.health == "down":
+            return False
+        state = self.state
+        if state == "closed":
+            return True
+        return state == "half_open" and self._trial is None
+
+    def has_room(self, plugin_id: str) -> bool:
+        if self.manifest is None or not plugin_id:
+            return True
+        capacity = self.manifest.capacity(plugin_id)
+        return capacity is None or self.plugin_outstanding.get(plugin_id, 0) < capacity
+
+    def acquire(self, plugin_id: str = "") -> object | None:
+        """Count a stream on this replica; returns a token when it is the half-open trial."""
+        trial = None
+        if self.state == "half_open" and self._trial is None:
+            trial = self._trial = object()
+        self.outstanding += 1
+        if plugin_id:
+            self.plugin_outstanding[plugin_id] = self.plugin_outstanding.get(plugin_id, 0) + 1
+        return trial
+
+    def release(self, plugin_id: str = "", trial: object | None = None) -> None:
+        self.outstanding = max(self.outstanding - 1, 0)
+        self._end_trial(trial)
+        if plugin_id:
+            remaining = self.plugin_outstanding.get(plugin_id, 0) - 1
+            if remaining > 0:
+                self.plugin_outstanding[plugin_id] = remaining
+            else:
+                self.plugin_outstanding.pop(plugin_id, None)
+
+    def record_success(self, trial: object | None = None) -> None:
+        self.consecutive_failures = 0
+        self._opened_at = None
+        self._end_trial(trial)
+
+    def record_failure(self, trial: object | None = None) -> None:
+        self.consecutive_failures += 1
+        was_trial = self._end_trial(trial)
+        if was_trial or self.consecutive_failures >= settings.service_breaker_failure_threshold:
+            self._opened_at = time.monotonic()
+
+    def _end_trial(self, trial: object | None) -> bool:
+        """Free the trial slot if `trial` still holds it; a stale or missing token is ignored."""
+        if trial is None or trial is not self._trial:
+            return False
+        self._trial = None
+        return True
+
+    def mark_up(self, latency_ms: float) -> None:
+        self.health = "up"
+        self.latency_ms = latency_ms
+        self.probe_failures = 0
+        self.record_success()
+
+    def mark_down(self) -> None:
+        self.health = "down"
+        self.latency_ms = None
+        self.probe_failures += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "health": self.health,
+            "latency_ms": self.latency_ms,
+            "state": self.state,
+            "outstanding": self.outstanding,
+            "consecutive_failures": self.consecutive_failures,
+            "manifest": None if self.manifest is None else sorted(self.manifest.plugin_ids),
+        }
+
+
 class ServiceResolver:
     """
-    Resolves service_key -> service_url.
+    Resolves service_key -> one or more replica endpoints.
 
     Precedence:
-    1) SERVICE_URL_* env vars
-    2) PLUGIN_SERVICES_LOCAL_FILE (DEV only)
+    1) SERVICE_URL_* env vars (comma-separated for multiple replicas)
+    2) PLUGIN_SERVICES_LOCAL_FILE (DEV only; `service_url` may be a list)
     3) unresolved (raises)
+
+    `pick` chooses a replica by least outstanding streams (or power-of-two
+    choices) among endpoints whose circuit breaker is not open.
+
+    `reload` builds the new mapping off to the side and swaps it in with a
+    single assignment, so lookups never take a lock. Endpoints whose URL is
+    unchanged are carried over, keeping their outstanding counts, breaker and
+    health state; in-flight streams keep the endpoint they already hold.
     """
 
     def __init__(self) -> None:
-        self._map: dict[str, str] = {}
+        self._map: dict[str, tuple[ServiceEndpoint, ...]] = {}
         self.reload()
 
-    def reload(self) -> None:
-        self._map = {}
+    def reload(self) -> dict[str, list[str]]:
+        urls: dict[str, list[str]] = {}
 
         # DEV can load local file mapping first.
         if settings.is_dev:
-            self._load_dev_file()
+            self._load_dev_file(urls)
 
         # Env vars always win.
-        self._load_env_overrides()
+        self._load_env_overrides(urls)
+
+        previous = self._map
+        new_map: dict[str, tuple[ServiceEndpoint, ...]] = {}
+        for key, key_urls in urls.items():
+            existing = {endpoint.url: endpoint for endpoint in previous.get(key, ())}
+            new_map[key] = tuple(existing.get(url) or ServiceEndpoint(key, url) for url in key_urls)
+
+        self._map = new_map
+        return self.mapping()
+
+    def watcher(self) -> FileWatcher:
+        """
+        Poll PLUGIN_SERVICES_LOCAL_FILE (DEV only) and reload on change.
+
+        Every worker process runs its own watcher, so file edits converge
+        across workers without an admin call per worker.
+        """
+        interval = settings.plugin_services_watch_interval_seconds if settings.is_dev else 0
+        return FileWatcher(
+            path=_resolve_path(settings.plugin_services_local_file),
+            on_change=self.reload,
+            interval_seconds=interval,
+            name="plugin-services",
+        )
 
     def resolve(self, service_key: str) -> str:
+        return self.pick(service_key).url
+
+    def endpoints(self, service_key: str) -> tuple[ServiceEndpoint, ...]:
         normalized = _normalize_service_key(service_key)
-        url = self._map.get(normalized)
-        if not url:
+        endpoints = self._map.get(normalized)
+        if not endpoints:
             raise ServiceResolverError(
                 f"No URL configured for service_key='{service_key}' "
                 f"(COMPASS_ENV={settings.compass_env})."
             )
-        return url
+        return endpoints
+
+    def pick(
+        self,
+        service_key: str,
+        exclude: Iterable[ServiceEndpoint] = (),
+        plugin_id: str = "",
+    ) -> ServiceEndpoint:
+        """Choose a replica for a new stream. Callers must `acquire`/`release` it."""
+        excluded = set(exclude)
+        candidates = [
+            endpoint
+            for endpoint in self.endpoints(service_key)
+            if endpoint not in excluded and endpoint.is_available()
+        ]
+        if not candidates:
+            raise NoAvailableEndpointError(
+                f"All replicas for service_key='{service_key}' are unavailable."
+            )
+        if plugin_id:
+            candidates = [endpoint for endpoint in candidates if endpoint.has_room(plugin_id)]
+            if not candidates:
+                raise NoAvailableEndpointError(
+                    f"All replicas for service_key='{service_key}' are at capacity for plugin '{plugin_id}'."
+                )
+        if len(candidates) == 1:
+            return candidates[0]
+
+        if settings.service_balancer_strategy == "power_of_two":
+            first, second = random.sample(candidates, 2)
+            return first if first.outstanding <= second.outstanding else second
+
+        # Shuffle so ties do not always land on the first configured replica.
+        random.shuffle(candidates)
+        return min(candidates, key=lambda endpoint: endpoint.outstanding)
 
     def is_configured(self, service_key: str | None) -> bool:
         if not service_key:
             return False
         return _normalize_service_key(service_key) in self._map
 
-    def mapping(self) -> dict[str, str]:
-        return dict(self._map)
+    def has_available(self, service_key: str | None) -> bool:
+        if not service_key:
+            return False
+        endpoints = self._map.get(_normalize_service_key(service_key), ())
+        return any(endpoint.is_available() for endpoint in endpoints)
+
+    def serves(self, service_key: str | None, plugin_id: str) -> bool:
+        """
+        False only when every replica's manifest leaves `plugin_id` out.
 
-    def _load_dev_file(self) -> None:
+        A replica without a manifest (not fetched yet, or an older service)
+        may serve anything, so it keeps the plugin routable.
+        """
+        if not service_key:
+            return False
+        endpoints = self._map.get(_normalize_service_key(service_key), ())
+        return any(endpoint.manifest is None or endpoint.manifest.serves(plugin_id) for endpoint in endpoints)
+
+    def supports_contract(self, service_key: str | None, version: str) -> bool:
+        """True unless a replica's manifest says it does not speak `version`."""
+        if not service_key:
+            return False
+        endpoints = self._map.get(_normalize_service_key(service_key), ())
+        return all(
+            endpoint.manifest is None or version in endpoint.manifest.contract_versions
+            for endpoint in endpoints
+        )
+
+    def all_endpoints(self) -> list[ServiceEndpoint]:
+        return [endpoint for endpoints in self._map.values() for endpoint in endpoints]
+
+    def mapping(self) -> dict[str, list[str]]:
+        return {key: [endpoint.url for endpoint in endpoints] for key, endpoints in self._map.items()}
+
+    def _load_dev_file(self, urls: dict[str, list[str]]) -> None:
         services_path = _resolve_path(settings.plugin_services_local_file)
         if not services_path.exists():
             return
@@ -73,6 +361,11 @@ class ServiceResolver:
                 f"Invalid JSON in PLUGIN_SERVICES_LOCAL_FILE: {services_path}"
             ) from exc
 
+        if not isinstance(data, dict):
+            raise RuntimeError(
+                f"Invalid services config in {services_path}: expected a JSON object."
+            )
+
         services = data.get("services", [])
         if not isinstance(services, list):
             raise RuntimeError(
@@ -83,21 +376,23 @@ class ServiceResolver:
             if not isinstance(item, dict):
                 continue
             raw_key = str(item.get("service_key", "")).strip()
-            raw_url = str(item.get("service_url", "")).strip()
-            if not raw_key or not raw_url:
+            item_urls = _split_urls(item.get("service_urls") or item.get("service_url"))
+            if not raw_key or not item_urls:
                 continue
-            self._map[_normalize_service_key(raw_key)] = raw_url
+            urls[_normalize_service_key(raw_key)] = item_urls
 
-    def _load_env_overrides(self) -> None:
+    def _load_env_overrides(self, urls: dict[str, list[str]]) -> None:
         prefix = "SERVICE_URL_"
         for env_name, env_value in os.environ.items():
             if not env_name.startswith(prefix):
                 continue
-            if not env_value.strip():
+            env_urls = _split_urls(env_value)
+            if not env_urls:
                 continue
             # SERVICE_URL_COMPASS_PLUGINS -> compass_plugins
             key = _normalize_service_key(env_name[len(prefix):])
-            self._map[key] = env_value.strip()
+            urls[key] = env_urls
 
 
 resolver = ServiceResolver()
+services_watcher = resolver.watcher()
@@ -7,6 +7,10 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 CompassEnv = Literal["DEV", "STAGING", "PROD"]
 PluginRegistrySource = Literal["local", "databricks", "overlay"]
+ServiceBalancerStrategy = Literal["least_outstanding", "power_of_two"]
+PluginContractVersion = Literal["v1", "v2"]
+RegistrySyncMode = Literal["full", "delta"]
+TracingExporter = Literal["jsonl", "otlp"]
 
 
 class Settings(BaseSettings):
@@ -21,7 +25,9 @@ class Settings(BaseSettings):
     # DEV-only plugin registry source switch
     plugin_registry_source: PluginRegistrySource = "databricks"
     plugin_services_local_file: str = "./services.local.json"
+    plugin_services_watch_interval_seconds: float = 2.0  # 0 disables hot reload
     plugin_registry_local_file: str = "./plugins.local.json"
+    plugin_registry_local_watch_interval_seconds: float = 1.0  # 0: stat the file on every read
 
     # CORS
     frontend_url: str = "http://localhost:3000"
@@ -38,8 +44,86 @@ class Settings(BaseSettings):
     databricks_token: str = ""
     databricks_plugins_table: str = "devctzndsa.compass.plugin_registry"
 
+    # Registry cache refresh: "delta" fetches rows with updated_at > watermark and
+    # falls back to a full reconciliation (catches deletes) once per interval.
+    plugin_registry_sync_mode: RegistrySyncMode = "delta"
+    plugin_registry_full_sync_interval_seconds: float = 3600.0
+    plugin_config_bulk_max_items: int = 500
+
+    # Background refresh of the registry cache (stale-while-revalidate)
+    plugin_registry_refresh_enabled: bool = True
+    plugin_registry_refresh_interval_seconds: float = 30.0
+    plugin_registry_max_staleness_seconds: float = 300.0
+
+    # Registry snapshot shared by the workers of a node (memory-mapped file)
+    plugin_registry_shared_snapshot_dir: str = ""  # e.g. /dev/shm/compass; empty: one snapshot per worker
+
+    # Persistent Databricks SQL connections shared by registry reads and writes
+    databricks_pool_max_size: int = 4
+    databricks_pool_acquire_timeout_seconds: float = 10.0
+    databricks_pool_max_idle_seconds: float = 300.0
+    databricks_pool_max_lifetime_seconds: float = 1800.0
+    databricks_pool_health_check_after_seconds: float = 30.0
+    databricks_pool_warm_connections: int = 1  # opened during startup warm-up
+
+    # Startup warm-up; GET /ready answers 503 until Redis and the registry are warm
+    hub_warmup_enabled: bool = True
+    hub_warmup_step_timeout_seconds: float = 60.0
+    hub_warmup_retry_seconds: float = 5.0
+
     # Proxy behavior
     plugin_stream_connect_timeout_seconds: float = 10.0
+    # One shared HTTP client per worker for plugin streams and health probes
+    upstream_max_keepalive_connections: int = 100
+    upstream_keepalive_expiry_seconds: float = 30.0
+    # v2 asks services for length-prefixed MessagePack frames (NDJSON fallback).
+    plugin_contract_version: PluginContractVersion = "v1"
+    # Retries and hedges happen only before the first frame reaches the client.
+    plugin_stream_max_retries: int = 2
+    plugin_stream_retry_backoff_seconds: float = 0.1
+    plugin_stream_hedge_enabled: bool = False
+    plugin_stream_hedge_quantile: float = 0.95
+    plugin_stream_hedge_min_delay_seconds: float = 0.5
+    plugin_stream_hedge_default_delay_seconds: float = 2.0
+
+    # Resumable chat streams (per-request frame buffers, per worker)
+    stream_buffer_max_frames: int = 10000
+    stream_buffer_max_bytes: int = 8 * 1024 * 1024
+    stream_buffer_max_streams: int = 1000
+    stream_buffer_ttl_seconds: float = 300.0
+    chat_single_flight_enabled: bool = True
+
+    # Service replica balancing (service_key -> many URLs)
+    service_balancer_strategy: ServiceBalancerStrategy = "least_outstanding"
+    service_breaker_failure_threshold: int = 3
+    service_breaker_reset_seconds: float = 15.0
+
+    # Background health probing of plugin service replicas
+    service_health_enabled: bool = True
+    service_health_path: str = "/ready"
+    service_health_interval_seconds: float = 10.0
+    service_health_timeout_seconds: float = 2.0
+    service_health_max_backoff_seconds: float = 60.0
+
+    # Plugin service manifests (served plugin_ids, contract versions, per-plugin capacity)
+    service_manifest_enabled: bool = True
+    service_manifest_path: str = "/manifest"
+    service_manifest_refresh_seconds: float = 60.0
+
+    # Prometheus text exposition at GET /metrics
+    metrics_enabled: bool = True
+
+    # Request tracing (W3C traceparent propagated to plugin services)
+    tracing_enabled: bool = False
+    tracing_sample_ratio: float = 0.05
+    tracing_exporter: TracingExporter = "jsonl"
+    tracing_jsonl_path: str = "./traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_export_interval_seconds: float = 1.0
+
+    # Superadmin profiling endpoints (/debug); not mounted unless enabled
+    debug_endpoints_enabled: bool = False
+    debug_profile_max_seconds: float = 60.0
 
     model_config = SettingsConfigDict(
         env_file=Path(__file__).parent.parent.parent.parent / ".env",
@@ -61,6 +145,31 @@ class Settings(BaseSettings):
     def normalize_registry_source(cls, value: str) -> str:
         return str(value).strip().lower()
 
+    @field_validator("service_balancer_strategy", mode="before")
+    @classmethod
+    def normalize_balancer_strategy(cls, value: str) -> str:
+        return str(value).strip().lower()
+
+    @field_validator("plugin_registry_sync_mode", mode="before")
+    @classmethod
+    def normalize_registry_sync_mode(cls, value: str) -> str:
+        return str(value).strip().lower()
+
+    @field_validator("tracing_exporter", mode="before")
+    @classmethod
+    def normalize_tracing_exporter(cls, value: str) -> str:
+        return str(value).strip().lower()
+
+    @field_validator("tracing_sample_ratio")
+    @classmethod
+    def clamp_sample_ratio(cls, value: float) -> float:
+        return max(0.0, min(value, 1.0))
+
+    @field_validator("service_health_path")
+    @classmethod
+    def normalize_health_path(cls, value: str) -> str:
+        return "/" + str(value).strip().lstrip("/")
+
     @model_validator(mode="after")
     def validate_environment_contract(self) -> "Settings":
         """
@@ -0,0 +1,230 @@
+"""
+Bounded pool of persistent Databricks SQL connections.
+
+Opening a `databricks.sql` connection is a full HTTP session handshake, so
+the registry keeps a few connections open and hands them out per call.
+Connections are checked when they are handed out:
+
+  - older than `max_lifetime_seconds`          -> closed, a fresh one is opened
+  - idle longer than `max_idle_seconds`        -> closed (also swept on release)
+  - idle longer than `health_check_after_seconds` -> `SELECT 1` before reuse
+
+A call that fails on a reused connection with one of `stale_errors` is
+retried once on a freshly opened connection; the failed one is discarded.
+Other errors (bad SQL, permissions) are raised unchanged and the connection
+is returned to the pool.
+
+The pool is thread-safe, so registry calls may also run in worker threads
+(asyncio.to_thread). The `SELECT 1` check and connection handshakes run
+outside the lock.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, TypeVar
+
+from observability.metrics import databricks_pool_acquire_seconds, databricks_pool_events_total
+
+
+T = TypeVar("T")
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection frees up within the acquire timeout."""
+
+
+@dataclass
+class _PooledConnection:
+    raw: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+    reused: bool = False
+
+
+class DatabricksConnectionPool:
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = 4,
+        acquire_timeout_seconds: float = 10.0,
+        max_idle_seconds: float = 300.0,
+        max_lifetime_seconds: float = 1800.0,
+        health_check_after_seconds: float = 30.0,
+        stale_errors: tuple[type[BaseException], ...] = (ConnectionError,),
+    ) -> None:
+        self._connect = connect
+        self._max_size = max(1, max_size)
+        self._acquire_timeout = acquire_timeout_seconds
+        self._max_idle = max_idle_seconds
+        self._max_lifetime = max_lifetime_seconds
+        self._health_check_after = health_check_after_seconds
+        self._stale_errors = stale_errors
+
+        self._idle: list[_PooledConnection] = []  # most recently used last
+        self._in_use = 0
+        self._closed = False
+        self._lock = threading.Condition()
+
+    # ======================================================================
+    # PUBLIC
+    # ======================================================================
+
+    def run(self, fn: Callable[[Any], T]) -> T:
+        """Call `fn(connection)`, retrying once on a fresh connection if a reused one is stale."""
+        pooled = self._acquire(fresh=False)
+        try:
+            return self._call(pooled, fn)
+        except self._stale_errors:
+            if not pooled.reused:
+                raise
+        databricks_pool_events_total.labels("retried").inc()
+        return self._call(self._acquire(fresh=True), fn)
+
+    def warm(self, count: int = 1) -> int:
+        """Open connections up to `count` (capped at max_size) ahead of use; returns how many were opened."""
+        opened = 0
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + self._in_use >= min(count, self._max_size):
+                    return opened
+                self._in_use += 1
+            try:
+                pooled = _PooledConnection(raw=self._connect())
+            except BaseException:
+                with self._lock:
+                    self._in_use -= 1
+                    self._lock.notify()
+                raise
+            databricks_pool_events_total.labels("opened").inc()
+            self._release(pooled)
+            opened += 1
+
+    def close(self) -> None:
+        """Close idle connections; connections in use are closed when released."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._closed = True
+        for pooled in idle:
+            self._close(pooled, "shutdown")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"idle": len(self._idle), "in_use": self._in_use, "max_size": self._max_size}
+
+    # ======================================================================
+    # PRIVATE
+    # ======================================================================
+
+    def _call(self, pooled: _PooledConnection, fn: Callable[[Any], T]) -> T:
+        try:
+            result = fn(pooled.raw)
+        except self._stale_errors:
+            self._discard(pooled, "stale")
+            raise
+        except BaseException:
+            self._release(pooled)
+            raise
+        self._release(pooled)
+        return result
+
+    def _acquire(self, fresh: bool) -> _PooledConnection:
+        started = time.perf_counter()
+        deadline = time.monotonic() + self._acquire_timeout
+        with self._lock:
+            while self._in_use >= self._max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No Databricks connection free within {self._acquire_timeout:.1f}s "
+                        f"(pool size {self._max_size})"
+                    )
+                self._lock.wait(remaining)
+            self._in_use += 1
+
+        try:
+            pooled = None if fresh else self._pop_usable()
+            if pooled is None:
+                pooled = _PooledConnection(raw=self._connect())
+                databricks_pool_events_total.labels("opened").inc()
+            else:
+                pooled.reused = True
+                databricks_pool_events_total.labels("reused").inc()
+        except BaseException:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+        finally:
+            databricks_pool_acquire_seconds.observe(time.perf_counter() - started)
+        return pooled
+
+    def _pop_usable(self) -> _PooledConnection | None:
+        """Most recently used idle connection that passes the age and health checks."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                pooled = self._idle.pop()
+
+            now = time.monotonic()
+            if now - pooled.created_at >= self._max_lifetime:
+                self._close(pooled, "lifetime")
+            elif now - pooled.last_used_at >= self._max_idle:
+                self._close(pooled, "idle")
+            elif now - pooled.last_used_at >= self._health_check_after and not self._is_healthy(pooled):
+                self._close(pooled, "unhealthy")
+            else:
+                return pooled
+
+    def _release(self, pooled: _PooledConnection) -> None:
+        now = time.monotonic()
+        pooled.last_used_at = now
+        expired: list[tuple[_PooledConnection, str]] = []
+        with self._lock:
+            self._in_use -= 1
+            if self._closed:
+                expired.append((pooled, "shutdown"))
+            elif now - pooled.created_at >= self._max_lifetime:
+                expired.append((pooled, "lifetime"))
+            else:
+                self._idle.append(pooled)
+            # The idle list is ordered by last use, so the front holds the
+            # longest-idle connections; a retry's extra connection can also
+            # push the pool over max_size.
+            while self._idle and (
+                now - self._idle[0].last_used_at >= self._max_idle
+                or len(self._idle) + self._in_use > self._max_size
+            ):
+                expired.append((self._idle.pop(0), "idle"))
+            self._lock.notify()
+
+        for stale, reason in expired:
+            self._close(stale, reason)
+
+    def _discard(self, pooled: _PooledConnection, reason: str) -> None:
+        with self._lock:
+            self._in_use -= 1
+            self._lock.notify()
+        self._close(pooled, reason)
+
+    @staticmethod
+    def _is_healthy(pooled: _PooledConnection) -> bool:
+        try:
+            cursor = pooled.raw.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def _close(pooled: _PooledConnection, reason: str) -> None:
+        databricks_pool_events_total.labels(f"closed_{reason}").inc()
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
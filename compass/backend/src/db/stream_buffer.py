@@ -0,0 +1,257 @@
+"""
+Per-request frame buffers for resumable chat streams.
+
+The Hub pumps each upstream plugin stream into a StreamBuffer owned by a
+background task, and HTTP responses subscribe to the buffer from a frame
+offset. A dropped browser connection therefore does not cancel the upstream
+generation, and a reconnect replays buffered frames and then tails the live
+stream instead of paying for a second LLM call.
+
+Frame sequence numbers are positional: the n-th NDJSON line of a stream has
+sequence number n (zero-based), so a client resumes with the count of lines
+it has already received.
+
+Buffers are also the fan-out point for single-flight deduplication: an
+identical request arriving while a stream is in flight (double-click, client
+retry, re-render) subscribes to the existing buffer instead of starting a
+second upstream generation.
+
+Buffers are in-process: a resume must reach the worker that served the
+original request. Each keeps at most STREAM_BUFFER_MAX_FRAMES frames and
+STREAM_BUFFER_MAX_BYTES bytes, dropping the oldest first.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Coroutine, Optional
+
+from config.settings import settings
+from observability.metrics import CallbackMetric, registry
+from schemas.frames import ErrorFrame
+
+
+class StreamGapError(LookupError):
+    """Raised when a resume offset falls before the frames still retained."""
+
+
+class StreamBuffer:
+    """Frames forwarded for one request_id, shared by the producer and subscribers."""
+
+    def __init__(
+        self,
+        request_id: str,
+        conversation_id: str,
+        user_email: str,
+        dedupe_key: str | None = None,
+    ) -> None:
+        self.request_id = request_id
+        self.conversation_id = conversation_id
+        self.user_email = user_email
+        self.dedupe_key = dedupe_key
+        self.task: asyncio.Task | None = None
+        self.done = False
+        self.finished_at: float | None = None
+        # Set by the store to learn when the buffer finishes.
+        self.on_close: Callable[["StreamBuffer"], None] | None = None
+
+        self._frames: list[str] = []
+        self._sizes: list[int] = []
+        self._bytes = 0
+        self._first_seq = 0
+        self._changed = asyncio.Event()
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest frame still retained."""
+        return self._first_seq
+
+    @property
+    def next_seq(self) -> int:
+        return self._first_seq + len(self._frames)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def append(self, frame: str, size: int | None = None) -> None:
+        """Add a frame; `size` is its UTF-8 length when the caller already has it."""
+        if size is None:
+            size = len(frame.encode("utf-8"))
+        self._frames.append(frame)
+        self._sizes.append(size)
+        self._bytes += size
+
+        drop = max(len(self._frames) - settings.stream_buffer_max_frames, 0)
+        kept_bytes = self._bytes - sum(self._sizes[:drop])
+        # The newest frame is always kept, even when it alone exceeds the byte cap.
+        while kept_bytes > settings.stream_buffer_max_bytes and drop < len(self._frames) - 1:
+            kept_bytes -= self._sizes[drop]
+            drop += 1
+        if drop:
+            del self._frames[:drop]
+            del self._sizes[:drop]
+            self._bytes = kept_bytes
+            self._first_seq += drop
+        self._notify()
+
+    def close(self) -> None:
+        if self.done:
+            return
+        self.done = True
+        self.finished_at = time.monotonic()
+        self._notify()
+        if self.on_close is not None:
+            self.on_close(self)
+
+    async def subscribe(self, offset: int = 0) -> AsyncIterator[str]:
+        """Replay frames from `offset`, then tail until the producer closes the buffer."""
+        if offset < self._first_seq:
+            raise StreamGapError(
+                f"Frames before offset {self._first_seq} are no longer buffered "
+                f"for request {self.request_id}."
+            )
+
+        seq = offset
+        while True:
+            changed = self._changed
+            if seq < self._first_seq:
+                # Fell behind the retention window while waiting. End with an
+                # error frame rather than skipping frames or ending cleanly, so
+                # the client can tell the answer is incomplete.
+                yield ErrorFrame(
+                    content={
+                        "code": "STREAM_GAP",
+                        "message": "The client fell behind the buffered stream; frames were dropped.",
+                        "retryable": True,
+                        "details": {
+                            "request_id": self.request_id,
+                            "offset": seq,
+                            "first_seq": self._first_seq,
+                        },
+                    }
+                ).serialize()
+                return
+            index = seq - self._first_seq
+            if index < len(self._frames):
+                batch = self._frames[index:]
+                seq += len(batch)
+                for frame in batch:
+                    yield frame
+                continue
+            if self.done:
+                return
+            await changed.wait()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class StreamBufferStore:
+    """
+    Bounded in-memory registry of stream buffers keyed by request_id.
+
+    Finished buffers expire after `stream_buffer_ttl_seconds`; when more than
+    `stream_buffer_max_streams` are held, the oldest finished ones go first.
+    Finished buffers are kept in finish order, so eviction pops from the
+    front and stops at the first one to keep.
+    In-flight buffers are also indexed by dedupe key for single-flight joins.
+
+    The store runs each buffer's producer task (`run`) and cancels the ones
+    still running on `shutdown`, closing their upstream streams.
+    """
+
+    def __init__(self) -> None:
+        self._buffers: dict[str, StreamBuffer] = {}
+        self._finished: OrderedDict[str, StreamBuffer] = OrderedDict()
+        self._inflight: dict[str, StreamBuffer] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.single_flight_hits = 0
+
+    def create(
+        self,
+        request_id: str,
+        conversation_id: str,
+        user_email: str,
+        dedupe_key: str | None = None,
+    ) -> StreamBuffer:
+        self._evict()
+        buffer = StreamBuffer(request_id, conversation_id, user_email, dedupe_key)
+        buffer.on_close = self._on_close
+        self._buffers[request_id] = buffer
+        if dedupe_key is not None:
+            self._inflight[dedupe_key] = buffer
+        return buffer
+
+    def run(self, buffer: StreamBuffer, producer: Coroutine[Any, Any, None]) -> asyncio.Task:
+        """Start the task that fills `buffer`; it is cancelled on `shutdown`."""
+        task = asyncio.create_task(producer, name=f"stream-buffer-{buffer.request_id}")
+        buffer.task = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def shutdown(self) -> None:
+        """Cancel producers still running (worker exit) and wait for them to close."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def find_inflight(self, dedupe_key: str) -> Optional[StreamBuffer]:
+        """Return a still-running buffer that can be replayed from offset 0."""
+        buffer = self._inflight.get(dedupe_key)
+        if buffer is None:
+            return None
+        if buffer.done or buffer.first_seq > 0:
+            del self._inflight[dedupe_key]
+            return None
+        self.single_flight_hits += 1
+        return buffer
+
+    def get(self, request_id: str) -> Optional[StreamBuffer]:
+        self._evict()
+        return self._buffers.get(request_id)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def _on_close(self, buffer: StreamBuffer) -> None:
+        if self._buffers.get(buffer.request_id) is buffer:
+            self._finished[buffer.request_id] = buffer
+
+    def _evict(self) -> None:
+        # Oldest finished first: expired ones, then any beyond max_streams.
+        deadline = time.monotonic() - settings.stream_buffer_ttl_seconds
+        while self._finished:
+            buffer = next(iter(self._finished.values()))
+            expired = buffer.finished_at is not None and buffer.finished_at <= deadline
+            if not expired and len(self._buffers) <= settings.stream_buffer_max_streams:
+                break
+            self._discard(buffer.request_id)
+
+    def _discard(self, request_id: str) -> None:
+        buffer = self._buffers.pop(request_id)
+        self._finished.pop(request_id, None)
+        if buffer.dedupe_key is not None and self._inflight.get(buffer.dedupe_key) is buffer:
+            del self._inflight[buffer.dedupe_key]
+
+
+stream_buffer_store = StreamBufferStore()
+
+registry.register(
+    CallbackMetric(
+        "compass_hub_stream_buffers",
+        "Chat stream buffers held in this worker (running and finished).",
+        lambda: {(): len(stream_buffer_store)},
+    )
+)
+registry.register(
+    CallbackMetric(
+        "compass_hub_single_flight_joins_total",
+        "Duplicate chat turns attached to an in-flight upstream stream.",
+        lambda: {(): stream_buffer_store.single_flight_hits},
+        kind="counter",
+    )
+)
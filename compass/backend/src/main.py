@@ -1,11 +1,52 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from config.service_resolver import services_watcher
 from config.settings import settings
+from db.stream_buffer import stream_buffer_store
+from observability.metrics import registry as metrics_registry
+from observability.tracing import tracer
+from plugin_registry.refresher import registry_refresher
+from plugin_registry.registry import plugin_registry, registry_watcher
 from routers.auth import router as auth_router
 from routers.plugin_routes import chat_router, plugin_config_router, plugin_menu_router
+from upstream.client import upstream_client
+from upstream.health import health_monitor
+from upstream.manifests import manifest_monitor
+from warmup import hub_warmup
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    upstream_client.open()
+    # Background tasks that keep routing state fresh off the request path.
+    health_monitor.start()
+    manifest_monitor.start()
+    services_watcher.start()
+    registry_watcher.start()
+    registry_refresher.start()
+    # Warm caches and connections; /ready reports 503 until done.
+    hub_warmup.start()
+    try:
+        yield
+    finally:
+        await hub_warmup.stop()
+        # Cancel chat streams still pumping so their upstream connections close.
+        await stream_buffer_store.shutdown()
+        await registry_refresher.stop()
+        await registry_watcher.stop()
+        await services_watcher.stop()
+        await manifest_monitor.stop()
+        await health_monitor.stop()
+        await upstream_client.aclose()
+        plugin_registry.close()
+        tracer.shutdown()
+
 
-app = FastAPI(title=settings.api_name)
+app = FastAPI(title=settings.api_name, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,15 +54,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Conversation-Id"],
+    expose_headers=["X-Conversation-Id", "X-Request-Id", "X-Stream-Offset"],
 )
 
+if tracer.enabled:
+
+    @app.middleware("http")
+    async def trace_requests(request: Request, call_next):
+        with tracer.span(
+            "http.request",
+            traceparent=request.headers.get("traceparent"),
+            method=request.method,
+        ) as span:
+            response = await call_next(request)
+            route = request.scope.get("route")
+            span.set_attribute("route", getattr(route, "path", request.url.path))
+            span.set_attribute("status_code", response.status_code)
+            return response
+
+
 app.include_router(auth_router)
 app.include_router(plugin_menu_router)
 app.include_router(plugin_config_router)
 app.include_router(chat_router)
+if settings.debug_endpoints_enabled:
+    # Imported only when mounted: profiling support is not needed otherwise.
+    from routers.debug_routes import debug_router
+
+    app.include_router(debug_router)
 
 
 @app.get("/")
 def health() -> dict[str, str]:
     return {"status": "ok", "service": settings.api_name}
+
+
+@app.get("/ready")
+def ready() -> JSONResponse:
+    """Readiness: 503 until this worker's startup warm-up has finished."""
+    return JSONResponse(hub_warmup.status(), status_code=200 if hub_warmup.ready else 503)
+
+
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> PlainTextResponse:
+        return PlainTextResponse(
+            metrics_registry.render(),
+            media_type="text/plain; version=0.0.4",
+        )
@@ -0,0 +1 @@
+"""Hub observability: metrics and tracing."""
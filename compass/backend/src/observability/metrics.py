@@ -0,0 +1,303 @@
+"""
+Minimal Prometheus text-format metrics for the Hub.
+
+Deliberately small instead of a client library: metric updates are a dict
+lookup plus float adds, and callers on hot paths keep a bound child from
+`labels(...)`. Updates are not locked; every instrumented path runs on the
+event loop thread.
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000, 100000, 1000000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key: tuple[str, ...], child) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _render_child(self, key: tuple[str, ...], child: _HistogramChild) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Value read at scrape time from existing in-process state (zero update cost)."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], dict[tuple[str, ...], float]],
+        labelnames: tuple[str, ...] = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._read = read
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._read().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+# ============================================================================
+# Hub metric definitions
+# ============================================================================
+
+upstream_first_byte_seconds = registry.histogram(
+    "compass_hub_upstream_first_byte_seconds",
+    "Time from sending the plugin request to its first frame.",
+    ("plugin_id", "service_key"),
+)
+client_first_frame_seconds = registry.histogram(
+    "compass_hub_client_first_frame_seconds",
+    "Time from starting a chat turn to its first frame being available to the client.",
+    ("plugin_id", "service_key"),
+)
+stream_duration_seconds = registry.histogram(
+    "compass_hub_stream_duration_seconds",
+    "Duration of a proxied chat stream.",
+    ("plugin_id", "service_key"),
+)
+stream_frames = registry.histogram(
+    "compass_hub_stream_frames",
+    "Frames forwarded per chat stream.",
+    ("plugin_id", "service_key"),
+    buckets=SIZE_BUCKETS,
+)
+stream_bytes = registry.histogram(
+    "compass_hub_stream_bytes",
+    "Bytes forwarded per chat stream.",
+    ("plugin_id", "service_key"),
+    buckets=SIZE_BUCKETS,
+)
+stream_errors_total = registry.counter(
+    "compass_hub_stream_errors_total",
+    "Chat streams that ended with an error frame, by error code.",
+    ("plugin_id", "service_key", "code"),
+)
+service_manifest_fetches_total = registry.counter(
+    "compass_hub_service_manifest_fetches_total",
+    "Plugin service manifest fetches per replica: ok, unsupported (no route) or error.",
+    ("service_key", "result"),
+)
+registry_cache_requests_total = registry.counter(
+    "compass_hub_registry_cache_requests_total",
+    "Plugin registry cache lookups by result.",
+    ("source", "result"),
+)
+registry_hydration_seconds = registry.histogram(
+    "compass_hub_registry_hydration_seconds",
+    "Time to rebuild the plugin registry cache from its source.",
+    ("source",),
+)
+registry_snapshot_builds_total = registry.counter(
+    "compass_hub_registry_snapshot_builds_total",
+    "Pre-indexed registry snapshots rebuilt after a registry version change.",
+    ("source",),
+)
+registry_shared_snapshots_total = registry.counter(
+    "compass_hub_registry_shared_snapshots_total",
+    "Node-shared registry snapshot files: published by this worker, attached (mapped), "
+    "busy (another worker was building) or error.",
+    ("result",),
+)
+registry_sync_rows_total = registry.counter(
+    "compass_hub_registry_sync_rows_total",
+    "Registry rows fetched from Databricks into the Redis cache, by sync mode.",
+    ("mode",),
+)
+registry_stale_reads_total = registry.counter(
+    "compass_hub_registry_stale_reads_total",
+    "Registry reads served from the last good snapshot: refreshing, redis_error, shared_build, or max_age exceeded.",
+    ("reason",),
+)
+redis_call_seconds = registry.histogram(
+    "compass_hub_redis_call_seconds",
+    "Redis call latency by operation.",
+    ("operation",),
+)
+databricks_pool_acquire_seconds = registry.histogram(
+    "compass_hub_databricks_pool_acquire_seconds",
+    "Time to check out a Databricks connection, including waits and handshakes.",
+)
+databricks_pool_events_total = registry.counter(
+    "compass_hub_databricks_pool_events_total",
+    "Databricks connection pool events: opened, reused, retried, closed_<reason>.",
+    ("event",),
+)
+databricks_call_seconds = registry.histogram(
+    "compass_hub_databricks_call_seconds",
+    "Databricks SQL call latency by operation.",
+    ("operation",),
+)
+hub_warmup_seconds = registry.gauge(
+    "compass_hub_warmup_seconds",
+    "Duration of the last attempt of each startup warm-up step.",
+    ("step",),
+)
@@ -0,0 +1,347 @@
+"""
+Lightweight request tracing for the Hub.
+
+Spans carry W3C trace context: the Hub continues an incoming `traceparent`
+(or starts a trace), records spans for auth, role lookup, registry lookup,
+upstream attempts and the chat stream, and forwards `traceparent` to the
+plugin service so its spans join the same trace.
+
+Sampling is decided once per trace at the root. Unsampled traces still
+propagate their ids with the sampled flag cleared, but record nothing; with
+TRACING_ENABLED=false every call returns a shared no-op span.
+
+Finished spans are queued and written by a background thread, either as
+JSONL lines or as OTLP/HTTP JSON batches to a collector.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator
+
+import httpx
+
+from config.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "compass-hub"
+
+
+# ==========================================================================
+# Spans
+# ==========================================================================
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """Return (trace_id, parent_span_id, sampled) for a valid W3C traceparent."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or parts[0] != "00":
+        return None
+    trace_id, span_id, flags = parts[1], parts[2], parts[3]
+    if len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+        return None
+    try:
+        int(trace_id, 16), int(span_id, 16)
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, sampled
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+class NonRecordingSpan:
+    """Carries trace ids for propagation without recording anything."""
+
+    recording = False
+
+    def __init__(self, trace_id: str = "", span_id: str = "") -> None:
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    @property
+    def traceparent(self) -> str | None:
+        if not self.trace_id:
+            return None
+        return f"00-{self.trace_id}-{self.span_id}-00"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+_NOOP_SPAN = NonRecordingSpan()
+
+
+class Span:
+    recording = True
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "error", "_start_ns", "_ended")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict[str, Any]) -> None:
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.error: str | None = None
+        self._start_ns = time.time_ns()
+        self._ended = False
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def end(self) -> None:
+        if self._ended:
+            return
+        self._ended = True
+        end_ns = time.time_ns()
+        tracer.export(
+            {
+                "service": SERVICE_NAME,
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start_unix_nano": self._start_ns,
+                "end_unix_nano": end_ns,
+                "duration_ms": round((end_ns - self._start_ns) / 1_000_000, 3),
+                "attributes": self.attributes,
+                "status": "error" if self.error else "ok",
+                "error": self.error,
+            }
+        )
+
+
+AnySpan = Span | NonRecordingSpan
+
+_current_span: ContextVar[AnySpan | None] = ContextVar("compass_hub_current_span", default=None)
+
+
+def current_span() -> AnySpan:
+    return _current_span.get() or _NOOP_SPAN
+
+
+# ==========================================================================
+# Exporters
+# ==========================================================================
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list[dict[str, Any]]) -> dict[str, Any]:
+    """Encode finished spans as an OTLP/HTTP JSON ExportTraceServiceRequest."""
+    by_service: dict[str, list[dict[str, Any]]] = {}
+    for span in spans:
+        attributes = [{"key": key, "value": _otlp_value(value)} for key, value in span["attributes"].items()]
+        otlp_span = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(span["start_unix_nano"]),
+            "endTimeUnixNano": str(span["end_unix_nano"]),
+            "attributes": attributes,
+            "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1},
+        }
+        if span["parent_id"]:
+            otlp_span["parentSpanId"] = span["parent_id"]
+        by_service.setdefault(span["service"], []).append(otlp_span)
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+                "scopeSpans": [{"scope": {"name": "compass.tracing"}, "spans": service_spans}],
+            }
+            for service, service_spans in by_service.items()
+        ]
+    }
+
+
+class SpanExporter(ABC):
+    """Drains finished spans on a daemon thread so the event loop never blocks on I/O."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self._interval = interval_seconds
+        self._queue: queue.SimpleQueue[dict[str, Any]] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def submit(self, span: dict[str, Any]) -> None:
+        self._queue.put(span)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+
+    def flush(self) -> None:
+        batch: list[dict[str, Any]] = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        try:
+            self.write(batch)
+        except Exception:
+            logger.exception("Dropped %d spans: export failed", len(batch))
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self.flush()
+
+    @abstractmethod
+    def write(self, batch: list[dict[str, Any]]) -> None:
+        """Export one batch; called on the exporter thread, exceptions drop the batch."""
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            self.flush()
+
+
+class JsonlSpanExporter(SpanExporter):
+    def __init__(self, path: Path, interval_seconds: float) -> None:
+        super().__init__(interval_seconds)
+        self._path = path
+
+    def write(self, batch: list[dict[str, Any]]) -> None:
+        with self._lock, self._path.open("a", encoding="utf-8") as handle:
+            handle.writelines(json.dumps(span, default=str) + "\n" for span in batch)
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    def __init__(self, endpoint: str, interval_seconds: float) -> None:
+        super().__init__(interval_seconds)
+        self._endpoint = endpoint
+
+    def write(self, batch: list[dict[str, Any]]) -> None:
+        response = httpx.post(self._endpoint, json=to_otlp(batch), timeout=5.0, trust_env=False)
+        response.raise_for_status()
+
+
+def _build_exporter() -> SpanExporter:
+    if settings.tracing_exporter == "otlp":
+        return OtlpHttpSpanExporter(settings.tracing_otlp_endpoint, settings.tracing_export_interval_seconds)
+    path = Path(settings.tracing_jsonl_path).expanduser()
+    if not path.is_absolute():
+        path = Path.cwd() / path
+    return JsonlSpanExporter(path, settings.tracing_export_interval_seconds)
+
+
+# ==========================================================================
+# Tracer
+# ==========================================================================
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.enabled = settings.tracing_enabled
+        self._exporter = _build_exporter() if self.enabled else None
+
+    def start_span(
+        self,
+        name: str,
+        parent: AnySpan | None = None,
+        traceparent: str | None = None,
+        **attributes: Any,
+    ) -> AnySpan:
+        """
+        Start a span without activating it.
+
+        The parent is, in order: `parent`, the active span, or a remote
+        `traceparent`. With none of those a new trace is started and sampled
+        at TRACING_SAMPLE_RATIO.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+
+        parent = parent or _current_span.get()
+        if parent is not None:
+            if not parent.recording:
+                return parent
+            return Span(name, parent.trace_id, parent.span_id, attributes)
+
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+        else:
+            trace_id, parent_id = _new_id(16), None
+            sampled = random.random() < settings.tracing_sample_ratio
+
+        if not sampled:
+            return NonRecordingSpan(trace_id, parent_id or _new_id(8))
+        return Span(name, trace_id, parent_id, attributes)
+
+    @contextmanager
+    def span(self, name: str, traceparent: str | None = None, **attributes: Any) -> Iterator[AnySpan]:
+        """Start a span, make it the active span for the block, and end it on exit."""
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        span = self.start_span(name, traceparent=traceparent, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.set_error(f"{type(exc).__name__}: {exc}")
+            raise
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Async generators may be finalized from another context.
+                pass
+            span.end()
+
+    def export(self, span: dict[str, Any]) -> None:
+        if self._exporter is not None:
+            self._exporter.submit(span)
+
+    def shutdown(self) -> None:
+        if self._exporter is not None:
+            self._exporter.shutdown()
+
+
+tracer = Tracer()
@@ -7,6 +7,8 @@ Single source of truth for role -> workspace mapping logic.
 from typing import Optional
 
 from config.settings import settings
+from observability.metrics import redis_call_seconds
+from observability.tracing import tracer
 
 
 # Roles that bypass workspace filtering entirely
@@ -43,11 +45,14 @@ def get_user_roles(session_db, user_email: str) -> list[str]:
     Read role data from Redis session store.
     """
     roles: list[str] = []
-    try:
-        raw = session_db.hget(user_email, "roles") or ""
-        roles = [role.strip() for role in raw.split(",") if role.strip()]
-    except Exception:  # pragma: no cover - depends on runtime Redis availability
-        pass
+    with tracer.span("auth.role_lookup") as span:
+        try:
+            with redis_call_seconds.labels("get_roles").time():
+                raw = session_db.hget(user_email, "roles") or ""
+            roles = [role.strip() for role in raw.split(",") if role.strip()]
+        except Exception as exc:  # pragma: no cover - depends on runtime Redis availability
+            span.set_error(str(exc))
+        span.set_attribute("roles", len(roles))
 
     if roles:
         return roles
@@ -80,3 +85,14 @@ def allowed_workspaces(
         workspaces.add("general")
 
     return workspaces if workspaces else set()
+
+
+def is_superadmin(roles: list[str]) -> bool:
+    """
+    True when the user may call Hub-wide operational endpoints.
+
+    Mirrors `allowed_workspaces`: disabled role checks grant access to everyone.
+    """
+    if not settings.enforce_role_checks:
+        return True
+    return bool(SUPERADMIN_ROLES.intersection(roles))
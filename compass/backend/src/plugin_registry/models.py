@@ -9,7 +9,7 @@ import json
 from datetime import datetime
 from typing import Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class PluginRecord(BaseModel):
@@ -134,10 +134,42 @@ class PluginUpdate(BaseModel):
     plugin_name: Optional[str] = None
     description: Optional[str] = None
     instructions: Optional[str] = None
+    position: Optional[int] = Field(default=None, ge=1)
     updated_by: Optional[str] = None
 
     def has_changes(self) -> bool:
-        return any(v is not None for v in (self.plugin_name, self.description, self.instructions))
+        return any(
+            v is not None
+            for v in (self.plugin_name, self.description, self.instructions, self.position)
+        )
+
+
+class PluginBulkUpdateItem(PluginUpdate):
+    """One plugin's changes inside a bulk update."""
+
+    workspace_id: str
+    plugin_id: str
+
+
+class PluginBulkUpdate(BaseModel):
+    """Batch of admin edits applied as one Databricks statement."""
+
+    updates: list[PluginBulkUpdateItem] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def validate_items(self) -> "PluginBulkUpdate":
+        seen: set[tuple[str, str]] = set()
+        for item in self.updates:
+            key = (item.workspace_id, item.plugin_id)
+            if key in seen:
+                raise ValueError(f"Plugin {key[0]}/{key[1]} appears more than once")
+            if not item.has_changes():
+                raise ValueError(
+                    f"Plugin {key[0]}/{key[1]}: provide at least one of "
+                    "plugin_name, description, instructions, position"
+                )
+            seen.add(key)
+        return self
 
 
 class WorkspaceGroup(BaseModel):
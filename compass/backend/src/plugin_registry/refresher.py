@@ -0,0 +1,102 @@
+"""
+Background refresh of the plugin registry cache (stale-while-revalidate).
+
+Every worker runs one refresher task from the Hub lifespan. On each tick it
+reads the cache state from Redis and, if the cache is missing (first start,
+Redis flush, admin invalidation) or this worker wins the per-interval Redis
+lock, runs `plugin_registry.sync()` in a thread. Invalidation and reads that
+find the cache missing wake the task early.
+
+While it runs, request paths never query Databricks: they serve the last
+good snapshot and count stale reads in `compass_hub_registry_stale_reads_total`.
+Only a worker with no snapshot at all still hydrates inline.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Optional
+
+from config.settings import settings
+from plugin_registry.registry import PluginRegistry, RegistrySyncResult, plugin_registry
+
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryRefresher:
+    """Owns the refresh loop task started from the Hub lifespan."""
+
+    def __init__(self, registry: PluginRegistry = plugin_registry) -> None:
+        self._registry = registry
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._first_pass: asyncio.Event | None = None
+        self._force = False
+
+    def start(self) -> None:
+        if (
+            not settings.plugin_registry_refresh_enabled
+            or self._registry.source == "local"
+            or self._task is not None
+        ):
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._first_pass = asyncio.Event()
+        self._registry.enable_background_refresh(self.trigger)
+        self._task = asyncio.create_task(self._run(), name="registry-refresher")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._registry.disable_background_refresh()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def wait_first_pass(self) -> None:
+        """Return once the first refresh attempt has finished; at once when not running."""
+        if self._task is not None and self._first_pass is not None:
+            await self._first_pass.wait()
+
+    def trigger(self) -> None:
+        """Refresh now instead of at the next tick. Safe to call from any thread."""
+        self._force = True
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def refresh_once(self) -> Optional[RegistrySyncResult]:
+        """Sync if the cache is missing, a refresh was requested, or this worker holds the lock."""
+        forced, self._force = self._force, False
+        ready, _ = await asyncio.to_thread(self._registry.cache_state)
+        if ready and not forced:
+            claimed = await asyncio.to_thread(
+                self._registry.claim_refresh, settings.plugin_registry_refresh_interval_seconds
+            )
+            if not claimed:
+                return None  # another worker syncs this interval
+        return await asyncio.to_thread(self._registry.sync)
+
+    async def _run(self) -> None:
+        assert self._wake is not None and self._first_pass is not None
+        while True:
+            try:
+                await self.refresh_once()
+            except Exception:
+                logger.exception("Plugin registry refresh failed; serving the last good snapshot")
+            self._first_pass.set()
+
+            interval = settings.plugin_registry_refresh_interval_seconds * random.uniform(0.9, 1.1)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+
+registry_refresher = RegistryRefresher()
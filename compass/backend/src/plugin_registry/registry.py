@@ -5,22 +5,103 @@ Supported sources:
   - databricks: Databricks source of truth with Redis read cache
   - local:      plugins.local.json only (DEV)
   - overlay:    Databricks + local overlay (local wins by ws/plugin key)
+
+Reads are served from a RegistrySnapshot rebuilt only when the registry
+version changes: the local file signature (mtime, size), and/or a Redis
+counter bumped on every cache hydration, invalidation and write.
+In overlay mode the merged view is materialized the same way, and each
+side is re-read only when its own part of the version moved: a local file
+edit re-merges against the Databricks records already in memory.
+With PLUGIN_REGISTRY_SHARED_SNAPSHOT_DIR set, the workers of a node share
+one snapshot file per version (plugin_registry/shared_snapshot.py).
+
+The local file is loaded by `registry_watcher` (config/file_watch.py) in
+the background and published as an immutable _LocalPlugins, so reads do not
+stat or parse it; an edit that fails to load keeps the last good version.
+Without a running watcher (scripts) reads check the file themselves.
+
+The Redis cache is refreshed from Databricks by `sync`: in delta mode only
+rows with `updated_at` after the stored watermark are fetched, and a
+full reconciliation (which also drops deleted rows) runs once per
+PLUGIN_REGISTRY_FULL_SYNC_INTERVAL_SECONDS.
+
+When the background refresher (plugin_registry/refresher.py) is running,
+reads never hydrate the cache inline: while the cache is being rebuilt, or
+Redis is unreachable, they keep serving the last good snapshot.
 """
 
 import json
-from collections import OrderedDict
+import logging
+import os
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 import redis
 
+from config.file_watch import FileSignature, FileWatcher, file_signature
 from config.settings import settings
-from plugin_registry.models import PluginRecord, PluginUpdate, WorkspaceGroup
+from db.databricks_pool import DatabricksConnectionPool
+from observability.metrics import (
+    CallbackMetric,
+    databricks_call_seconds,
+    redis_call_seconds,
+    registry_cache_requests_total,
+    registry_hydration_seconds,
+    registry_snapshot_builds_total,
+    registry_stale_reads_total,
+    registry as metrics_registry,
+    registry_sync_rows_total,
+)
+from observability.tracing import tracer
+from plugin_registry.models import (
+    PluginBulkUpdateItem,
+    PluginRecord,
+    PluginUpdate,
+    WorkspaceGroup,
+)
+from plugin_registry.shared_snapshot import SharedRegistrySnapshot, SharedSnapshotBusy, SharedSnapshotStore
+from plugin_registry.snapshot import RegistrySnapshot
 
 
 CACHE_READY_KEY = "plugins_config_ready"
 INDEX_KEY = "plugins:index"
+VERSION_KEY = "plugins:version"
+# Admin-editable columns a bulk MERGE can set; order matches its VALUES rows.
+BULK_UPDATE_COLUMNS = ("plugin_name", "description", "instructions", "position")
+WATERMARK_KEY = "plugins:watermark"
+FULL_SYNC_AT_KEY = "plugins:full_sync_at"
+SYNCED_AT_KEY = "plugins:synced_at"
+REFRESH_LOCK_KEY = "plugins:refresh_lock"
+
+
+logger = logging.getLogger(__name__)
+
+
+class _RefreshPending(Exception):
+    """Cache not ready while the background refresher owns hydration."""
+
+
+@dataclass(frozen=True)
+class _LocalPlugins:
+    """One parsed version of the local registry file; replaced, never mutated."""
+
+    signature: FileSignature
+    plugins: tuple[PluginRecord, ...] = ()
+    index: dict[tuple[str, str], PluginRecord] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, signature: FileSignature, plugins: list[PluginRecord]) -> "_LocalPlugins":
+        return cls(signature, tuple(plugins), {(p.workspace_id, p.plugin_id): p for p in plugins})
+
+
+@dataclass(frozen=True)
+class RegistrySyncResult:
+    mode: str  # "full" | "delta"
+    rows: int
+    removed: int = 0
 
 
 class PluginRegistry:
@@ -37,13 +118,30 @@ class PluginRegistry:
         table_name: str = settings.databricks_plugins_table,
         source: str = settings.plugin_registry_source,
         local_file: str = settings.plugin_registry_local_file,
+        sync_mode: str = settings.plugin_registry_sync_mode,
+        full_sync_interval_seconds: float = settings.plugin_registry_full_sync_interval_seconds,
+        max_staleness_seconds: float = settings.plugin_registry_max_staleness_seconds,
+        shared_snapshot_dir: str = settings.plugin_registry_shared_snapshot_dir,
+        redis_client: redis.Redis | None = None,
+        connect: Optional[Callable[[], Any]] = None,
+        pool: Optional[DatabricksConnectionPool] = None,
     ):
+        """
+        `redis_client` and `connect` replace the Redis cache and the
+        Databricks connection factory, e.g. with in-memory or SQLite stand-ins.
+        Connections are kept in a DatabricksConnectionPool built from settings
+        unless `pool` is given.
+        """
         self._source = source
-        self._local_file = local_file
+        self._local_path = self._resolve_local_path(local_file)
+        self._sync_mode = sync_mode
+        self._full_sync_interval = full_sync_interval_seconds
+        self._max_staleness = max_staleness_seconds
+        self._connect_override = connect
 
         self._redis: redis.Redis | None = None
         if self._source in {"databricks", "overlay"}:
-            self._redis = redis.Redis(
+            self._redis = redis_client or redis.Redis(
                 host=redis_host,
                 port=redis_port,
                 db=redis_db,
@@ -54,11 +152,36 @@ class PluginRegistry:
         self._db_http_path = databricks_http_path
         self._db_token = databricks_token
         self._table = table_name
+        self._pool = pool or DatabricksConnectionPool(
+            self._connect,
+            max_size=settings.databricks_pool_max_size,
+            acquire_timeout_seconds=settings.databricks_pool_acquire_timeout_seconds,
+            max_idle_seconds=settings.databricks_pool_max_idle_seconds,
+            max_lifetime_seconds=settings.databricks_pool_max_lifetime_seconds,
+            health_check_after_seconds=settings.databricks_pool_health_check_after_seconds,
+            stale_errors=_stale_connection_errors(),
+        )
+
+        # Local file: published by the watcher (see local_watcher), or
+        # read-through by file signature when no watcher is running.
+        self._local: _LocalPlugins | None = None
+        # Last signature that failed to load, wrapped so a missing file (None) can be rejected too.
+        self._local_rejected: tuple[FileSignature] | None = None
+        self._local_watcher: FileWatcher | None = None
+
+        self._snapshot: RegistrySnapshot | SharedRegistrySnapshot | None = None
+        self._shared: SharedSnapshotStore | None = None
+        if shared_snapshot_dir:
+            self._shared = SharedSnapshotStore(
+                self._resolve_local_path(shared_snapshot_dir), f"plugins-{source}-{table_name}"
+            )
+        # Overlay: Databricks records with the Redis version they were read at,
+        # so a local file edit re-merges without re-reading the whole cache.
+        self._databricks_records: tuple[int, list[PluginRecord]] | None = None
 
-        # Local source cache (read-through by file mtime)
-        self._local_cache: list[PluginRecord] = []
-        self._local_cache_index: dict[tuple[str, str], PluginRecord] = {}
-        self._local_cache_mtime: float | None = None
+        # Set by the background refresher; see enable_background_refresh.
+        self._request_refresh: Callable[[], None] | None = None
+        self._synced_at: float | None = None
 
     @property
     def source(self) -> str:
@@ -69,48 +192,79 @@ class PluginRegistry:
     # ======================================================================
 
     def get_all(self) -> list[PluginRecord]:
-        if self._source == "local":
-            return self._sorted_plugins(self._load_local_plugins())
-        if self._source == "overlay":
-            return self._sorted_plugins(self._merge_overlay_plugins())
-        return self._sorted_plugins(self._get_all_from_databricks_cache())
+        return list(self.snapshot().plugins)
 
     def get_one(self, workspace_id: str, plugin_id: str) -> Optional[PluginRecord]:
-        if self._source == "local":
-            return self._get_local_one(workspace_id, plugin_id)
-
-        if self._source == "overlay":
-            local_hit = self._get_local_one(workspace_id, plugin_id)
-            if local_hit:
-                return local_hit
-            return self._get_one_from_databricks_cache(workspace_id, plugin_id)
+        with tracer.span("registry.get_one", source=self._source, plugin_id=plugin_id) as span:
+            plugin = self._get_one(workspace_id, plugin_id)
+            span.set_attribute("found", plugin is not None)
+            return plugin
 
-        return self._get_one_from_databricks_cache(workspace_id, plugin_id)
+    def _get_one(self, workspace_id: str, plugin_id: str) -> Optional[PluginRecord]:
+        return self.snapshot().get_one(workspace_id, plugin_id)
 
     def get_grouped(
         self,
         workspace_filter: Optional[set[str]] = None,
         enabled_only: bool = False,
     ) -> list[WorkspaceGroup]:
-        plugins = self.get_all()
-        groups: OrderedDict[str, WorkspaceGroup] = OrderedDict()
-
-        for plugin in plugins:
-            if workspace_filter is not None and plugin.workspace_id not in workspace_filter:
-                continue
-            if enabled_only and not plugin.enabled:
-                continue
-
-            if plugin.workspace_id not in groups:
-                groups[plugin.workspace_id] = WorkspaceGroup(
-                    workspace_id=plugin.workspace_id,
-                    workspace_name=plugin.workspace_name,
-                    workspace_description=plugin.workspace_description,
-                    plugins=[],
-                )
-            groups[plugin.workspace_id].plugins.append(plugin)
+        """Workspace groups in workspace_id order, plugins by position. Read-only."""
+        return self.snapshot().grouped(workspace_filter, enabled_only)
+
+    def snapshot(self) -> RegistrySnapshot | SharedRegistrySnapshot:
+        """
+        Current pre-indexed view; rebuilt only when the registry version changes.
+
+        With a shared snapshot directory, a version another worker on the node
+        already built is mapped from its file instead of being rebuilt here;
+        while another worker is still building it, the previous snapshot is
+        served rather than waiting on that worker.
+
+        With background refresh on, a cache that is being rebuilt or a Redis
+        error serves the previous snapshot instead of blocking or failing.
+        """
+        current = self._snapshot
+        try:
+            # Read the version before the data: a concurrent write then at worst
+            # leaves newer data under an older version, which forces a rebuild.
+            version = self._current_version()
+            if current is not None and current.version == version:
+                self._observe_staleness()
+                return current
+            snapshot = self._build_snapshot(version, wait=current is None)
+        except SharedSnapshotBusy:
+            registry_stale_reads_total.labels("shared_build").inc()
+            return current
+        except (_RefreshPending, redis.RedisError) as exc:
+            if current is None or self._request_refresh is None:
+                raise
+            reason = "refreshing" if isinstance(exc, _RefreshPending) else "redis_error"
+            registry_stale_reads_total.labels(reason).inc()
+            return current
+
+        self._snapshot = snapshot
+        self._observe_staleness()
+        return snapshot
+
+    def _build_snapshot(self, version: tuple, wait: bool = True) -> RegistrySnapshot | SharedRegistrySnapshot:
+        def build() -> RegistrySnapshot:
+            registry_snapshot_builds_total.labels(self._source).inc()
+            return RegistrySnapshot.build(self._collect_plugins(version), version)
+
+        if self._shared is None:
+            return build()
+        return self._shared.load_or_build(version, build, wait)
+
+    def data_age_seconds(self) -> Optional[float]:
+        """Seconds since the Redis cache was last synced from Databricks, if known."""
+        if self._synced_at is None:
+            return None
+        return max(time.time() - self._synced_at, 0.0)
 
-        return list(groups.values())
+    def _observe_staleness(self) -> None:
+        age = self.data_age_seconds()
+        if age is not None and age > self._max_staleness:
+            registry_stale_reads_total.labels("max_age").inc()
 
     # ======================================================================
     # PUBLIC WRITES
@@ -164,6 +318,10 @@ class PluginRegistry:
             set_clauses.append("instructions = ?")
             params.append(update.instructions)
 
+        if update.position is not None:
+            set_clauses.append("position = ?")
+            params.append(update.position)
+
         params.extend([workspace_id, plugin_id])
 
         query = f"""
@@ -176,82 +334,293 @@ class PluginRegistry:
 
         updated_record = self._read_one_from_db(workspace_id, plugin_id)
         self._cache_one(updated_record)
+        self._bump_version()
         return updated_record
 
+    def update_many(self, updates: list[PluginBulkUpdateItem], updated_by: str) -> list[PluginRecord]:
+        """
+        Apply a batch of admin edits with one MERGE, one re-read and one cache write.
+
+        Same source rules as `update`. The whole batch is rejected before any
+        write if a plugin is missing or is a local overlay record. Fields left
+        as None keep their current value. Returns records in request order.
+        """
+        if self._source == "local":
+            raise RuntimeError("Plugin updates are disabled when PLUGIN_REGISTRY_SOURCE=local.")
+
+        keys = [(item.workspace_id, item.plugin_id) for item in updates]
+        if self._source == "overlay":
+            local_hits = [f"{ws}/{plugin}" for ws, plugin in keys if self._get_local_one(ws, plugin)]
+            if local_hits:
+                raise RuntimeError(
+                    "Cannot update local overlay plugins through API: "
+                    f"{', '.join(local_hits)}. Edit PLUGIN_REGISTRY_LOCAL_FILE instead."
+                )
+
+        missing = [f"{ws}/{plugin}" for (ws, plugin), found in zip(keys, self._cached_exists(keys)) if not found]
+        if missing:
+            raise LookupError(f"Plugins not found: {', '.join(missing)}")
+
+        value_rows = ", ".join("(?, ?, ?, ?, ?, ?)" for _ in updates)
+        set_clauses = ", ".join(f"{column} = COALESCE(s.{column}, t.{column})" for column in BULK_UPDATE_COLUMNS)
+        query = f"""
+            MERGE INTO {self._table} AS t
+            USING (VALUES {value_rows})
+                AS s(workspace_id, plugin_id, {', '.join(BULK_UPDATE_COLUMNS)})
+            ON t.workspace_id = s.workspace_id AND t.plugin_id = s.plugin_id
+            WHEN MATCHED THEN UPDATE SET {set_clauses}, updated_by = ?, updated_at = ?
+        """
+        params: list[Any] = []
+        for item in updates:
+            params.extend([item.workspace_id, item.plugin_id])
+            params.extend(getattr(item, column) for column in BULK_UPDATE_COLUMNS)
+        params.extend([updated_by, datetime.now(timezone.utc).isoformat()])
+
+        self._execute(query, params)
+
+        records = self._read_many_from_db(keys)
+        self._cache_many(records)
+        self._bump_version()
+        by_key = {(p.workspace_id, p.plugin_id): p for p in records}
+        return [by_key[key] for key in keys if key in by_key]
+
     # ======================================================================
     # PUBLIC CACHE CONTROL
     # ======================================================================
 
     def invalidate_cache(self) -> None:
         if self._source == "local":
-            self._local_cache_mtime = None
+            self._snapshot = None
+            self._local = None
             return
 
         if self._redis is None:
             return
 
-        self._redis.delete(CACHE_READY_KEY)
+        # Dropping the last full-sync time makes the next hydration reconcile
+        # the whole table instead of applying a delta.
+        with redis_call_seconds.labels("delete").time():
+            self._redis.delete(CACHE_READY_KEY, FULL_SYNC_AT_KEY)
+        self._bump_version()
+        if self._request_refresh is not None:
+            # Readers keep the current snapshot until the refresher has rebuilt the cache.
+            self._request_refresh()
+        else:
+            self._snapshot = None
+
+    def enable_background_refresh(self, request_refresh: Callable[[], None]) -> None:
+        """
+        Hand cache hydration to a background refresher.
+
+        Reads stop hydrating inline once a snapshot exists; they call
+        `request_refresh` (which must be thread-safe) and serve that snapshot.
+        """
+        self._request_refresh = request_refresh
+
+    def disable_background_refresh(self) -> None:
+        self._request_refresh = None
+
+    def cache_state(self) -> tuple[bool, Optional[float]]:
+        """(cache ready, epoch of last sync) from Redis; also refreshes data_age_seconds()."""
+        if self._redis is None:
+            return True, None
+        with redis_call_seconds.labels("sync_state").time():
+            ready, synced_at = self._redis.mget([CACHE_READY_KEY, SYNCED_AT_KEY])
+        self._synced_at = float(synced_at) if synced_at else None
+        return ready is not None, self._synced_at
+
+    def claim_refresh(self, ttl_seconds: float) -> bool:
+        """True for the one worker that should run the periodic sync this interval."""
+        if self._redis is None:
+            return False
+        with redis_call_seconds.labels("refresh_lock").time():
+            return bool(self._redis.set(REFRESH_LOCK_KEY, str(os.getpid()), nx=True, ex=max(int(ttl_seconds), 1)))
+
+    def local_watcher(self) -> FileWatcher:
+        """
+        Watch PLUGIN_REGISTRY_LOCAL_FILE (local and overlay sources) and publish each valid edit.
+
+        While the watcher runs, reads use the published records and never
+        touch the filesystem; an edit that fails to parse keeps the last good
+        version. Every worker process runs its own watcher.
+        """
+        watched = self._source in {"local", "overlay"}
+        self._local_watcher = FileWatcher(
+            path=self._local_path,
+            on_change=self._on_local_change,
+            interval_seconds=settings.plugin_registry_local_watch_interval_seconds if watched else 0,
+            name="plugin-registry",
+        )
+        return self._local_watcher
+
+    def reload_local(self) -> bool:
+        """
+        Parse the local file if its signature changed and publish it; True if published.
+
+        Errors are raised and leave the published version in place; the
+        rejected signature is remembered, so the same bad file is parsed once.
+        """
+        signature = file_signature(self._local_path)
+        if self._local is not None and (signature == self._local.signature or (signature,) == self._local_rejected):
+            registry_cache_requests_total.labels("local", "hit").inc()
+            return False
+
+        registry_cache_requests_total.labels("local", "miss").inc()
+        try:
+            local = self._read_local_file(signature)
+        except (RuntimeError, ValueError, OSError):
+            self._local_rejected = (signature,)
+            raise
+        self._local = local
+        return True
+
+    def close(self) -> None:
+        """Close pooled Databricks connections (app shutdown)."""
+        self._pool.close()
+
+    def pool_stats(self) -> dict[str, int]:
+        return self._pool.stats()
+
+    def warm_connections(self, count: int = 1) -> int:
+        """
+        Open pooled Databricks connections ahead of the first write or sync.
+
+        The first connection also pays the `databricks.sql` client import,
+        which would otherwise land on whichever request needs it first.
+        """
+        if self._source == "local":
+            return 0
+        return self._pool.warm(count)
 
     def warm_cache(self) -> int:
         if self._source == "local":
-            return len(self._load_local_plugins())
+            return len(self._local_plugins().plugins)
         return self._hydrate_cache()
 
+    def sync(self, full: bool = False) -> RegistrySyncResult:
+        """
+        Refresh the Redis cache from Databricks and bump the registry version.
+
+        Delta mode fetches rows with `updated_at > watermark`. A full
+        reconciliation runs when asked, when no watermark is known, or when
+        the last one is older than the full-sync interval; it is the only
+        pass that notices deleted rows, and it also picks up any row that
+        committed late with a timestamp at or below the watermark.
+        """
+        if self._redis is None:
+            return RegistrySyncResult(mode="full", rows=0)
+
+        with redis_call_seconds.labels("sync_state").time():
+            watermark, last_full = self._redis.mget([WATERMARK_KEY, FULL_SYNC_AT_KEY])
+
+        needs_full = (
+            full
+            or self._sync_mode != "delta"
+            or watermark is None
+            or last_full is None
+            or time.time() - float(last_full) >= self._full_sync_interval
+        )
+
+        with registry_hydration_seconds.labels(self._source).time():
+            if needs_full:
+                result = self._full_sync()
+            else:
+                result = self._delta_sync(watermark)
+
+        synced_at = time.time()
+        with redis_call_seconds.labels("hydrate").time():
+            self._redis.mset(
+                {
+                    CACHE_READY_KEY: datetime.now(timezone.utc).isoformat(),
+                    SYNCED_AT_KEY: synced_at,
+                }
+            )
+        self._synced_at = synced_at
+        registry_sync_rows_total.labels(result.mode).inc(result.rows)
+        return result
+
     # ======================================================================
     # PRIVATE — Source composition
     # ======================================================================
 
-    def _merge_overlay_plugins(self) -> list[PluginRecord]:
-        databricks_plugins = self._get_all_from_databricks_cache()
+    def _current_version(self) -> tuple:
+        if self._source == "local":
+            return (self._local_plugins().signature,)
+        if self._source == "overlay":
+            return (self._databricks_version(), self._local_plugins().signature)
+        return (self._databricks_version(),)
+
+    def _collect_plugins(self, version: tuple) -> list[PluginRecord]:
+        if self._source == "local":
+            return list(self._local_plugins().plugins)
+        if self._source == "overlay":
+            return self._merge_overlay_plugins(version[0])
+        return self._get_all_from_databricks_cache()
+
+    def _merge_overlay_plugins(self, databricks_version: int) -> list[PluginRecord]:
+        """Merge local records over the Databricks ones; only the side whose version moved is re-read."""
+        cached = self._databricks_records
+        if cached is not None and cached[0] == databricks_version:
+            databricks_plugins = cached[1]
+        else:
+            databricks_plugins = self._get_all_from_databricks_cache()
+            self._databricks_records = (databricks_version, databricks_plugins)
+
         merged: dict[tuple[str, str], PluginRecord] = {
             (p.workspace_id, p.plugin_id): p for p in databricks_plugins
         }
 
-        for local_plugin in self._load_local_plugins():
+        for local_plugin in self._local_plugins().plugins:
             merged[(local_plugin.workspace_id, local_plugin.plugin_id)] = local_plugin
 
         return list(merged.values())
 
-    @staticmethod
-    def _sorted_plugins(plugins: list[PluginRecord]) -> list[PluginRecord]:
-        plugins.sort(key=lambda p: (p.workspace_id, p.position, p.plugin_id))
-        return plugins
-
     # ======================================================================
     # PRIVATE — Local file source
     # ======================================================================
 
     def _get_local_one(self, workspace_id: str, plugin_id: str) -> Optional[PluginRecord]:
-        self._load_local_plugins()
-        return self._local_cache_index.get((workspace_id, plugin_id))
+        return self._local_plugins().index.get((workspace_id, plugin_id))
 
-    def _load_local_plugins(self) -> list[PluginRecord]:
-        local_path = self._resolve_local_path(self._local_file)
-        exists = local_path.exists()
-
-        if not exists and self._source == "local":
+    def _local_plugins(self) -> _LocalPlugins:
+        """Published local records; the file is only checked here when no watcher is running."""
+        local = self._local
+        if local is not None and self._local_watcher is not None and self._local_watcher.running:
+            return local
+        try:
+            self.reload_local()
+        except (RuntimeError, ValueError, OSError):
+            if local is None:
+                raise
+            logger.exception("Serving the last good version of %s", self._local_path)
+        return self._local
+
+    def _on_local_change(self) -> None:
+        if self.reload_local() and self._source == "local":
+            # Build the snapshot here so no request pays for it.
+            self.snapshot()
+
+    def _read_local_file(self, signature: FileSignature) -> _LocalPlugins:
+        if signature is None and self._source == "local":
             raise RuntimeError(
-                f"PLUGIN_REGISTRY_LOCAL_FILE does not exist: {local_path}. "
+                f"PLUGIN_REGISTRY_LOCAL_FILE does not exist: {self._local_path}. "
                 "Create it or switch PLUGIN_REGISTRY_SOURCE."
             )
-
-        if not exists:
+        if signature is None:
             # overlay with no local file is valid; behaves like databricks-only
-            self._local_cache = []
-            self._local_cache_index = {}
-            self._local_cache_mtime = None
-            return []
+            return _LocalPlugins(None)
 
-        mtime = local_path.stat().st_mtime
-        if self._local_cache_mtime is not None and mtime == self._local_cache_mtime:
-            return list(self._local_cache)
+        with registry_hydration_seconds.labels("local").time():
+            return _LocalPlugins.build(signature, self._parse_local_file(self._local_path))
 
+    @staticmethod
+    def _parse_local_file(local_path: Path) -> list[PluginRecord]:
         try:
             raw_data = json.loads(local_path.read_text(encoding="utf-8"))
         except json.JSONDecodeError as exc:
             raise RuntimeError(f"Invalid JSON in local plugin registry file: {local_path}") from exc
 
-        plugins_payload = raw_data.get("plugins", [])
+        plugins_payload = raw_data.get("plugins", []) if isinstance(raw_data, dict) else None
         if not isinstance(plugins_payload, list):
             raise RuntimeError(
                 f"Invalid local plugin registry format in {local_path}: expected 'plugins' list."
@@ -264,12 +633,7 @@ class PluginRegistry:
                     f"Invalid plugin at index {idx} in {local_path}: expected object."
                 )
             plugins.append(PluginRecord.from_payload(payload))
-
-        self._local_cache = plugins
-        self._local_cache_index = {(p.workspace_id, p.plugin_id): p for p in plugins}
-        self._local_cache_mtime = mtime
-
-        return list(self._local_cache)
+        return plugins
 
     @staticmethod
     def _resolve_local_path(raw_path: str) -> Path:
@@ -281,17 +645,14 @@ class PluginRegistry:
     # ======================================================================
 
     def _get_all_from_databricks_cache(self) -> list[PluginRecord]:
-        self._ensure_cache()
+        # Only reached from snapshot(), which has already run _ensure_cache.
         if self._redis is None:
             return []
 
-        keys = sorted(self._redis.smembers(INDEX_KEY))
-        plugins: list[PluginRecord] = []
-        for key in keys:
-            raw = self._redis.get(key)
-            if raw:
-                plugins.append(PluginRecord.model_validate_json(raw))
-        return plugins
+        with redis_call_seconds.labels("read_all").time():
+            keys = sorted(self._redis.smembers(INDEX_KEY))
+            raw_values = self._redis.mget(keys) if keys else []
+        return [PluginRecord.model_validate_json(raw) for raw in raw_values if raw]
 
     def _get_one_from_databricks_cache(
         self, workspace_id: str, plugin_id: str
@@ -300,28 +661,98 @@ class PluginRegistry:
         if self._redis is None:
             return None
 
-        raw = self._redis.get(self._cache_key(workspace_id, plugin_id))
+        with redis_call_seconds.labels("get").time():
+            raw = self._redis.get(self._cache_key(workspace_id, plugin_id))
         if raw:
             return PluginRecord.model_validate_json(raw)
         return None
 
-    def _ensure_cache(self) -> None:
+    def _ensure_cache(self, serve_stale: bool = False) -> None:
+        """Hydrate a missing cache inline, unless `serve_stale` and the refresher can do it."""
         if self._redis is None:
             return
-        if self._redis.exists(CACHE_READY_KEY):
+        with redis_call_seconds.labels("exists").time():
+            ready = self._redis.exists(CACHE_READY_KEY)
+        if ready:
+            registry_cache_requests_total.labels(self._source, "hit").inc()
             return
+        registry_cache_requests_total.labels(self._source, "miss").inc()
+
+        request_refresh = self._request_refresh
+        if serve_stale and request_refresh is not None and self._snapshot is not None:
+            request_refresh()
+            raise _RefreshPending()
         self._hydrate_cache()
 
     def _hydrate_cache(self) -> int:
         if self._redis is None:
             return 0
+        return self.sync().rows
 
+    def _full_sync(self) -> RegistrySyncResult:
+        assert self._redis is not None
+        sync_started = time.time()
         plugins = self._read_all_from_db()
-        self._redis.delete(INDEX_KEY)
-        for plugin in plugins:
-            self._cache_one(plugin)
-        self._redis.set(CACHE_READY_KEY, datetime.now(timezone.utc).isoformat())
-        return len(plugins)
+        keys = {self._cache_key(p.workspace_id, p.plugin_id) for p in plugins}
+
+        with redis_call_seconds.labels("hydrate").time():
+            stale = set(self._redis.smembers(INDEX_KEY)) - keys
+            if stale:
+                self._redis.srem(INDEX_KEY, *stale)
+                self._redis.delete(*stale)
+            self._cache_many(plugins)
+            self._store_watermark(plugins)
+            self._redis.set(FULL_SYNC_AT_KEY, sync_started)
+
+        self._bump_version()
+        return RegistrySyncResult(mode="full", rows=len(plugins), removed=len(stale))
+
+    def _delta_sync(self, watermark: str) -> RegistrySyncResult:
+        assert self._redis is not None
+        plugins = self._read_changed_from_db(watermark)
+
+        with redis_call_seconds.labels("hydrate").time():
+            self._cache_many(plugins)
+            self._store_watermark(plugins)
+
+        if plugins:
+            self._bump_version()
+        return RegistrySyncResult(mode="delta", rows=len(plugins))
+
+    def _store_watermark(self, plugins: list[PluginRecord]) -> None:
+        """Advance the watermark to the newest `updated_at` seen; never move it back."""
+        assert self._redis is not None
+        stamps = [p.updated_at for p in plugins if p.updated_at is not None]
+        if not stamps:
+            return
+        newest = max(stamps)
+        if newest.tzinfo is None:
+            newest = newest.replace(tzinfo=timezone.utc)
+        current = self._redis.get(WATERMARK_KEY)
+        if current is None or datetime.fromisoformat(current) < newest:
+            self._redis.set(WATERMARK_KEY, newest.isoformat())
+
+    def _databricks_version(self) -> int:
+        self._ensure_cache(serve_stale=True)
+        if self._redis is None:
+            return 0
+        with redis_call_seconds.labels("version").time():
+            raw = self._redis.get(VERSION_KEY)
+        if raw is None:
+            # Cache hydrated by a build that did not track versions yet.
+            return self._bump_version()
+        return int(raw)
+
+    def _bump_version(self) -> int:
+        """Tell every worker's snapshot that the Redis cache changed."""
+        if self._redis is None:
+            return 0
+        with redis_call_seconds.labels("version").time():
+            # Start a missing counter (new or flushed Redis) from the clock, so
+            # versions never repeat one that a shared snapshot file on disk
+            # was built from.
+            self._redis.set(VERSION_KEY, int(time.time() * 1000), nx=True)
+            return int(self._redis.incr(VERSION_KEY))
 
     def _cache_one(self, plugin: PluginRecord) -> None:
         if self._redis is None:
@@ -330,6 +761,22 @@ class PluginRegistry:
         self._redis.set(key, plugin.model_dump_json())
         self._redis.sadd(INDEX_KEY, key)
 
+    def _cache_many(self, plugins: list[PluginRecord]) -> None:
+        if self._redis is None or not plugins:
+            return
+        values = {self._cache_key(p.workspace_id, p.plugin_id): p.model_dump_json() for p in plugins}
+        with redis_call_seconds.labels("write_many").time():
+            self._redis.mset(values)
+            self._redis.sadd(INDEX_KEY, *values)
+
+    def _cached_exists(self, keys: list[tuple[str, str]]) -> list[bool]:
+        self._ensure_cache()
+        if self._redis is None:
+            return [False] * len(keys)
+        with redis_call_seconds.labels("get").time():
+            raw_values = self._redis.mget([self._cache_key(ws, plugin) for ws, plugin in keys])
+        return [raw is not None for raw in raw_values]
+
     @staticmethod
     def _cache_key(workspace_id: str, plugin_id: str) -> str:
         return f"plugin:{workspace_id}:{plugin_id}"
@@ -339,6 +786,9 @@ class PluginRegistry:
     # ======================================================================
 
     def _connect(self):
+        if self._connect_override is not None:
+            return self._connect_override()
+
         if not all([self._db_url, self._db_http_path, self._db_token]):
             raise RuntimeError(
                 "Databricks credentials not fully configured. "
@@ -359,22 +809,48 @@ class PluginRegistry:
         )
 
     def _execute(self, query: str, params: list[Any] | None = None) -> None:
-        with self._connect() as conn:
+        def execute(conn) -> None:
             cursor = conn.cursor()
-            cursor.execute(query, params or [])
+            try:
+                cursor.execute(query, params or [])
+            finally:
+                cursor.close()
+            conn.commit()  # no-op on Databricks; needed by DB-API stand-ins
+
+        with databricks_call_seconds.labels("execute").time():
+            self._pool.run(execute)
 
     def _fetch_rows(self, query: str, params: list[Any] | None = None) -> list[dict[str, Any]]:
-        with self._connect() as conn:
+        def fetch(conn) -> list[dict[str, Any]]:
             cursor = conn.cursor()
-            cursor.execute(query, params or [])
-            rows = cursor.fetchall()
-            columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+            try:
+                cursor.execute(query, params or [])
+                rows = cursor.fetchall()
+                columns = [col[0] for col in cursor.description]
+            finally:
+                cursor.close()
+            return [dict(zip(columns, row)) for row in rows]
+
+        with databricks_call_seconds.labels("fetch").time():
+            return self._pool.run(fetch)
 
     def _read_all_from_db(self) -> list[PluginRecord]:
         rows = self._fetch_rows(f"SELECT * FROM {self._table}")
         return [PluginRecord.from_payload(row) for row in rows]
 
+    def _read_changed_from_db(self, watermark: str) -> list[PluginRecord]:
+        rows = self._fetch_rows(
+            f"SELECT * FROM {self._table} WHERE updated_at > ?",
+            [watermark],
+        )
+        return [PluginRecord.from_payload(row) for row in rows]
+
+    def _read_many_from_db(self, keys: list[tuple[str, str]]) -> list[PluginRecord]:
+        where = " OR ".join("(workspace_id = ? AND plugin_id = ?)" for _ in keys)
+        params = [value for key in keys for value in key]
+        rows = self._fetch_rows(f"SELECT * FROM {self._table} WHERE {where}", params)
+        return [PluginRecord.from_payload(row) for row in rows]
+
     def _read_one_from_db(self, workspace_id: str, plugin_id: str) -> PluginRecord:
         rows = self._fetch_rows(
             f"SELECT * FROM {self._table} WHERE workspace_id = ? AND plugin_id = ?",
@@ -387,4 +863,30 @@ class PluginRegistry:
         return PluginRecord.from_payload(rows[0])
 
 
+def _stale_connection_errors() -> tuple[type[BaseException], ...]:
+    """Errors that mean the connection itself is gone, so the call is retried on a new one."""
+    try:
+        from databricks.sql import exc as databricks_exc
+    except Exception:  # pragma: no cover - import environment dependent
+        return (ConnectionError,)
+    return (ConnectionError, databricks_exc.OperationalError, databricks_exc.InterfaceError)
+
+
 plugin_registry = PluginRegistry()
+registry_watcher = plugin_registry.local_watcher()
+
+metrics_registry.register(
+    CallbackMetric(
+        "compass_hub_databricks_pool_connections",
+        "Pooled Databricks connections by state.",
+        lambda: {(state,): plugin_registry.pool_stats()[state] for state in ("idle", "in_use")},
+        ("state",),
+    )
+)
+metrics_registry.register(
+    CallbackMetric(
+        "compass_hub_registry_data_age_seconds",
+        "Seconds since the plugin registry cache was last synced from Databricks.",
+        lambda: {} if (age := plugin_registry.data_age_seconds()) is None else {(): age},
+    )
+)
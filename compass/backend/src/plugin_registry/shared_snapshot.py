@@ -0,0 +1,305 @@
+"""
+Registry snapshots shared by the Hub workers of one node through a mapped file.
+
+With PLUGIN_REGISTRY_SHARED_SNAPSHOT_DIR set (ideally on tmpfs, e.g.
+/dev/shm/compass), the first worker to see a new registry version builds its
+RegistrySnapshot as usual and serializes it into one read-only file; the
+other workers memory-map that file instead of reading the source and
+building their own copy. File layout:
+
+  header   magic, generation, version length, index offset and length
+  version  the registry version (JSON) the file was built from
+  records  one JSON document per plugin, in snapshot order
+  index    JSON {workspace_id: [[plugin_id, offset, length, enabled], ...]},
+           workspaces in workspace_id order, plugins by position
+
+A refresh writes the next generation to a temporary file and renames it over
+the current one, so readers never see a partial file and a mapped older
+generation stays valid until its last reader drops it. Builders hold an
+flock on a lock file, so one rebuild serves the whole node. Only a worker
+without any snapshot yet (its first read, normally the Hub warm-up) waits
+for the lock; a worker that already serves one gets SharedSnapshotBusy and
+keeps serving it, so a request never blocks on another worker's build.
+Records are decoded on first access and kept by the worker that read them.
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import Callable, Hashable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no flock on Windows; builds may then overlap
+    fcntl = None
+
+from observability.metrics import registry_shared_snapshots_total
+from plugin_registry.models import PluginRecord, WorkspaceGroup
+from plugin_registry.snapshot import PluginKey, RegistrySnapshot
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CMPSNAP1"
+# magic, generation, version length, index offset, index length
+_HEADER = struct.Struct("<8sQQQQ")
+# Index entry fields.
+_PLUGIN_ID, _OFFSET, _LENGTH, _ENABLED = range(4)
+_MISSING = object()
+
+
+class SharedSnapshotError(RuntimeError):
+    """Raised when a snapshot file is truncated or was written in another format."""
+
+
+class SharedSnapshotBusy(Exception):
+    """Raised by `load_or_build(wait=False)` while another worker builds the snapshot."""
+
+
+def _version_bytes(version: Hashable) -> bytes:
+    # Registry versions are tuples of numbers, None and signature tuples.
+    return json.dumps(version, separators=(",", ":")).encode()
+
+
+class SharedRegistrySnapshot:
+    """Read-only view over one mapped snapshot file, with RegistrySnapshot's read interface."""
+
+    def __init__(
+        self,
+        buffer: mmap.mmap,
+        generation: int,
+        version: Hashable,
+        workspaces: dict[str, list[list]],
+    ) -> None:
+        self.version = version
+        self.generation = generation
+        self._buffer = buffer
+        self._workspaces = workspaces
+        self._locations: dict[PluginKey, list] = {
+            (workspace_id, entry[_PLUGIN_ID]): entry
+            for workspace_id, entries in workspaces.items()
+            for entry in entries
+        }
+        self._records: dict[PluginKey, PluginRecord] = {}
+        self._groups: dict[tuple[str, bool], Optional[WorkspaceGroup]] = {}
+        self._plugins: tuple[PluginRecord, ...] | None = None
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    @property
+    def plugins(self) -> tuple[PluginRecord, ...]:
+        """Every record in snapshot order (decodes the whole file once)."""
+        if self._plugins is None:
+            self._plugins = tuple(
+                self._decode(workspace_id, entry)
+                for workspace_id, entries in self._workspaces.items()
+                for entry in entries
+            )
+        return self._plugins
+
+    def get_one(self, workspace_id: str, plugin_id: str) -> Optional[PluginRecord]:
+        entry = self._locations.get((workspace_id, plugin_id))
+        return None if entry is None else self._decode(workspace_id, entry)
+
+    def grouped(
+        self,
+        workspace_filter: Optional[set[str]] = None,
+        enabled_only: bool = False,
+    ) -> list[WorkspaceGroup]:
+        if workspace_filter is None:
+            workspace_ids = list(self._workspaces)
+        elif len(workspace_filter) < len(self._workspaces):
+            workspace_ids = [ws for ws in sorted(workspace_filter) if ws in self._workspaces]
+        else:
+            workspace_ids = [ws for ws in self._workspaces if ws in workspace_filter]
+        groups = (self._group(workspace_id, enabled_only) for workspace_id in workspace_ids)
+        return [group for group in groups if group is not None]
+
+    def _group(self, workspace_id: str, enabled_only: bool) -> Optional[WorkspaceGroup]:
+        key = (workspace_id, enabled_only)
+        group = self._groups.get(key, _MISSING)
+        if group is _MISSING:
+            plugins = [
+                self._decode(workspace_id, entry)
+                for entry in self._workspaces[workspace_id]
+                if entry[_ENABLED] or not enabled_only
+            ]
+            # Like RegistrySnapshot, a workspace without enabled plugins has no enabled group.
+            group = None
+            if plugins:
+                group = WorkspaceGroup(
+                    workspace_id=workspace_id,
+                    workspace_name=plugins[0].workspace_name,
+                    workspace_description=plugins[0].workspace_description,
+                    plugins=plugins,
+                )
+            group = self._groups.setdefault(key, group)
+        return group
+
+    def _decode(self, workspace_id: str, entry: list) -> PluginRecord:
+        key = (workspace_id, entry[_PLUGIN_ID])
+        record = self._records.get(key)
+        if record is None:
+            offset, length = entry[_OFFSET], entry[_LENGTH]
+            record = PluginRecord.model_validate_json(self._buffer[offset:offset + length])
+            # Concurrent readers may both decode; every caller gets the stored one.
+            record = self._records.setdefault(key, record)
+        return record
+
+
+class SharedSnapshotStore:
+    """The shared snapshot file of one registry (source and table) in `directory`."""
+
+    def __init__(self, directory: Path, name: str) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        self._path = directory / f"{name}.snapshot"
+        self._lock_path = directory / f"{name}.lock"
+
+    def load_or_build(
+        self,
+        version: Hashable,
+        build: Callable[[], RegistrySnapshot],
+        wait: bool = True,
+    ) -> RegistrySnapshot | SharedRegistrySnapshot:
+        """
+        Map the shared file if it holds `version`; otherwise build and publish it.
+
+        Without `wait`, raises SharedSnapshotBusy instead of waiting for
+        another worker's build. Errors from `build` are raised unchanged. A
+        file that cannot be read or written is logged and the worker keeps
+        its own built snapshot.
+        """
+        snapshot = self._load(version)
+        if snapshot is not None:
+            registry_shared_snapshots_total.labels("attached").inc()
+            return snapshot
+
+        with self._build_lock(wait) as locked:
+            if not locked:
+                registry_shared_snapshots_total.labels("busy").inc()
+                raise SharedSnapshotBusy(str(self._lock_path))
+            # Another worker may have published this version while we waited.
+            snapshot = self._load(version)
+            if snapshot is not None:
+                registry_shared_snapshots_total.labels("attached").inc()
+                return snapshot
+
+            built = build()
+            try:
+                self._write(built)
+            except OSError:
+                registry_shared_snapshots_total.labels("error").inc()
+                logger.exception("Could not publish the shared registry snapshot to %s", self._path)
+            else:
+                registry_shared_snapshots_total.labels("published").inc()
+            return built
+
+    def generation(self) -> int:
+        """Generation of the current file (0 when there is none)."""
+        try:
+            with open(self._path, "rb") as handle:
+                magic, generation, *_ = _HEADER.unpack(handle.read(_HEADER.size))
+        except (OSError, struct.error):
+            return 0
+        return generation if magic == MAGIC else 0
+
+    # ======================================================================
+    # PRIVATE
+    # ======================================================================
+
+    def _load(self, version: Hashable) -> Optional[SharedRegistrySnapshot]:
+        try:
+            with open(self._path, "rb") as handle:
+                buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):  # ValueError: an empty file cannot be mapped
+            registry_shared_snapshots_total.labels("error").inc()
+            logger.exception("Could not map the shared registry snapshot %s", self._path)
+            return None
+
+        try:
+            generation, workspaces = self._read(buffer, _version_bytes(version))
+        except (SharedSnapshotError, ValueError):
+            buffer.close()
+            registry_shared_snapshots_total.labels("error").inc()
+            logger.exception("Ignoring unreadable shared registry snapshot %s", self._path)
+            return None
+        if workspaces is None:
+            buffer.close()
+            return None
+        return SharedRegistrySnapshot(buffer, generation, version, workspaces)
+
+    @staticmethod
+    def _read(buffer: mmap.mmap, version: bytes) -> tuple[int, Optional[dict[str, list[list]]]]:
+        """(generation, index) of a mapped file; index is None when the file holds another version."""
+        if len(buffer) < _HEADER.size:
+            raise SharedSnapshotError("shared registry snapshot is truncated")
+        magic, generation, version_length, index_offset, index_length = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise SharedSnapshotError("not a shared registry snapshot (bad magic)")
+        if index_offset + index_length > len(buffer):
+            raise SharedSnapshotError("shared registry snapshot is truncated")
+        if buffer[_HEADER.size:_HEADER.size + version_length] != version:
+            return generation, None
+        return generation, json.loads(buffer[index_offset:index_offset + index_length])
+
+    def _write(self, snapshot: RegistrySnapshot) -> None:
+        version = _version_bytes(snapshot.version)
+        generation = self.generation() + 1
+        workspaces: dict[str, list[list]] = {}
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._path.parent, prefix=f".{self._path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                # Records are streamed; the header is filled in once the index offset is known.
+                handle.write(bytes(_HEADER.size))
+                handle.write(version)
+                offset = _HEADER.size + len(version)
+                for plugin in snapshot.plugins:
+                    data = plugin.model_dump_json().encode()
+                    workspaces.setdefault(plugin.workspace_id, []).append(
+                        [plugin.plugin_id, offset, len(data), plugin.enabled]
+                    )
+                    handle.write(data)
+                    offset += len(data)
+                index = json.dumps(workspaces, separators=(",", ":")).encode()
+                handle.write(index)
+                handle.seek(0)
+                handle.write(_HEADER.pack(MAGIC, generation, len(version), offset, len(index)))
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            with suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    @contextmanager
+    def _build_lock(self, wait: bool) -> Iterator[bool]:
+        """Yields False when `wait` is off and another worker holds the lock."""
+        if fcntl is None:
+            yield True
+            return
+        try:
+            handle = open(self._lock_path, "a")
+        except OSError:
+            logger.exception("Could not open %s; building without the node lock", self._lock_path)
+            yield True
+            return
+        with handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
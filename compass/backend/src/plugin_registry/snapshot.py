@@ -0,0 +1,79 @@
+"""
+Immutable, pre-indexed views over one version of the plugin registry.
+
+A snapshot is built once per registry version (local file signature, Redis
+version counter, or both for overlay) and then shared by every request until
+the version changes. Grouped reads walk only the workspaces a caller may see
+and never sort plugins on the request path.
+
+Snapshots and the WorkspaceGroup objects they hand out are shared between
+requests: treat them as read-only.
+"""
+
+from dataclasses import dataclass
+from typing import Hashable, Iterable, Optional
+
+from plugin_registry.models import PluginRecord, WorkspaceGroup
+
+
+PluginKey = tuple[str, str]
+
+
+def _sort_key(plugin: PluginRecord) -> tuple[str, int, str]:
+    return (plugin.workspace_id, plugin.position, plugin.plugin_id)
+
+
+def _build_groups(plugins: Iterable[PluginRecord]) -> dict[str, WorkspaceGroup]:
+    """Group already-sorted plugins; dict order is workspace_id order."""
+    groups: dict[str, WorkspaceGroup] = {}
+    for plugin in plugins:
+        group = groups.get(plugin.workspace_id)
+        if group is None:
+            group = groups[plugin.workspace_id] = WorkspaceGroup(
+                workspace_id=plugin.workspace_id,
+                workspace_name=plugin.workspace_name,
+                workspace_description=plugin.workspace_description,
+                plugins=[],
+            )
+        group.plugins.append(plugin)
+    return groups
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    version: Hashable
+    plugins: tuple[PluginRecord, ...]
+    index: dict[PluginKey, PluginRecord]
+    groups: dict[str, WorkspaceGroup]
+    enabled_groups: dict[str, WorkspaceGroup]
+
+    @classmethod
+    def build(cls, plugins: Iterable[PluginRecord], version: Hashable) -> "RegistrySnapshot":
+        ordered = tuple(sorted(plugins, key=_sort_key))
+        return cls(
+            version=version,
+            plugins=ordered,
+            index={(p.workspace_id, p.plugin_id): p for p in ordered},
+            groups=_build_groups(ordered),
+            enabled_groups=_build_groups(p for p in ordered if p.enabled),
+        )
+
+    def __len__(self) -> int:
+        return len(self.plugins)
+
+    def get_one(self, workspace_id: str, plugin_id: str) -> Optional[PluginRecord]:
+        return self.index.get((workspace_id, plugin_id))
+
+    def grouped(
+        self,
+        workspace_filter: Optional[set[str]] = None,
+        enabled_only: bool = False,
+    ) -> list[WorkspaceGroup]:
+        view = self.enabled_groups if enabled_only else self.groups
+        if workspace_filter is None:
+            return list(view.values())
+
+        if len(workspace_filter) < len(view):
+            # Usual case: a user sees a few workspaces out of many.
+            return [view[ws] for ws in sorted(workspace_filter) if ws in view]
+        return [group for ws, group in view.items() if ws in workspace_filter]
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Header, HTTPException, status
 import redis
 
 from config.settings import settings
+from observability.tracing import tracer
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -48,6 +49,11 @@ def get_current_user(
 
     Identity source is the auth token only.
     """
+    with tracer.span("auth.get_current_user"):
+        return _authenticate(authorization)
+
+
+def _authenticate(authorization: str | None) -> dict[str, str]:
     if not authorization or not authorization.strip():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,91 @@
+"""
+Superadmin-only profiling endpoints (/debug).
+
+Only mounted when DEBUG_ENDPOINTS_ENABLED=true. Every call acts on the
+worker process that serves it; with several workers, repeat the call until
+the worker of interest answers (the response includes its pid).
+"""
+
+import os
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from config.settings import settings
+from observability.profiling import (
+    MemoryGroupBy,
+    MemoryTrackingError,
+    ProfilerBusyError,
+    ProfileSort,
+    memory_tracker,
+    profiler,
+)
+from plugin_registry.auth import get_user_roles, is_superadmin
+from routers.auth import get_current_user, session_db
+
+
+def _require_superadmin(user: dict[str, str] = Depends(get_current_user)) -> None:
+    if not is_superadmin(get_user_roles(session_db, user["user_email"])):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Superadmin role required",
+        )
+
+
+debug_router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    dependencies=[Depends(_require_superadmin)],
+)
+
+
+@debug_router.post(
+    "/profile",
+    response_class=PlainTextResponse,
+    summary="Admin: time-boxed CPU profile of this worker",
+)
+async def profile_worker(
+    seconds: float = Query(default=10.0, gt=0),
+    mode: Literal["sampling", "cprofile"] = "sampling",
+    interval_ms: float = Query(default=5.0, ge=1.0, le=1000.0),
+    sort: ProfileSort = "cumulative",
+    limit: int = Query(default=50, ge=1, le=500),
+) -> PlainTextResponse:
+    """
+    `sampling` returns collapsed stacks (flamegraph input) for all threads;
+    `cprofile` returns pstats text for the event loop thread.
+    """
+    seconds = min(seconds, settings.debug_profile_max_seconds)
+    try:
+        if mode == "cprofile":
+            body = await profiler.cprofile(seconds, sort=sort, limit=limit)
+        else:
+            body = await profiler.sample(seconds, interval_ms / 1000)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+    return PlainTextResponse(body, headers={"X-Worker-Pid": str(os.getpid())})
+
+
+@debug_router.post("/memory/start", summary="Admin: start tracemalloc and take a baseline")
+def start_memory_tracking(frames: int = Query(default=10, ge=1, le=100)) -> dict[str, Any]:
+    return {"pid": os.getpid(), **memory_tracker.start(frames)}
+
+
+@debug_router.get("/memory/diff", summary="Admin: top allocation growth since the baseline")
+def memory_diff(
+    top: int = Query(default=25, ge=1, le=500),
+    group_by: MemoryGroupBy = "lineno",
+    reset: bool = False,
+) -> dict[str, Any]:
+    """`reset=true` makes the new snapshot the baseline for the next diff."""
+    try:
+        return {"pid": os.getpid(), **memory_tracker.diff(top, group_by, reset)}
+    except MemoryTrackingError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+
+@debug_router.post("/memory/stop", summary="Admin: stop tracemalloc and drop the baseline")
+def stop_memory_tracking() -> dict[str, Any]:
+    return {"pid": os.getpid(), **memory_tracker.stop()}
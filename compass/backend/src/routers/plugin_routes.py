@@ -5,26 +5,39 @@ Logical groups:
   1) /plugins         - user-facing plugin catalog
   2) /plugins-config  - admin plugin CRUD
   3) /chats           - chat completion proxy to external plugin services
+                        (buffered per request so streams can be resumed)
 """
 
-import json
-from typing import Any, Optional
+import hashlib
+import time
+from typing import Any, AsyncIterator, Optional
 from uuid import uuid4
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 
-from config.service_resolver import ServiceResolverError, resolver
+from config.service_resolver import NoAvailableEndpointError, ServiceResolverError, resolver
 from config.settings import settings
 from db.memory import conversation_store
+from db.stream_buffer import StreamBuffer, stream_buffer_store
+from observability.metrics import (
+    client_first_frame_seconds,
+    stream_bytes,
+    stream_duration_seconds,
+    stream_errors_total,
+    stream_frames,
+)
+from observability.tracing import current_span, tracer
 from plugin_registry.auth import (
     ADMIN_ROLE_MAP,
     USER_ROLE_MAP,
     allowed_workspaces,
     get_user_roles,
+    is_superadmin,
 )
 from plugin_registry.models import (
+    PluginBulkUpdate,
     PluginMenuEntry,
     PluginRecord,
     PluginUpdate,
@@ -34,8 +47,15 @@ from plugin_registry.models import (
 from plugin_registry.registry import plugin_registry
 from routers.auth import get_current_user, session_db
 from schemas.chat import ChatCompletionRequest, ChatMessage, UserInputValue
-from schemas.frames import ErrorFrame
+from schemas.frames import ErrorFrame, MalformedFrameError
 from schemas.plugin_service import PluginServiceRequest
+from upstream.client import upstream_client
+from upstream.streams import (
+    UpstreamAttemptError,
+    UpstreamStream,
+    contract_version,
+    open_plugin_stream,
+)
 
 
 def _get_roles(user: dict[str, str]) -> list[str]:
@@ -58,9 +78,25 @@ def _require_workspace_access(
         )
 
 
+def _require_superadmin(roles: list[str]) -> None:
+    """Raise 403 unless the user may call Hub-wide operational endpoints."""
+    if not is_superadmin(roles):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Superadmin role required",
+        )
+
+
 def _is_plugin_routable(plugin: PluginRecord) -> bool:
-    """True when plugin has a configured service key -> URL mapping."""
-    return bool(plugin.service_key and resolver.is_configured(plugin.service_key))
+    """
+    True when plugin's service key has a replica that is neither ejected nor
+    down, and the service's manifest (when known) lists the plugin.
+    """
+    return bool(
+        plugin.service_key
+        and resolver.has_available(plugin.service_key)
+        and resolver.serves(plugin.service_key, plugin.plugin_id)
+    )
 
 
 # ============================================================================
@@ -176,7 +212,7 @@ async def get_plugin_config(
 @plugin_config_router.put(
     "/{workspace_id}/{plugin_id}/config",
     response_model=PluginRecord,
-    summary="Admin: update plugin name, description, instructions",
+    summary="Admin: update plugin name, description, instructions, position",
 )
 async def update_plugin_config(
     workspace_id: str,
@@ -187,7 +223,7 @@ async def update_plugin_config(
     if not update.has_changes():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Provide at least one of: plugin_name, description, instructions",
+            detail="Provide at least one of: plugin_name, description, instructions, position",
         )
 
     roles = _get_roles(user)
@@ -204,6 +240,37 @@ async def update_plugin_config(
     return plugin_registry.update(workspace_id, plugin_id, update)
 
 
+@plugin_config_router.put(
+    "/bulk",
+    response_model=list[PluginRecord],
+    summary="Admin: update many plugins in one statement (reorder, reword)",
+)
+async def bulk_update_plugin_config(
+    bulk: PluginBulkUpdate,
+    user: dict[str, str] = Depends(get_current_user),
+) -> list[PluginRecord]:
+    """
+    All-or-nothing: every plugin must exist and be in a workspace the caller
+    administers, otherwise nothing is written.
+    """
+    if len(bulk.updates) > settings.plugin_config_bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.plugin_config_bulk_max_items} plugins per bulk update",
+        )
+
+    roles = _get_roles(user)
+    for workspace_id in sorted({item.workspace_id for item in bulk.updates}):
+        _require_workspace_access(roles, workspace_id, ADMIN_ROLE_MAP)
+
+    try:
+        return plugin_registry.update_many(bulk.updates, updated_by=user["user_email"])
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+
 @plugin_config_router.post(
     "/invalidate-cache",
     summary="Admin: force plugin registry cache refresh",
@@ -214,6 +281,29 @@ async def invalidate_cache(user: dict[str, str] = Depends(get_current_user)) ->
     return {"status": "cache invalidated"}
 
 
+@plugin_config_router.post(
+    "/reload-services",
+    summary="Admin: reload service_key -> URL mapping without restart",
+)
+async def reload_services(
+    user: dict[str, str] = Depends(get_current_user),
+) -> dict[str, Any]:
+    """
+    Re-read SERVICE_URL_* and PLUGIN_SERVICES_LOCAL_FILE in this worker.
+
+    In-flight streams keep their current replica; new streams use the new map.
+    """
+    roles = _get_roles(user)
+    _require_superadmin(roles)
+
+    try:
+        mapping = resolver.reload()
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return {"status": "services reloaded", "services": mapping}
+
+
 # ============================================================================
 # 3) CHAT ROUTER (/chats)
 # ============================================================================
@@ -237,25 +327,27 @@ async def new_chat_completion(
 
     roles = _get_roles(user)
     user_email = user["user_email"]
-    plugin, service_url = _resolve_plugin(request.workspace, request.plugin)
+    plugin = _resolve_plugin(request.workspace, request.plugin)
+
+    dedupe_key = _single_flight_key(user_email, None, request)
+    inflight = _find_inflight(dedupe_key)
+    if inflight is not None:
+        return _buffered_stream_response(inflight)
 
     conversation = conversation_store.create_conversation(
         title=request.conversation[0].content[:80] or "New Chat"
     )
 
-    return StreamingResponse(
-        _proxy_plugin_stream(
-            plugin=plugin,
-            service_url=service_url,
-            conversation_id=conversation.id,
-            conversation=request.conversation,
-            user_inputs=request.user_inputs,
-            user_email=user_email,
-            roles=roles,
-        ),
-        media_type="application/x-ndjson",
-        headers={"X-Conversation-Id": conversation.id},
+    buffer = _start_buffered_stream(
+        plugin=plugin,
+        conversation_id=conversation.id,
+        conversation=request.conversation,
+        user_inputs=request.user_inputs,
+        user_email=user_email,
+        roles=roles,
+        dedupe_key=dedupe_key,
     )
+    return _buffered_stream_response(buffer)
 
 
 @chat_router.post(
@@ -277,21 +369,57 @@ async def existing_chat_completion(
 
     roles = _get_roles(user)
     user_email = user["user_email"]
-    plugin, service_url = _resolve_plugin(request.workspace, request.plugin)
+    plugin = _resolve_plugin(request.workspace, request.plugin)
 
-    return StreamingResponse(
-        _proxy_plugin_stream(
-            plugin=plugin,
-            service_url=service_url,
-            conversation_id=conversation_id,
-            conversation=request.conversation,
-            user_inputs=request.user_inputs,
-            user_email=user_email,
-            roles=roles,
-        ),
-        media_type="application/x-ndjson",
-        headers={"X-Conversation-Id": conversation_id},
+    dedupe_key = _single_flight_key(user_email, conversation_id, request)
+    inflight = _find_inflight(dedupe_key)
+    if inflight is not None:
+        return _buffered_stream_response(inflight)
+
+    buffer = _start_buffered_stream(
+        plugin=plugin,
+        conversation_id=conversation_id,
+        conversation=request.conversation,
+        user_inputs=request.user_inputs,
+        user_email=user_email,
+        roles=roles,
+        dedupe_key=dedupe_key,
     )
+    return _buffered_stream_response(buffer)
+
+
+@chat_router.get(
+    "/{conversation_id}/stream/{request_id}",
+    summary="Resume a chat stream from a frame offset",
+)
+async def resume_chat_stream(
+    conversation_id: str,
+    request_id: str,
+    offset: int = Query(default=0, ge=0),
+    user: dict[str, str] = Depends(get_current_user),
+):
+    """
+    Replay buffered frames from `offset` (the number of NDJSON lines already
+    received), then tail the still-running upstream stream.
+    """
+    buffer = stream_buffer_store.get(request_id)
+    if (
+        buffer is None
+        or buffer.conversation_id != conversation_id
+        or buffer.user_email != user["user_email"]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No resumable stream '{request_id}' for conversation '{conversation_id}'",
+        )
+
+    if offset < buffer.first_seq:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"Frames before offset {buffer.first_seq} are no longer buffered",
+        )
+
+    return _buffered_stream_response(buffer, offset)
 
 
 @chat_router.get("/{conversation_id}", summary="Debug: get in-memory conversation snapshot")
@@ -302,10 +430,103 @@ async def get_conversation_snapshot(conversation_id: str) -> dict[str, Any]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
 
+def _single_flight_key(
+    user_email: str,
+    conversation_id: Optional[str],
+    request: ChatCompletionRequest,
+) -> str:
+    """Identity of a chat turn: same user, same conversation, same payload."""
+    digest = hashlib.sha256(request.model_dump_json().encode("utf-8")).hexdigest()
+    return f"{user_email}:{conversation_id or 'new'}:{digest}"
+
+
+def _find_inflight(dedupe_key: str) -> Optional[StreamBuffer]:
+    """Duplicate in-flight turns join the existing upstream stream from frame 0."""
+    if not settings.chat_single_flight_enabled:
+        return None
+    return stream_buffer_store.find_inflight(dedupe_key)
+
+
+def _start_buffered_stream(
+    plugin: PluginRecord,
+    conversation_id: str,
+    conversation: list[ChatMessage],
+    user_inputs: list[UserInputValue],
+    user_email: str,
+    roles: list[str],
+    dedupe_key: Optional[str] = None,
+) -> StreamBuffer:
+    """
+    Run the upstream proxy in a background task that fills a StreamBuffer.
+
+    The task outlives the HTTP response, so a client disconnect does not
+    cancel the plugin generation and the assistant message is still persisted.
+    """
+    request_id = str(uuid4())
+    buffer = stream_buffer_store.create(request_id, conversation_id, user_email, dedupe_key)
+    frames = _proxy_plugin_stream(
+        plugin=plugin,
+        request_id=request_id,
+        conversation_id=conversation_id,
+        conversation=conversation,
+        user_inputs=user_inputs,
+        user_email=user_email,
+        roles=roles,
+    )
+    stream_buffer_store.run(buffer, _pump_stream(frames, buffer, plugin))
+    return buffer
+
+
+async def _pump_stream(
+    frames: AsyncIterator[str],
+    buffer: StreamBuffer,
+    plugin: PluginRecord,
+) -> None:
+    labels = (plugin.plugin_id, plugin.service_key or "")
+    started = time.perf_counter()
+    frame_count = 0
+    byte_count = 0
+    with tracer.span(
+        "chat.stream",
+        request_id=buffer.request_id,
+        conversation_id=buffer.conversation_id,
+        plugin_id=plugin.plugin_id,
+    ) as span:
+        try:
+            async for frame in frames:
+                if frame_count == 0:
+                    first_frame_seconds = time.perf_counter() - started
+                    client_first_frame_seconds.labels(*labels).observe(first_frame_seconds)
+                    span.set_attribute("first_frame_ms", round(first_frame_seconds * 1000, 3))
+                frame_count += 1
+                size = len(frame.encode("utf-8"))
+                byte_count += size
+                buffer.append(frame, size)
+        finally:
+            buffer.close()
+            stream_duration_seconds.labels(*labels).observe(time.perf_counter() - started)
+            stream_frames.labels(*labels).observe(frame_count)
+            stream_bytes.labels(*labels).observe(byte_count)
+            span.set_attribute("frames", frame_count)
+            span.set_attribute("bytes", byte_count)
+
+
+def _buffered_stream_response(buffer: StreamBuffer, offset: int = 0) -> StreamingResponse:
+    return StreamingResponse(
+        buffer.subscribe(offset),
+        media_type="application/x-ndjson",
+        headers={
+            "X-Conversation-Id": buffer.conversation_id,
+            "X-Request-Id": buffer.request_id,
+            "X-Stream-Offset": str(offset),
+        },
+    )
+
+
 def _resolve_plugin(
     workspace_id: Optional[str],
     plugin_id: Optional[str],
-) -> tuple[PluginRecord, str]:
+) -> PluginRecord:
     if not workspace_id or not plugin_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -325,15 +546,27 @@ def _resolve_plugin(
             detail=f"Plugin '{plugin_id}' does not have a service_key configured",
         )
 
-    try:
-        service_url = resolver.resolve(plugin.service_key)
-    except ServiceResolverError as exc:
+    if not resolver.is_configured(plugin.service_key):
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Plugin service is not configured for key '{plugin.service_key}'",
-        ) from exc
+        )
 
-    return plugin, service_url
+    if not resolver.has_available(plugin.service_key):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"All replicas for service key '{plugin.service_key}' are down or ejected",
+        )
+
+    if not resolver.serves(plugin.service_key, plugin_id):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Plugin service '{plugin.service_key}' does not serve plugin '{plugin_id}'",
+        )
+
+    # The replica itself is picked when the stream starts, so outstanding
+    # counts reflect streams that are actually running.
+    return plugin
 
 
 def _normalize_plugin_error_content(content: Any) -> dict[str, Any]:
@@ -353,7 +586,7 @@ def _normalize_plugin_error_content(content: Any) -> dict[str, Any]:
 
 async def _proxy_plugin_stream(
     plugin: PluginRecord,
-    service_url: str,
+    request_id: str,
     conversation_id: str,
     conversation: list[ChatMessage],
     user_inputs: list[UserInputValue],
@@ -364,15 +597,16 @@ async def _proxy_plugin_stream(
     Stream proxy flow:
       1) Build PluginServiceRequest
       2) Persist user message
-      3) Stream plugin NDJSON frames to frontend
+      3) Open the upstream stream (retrying/hedging before the first frame)
+         and forward plugin frames to frontend as NDJSON
       4) Persist assistant message (including partial output on failures)
     """
-    request_id = str(uuid4())
     conv_messages = [msg.model_dump() for msg in conversation]
     user_input_values = [inp.model_dump() for inp in user_inputs]
     user_message = conv_messages[-1] if conv_messages else {"role": "user", "content": ""}
 
     plugin_request = PluginServiceRequest(
+        contract_version=contract_version(plugin.service_key),
         request_id=request_id,
         plugin_id=plugin.plugin_id,
         workspace_id=plugin.workspace_id,
@@ -398,67 +632,53 @@ async def _proxy_plugin_stream(
     citations: list[dict] = []
     terminal_error: dict | None = None
 
-    timeout = httpx.Timeout(timeout=None, connect=settings.plugin_stream_connect_timeout_seconds)
-    plugin_endpoint = f"{service_url.rstrip('/')}/plugin/response"
+    upstream: UpstreamStream | None = None
+    service_url = ""
 
     try:
-        async with httpx.AsyncClient(timeout=timeout, trust_env=False) as client:
-            async with client.stream(
-                "POST",
-                plugin_endpoint,
-                json=plugin_request.model_dump(),
-            ) as response:
-                if response.status_code >= 400:
-                    body = await response.aread()
-                    terminal_error = {
-                        "code": "UPSTREAM_HTTP_ERROR",
-                        "message": "Plugin service returned a non-success status.",
-                        "retryable": response.status_code >= 500,
-                        "details": {
-                            "status_code": response.status_code,
-                            "response_body": body.decode("utf-8", errors="replace"),
-                        },
-                    }
-                    yield ErrorFrame(content=terminal_error).serialize()
-                    return
-
-                async for line in response.aiter_lines():
-                    if not line:
-                        continue
-
-                    try:
-                        frame = json.loads(line)
-                    except json.JSONDecodeError:
-                        terminal_error = {
-                            "code": "MALFORMED_UPSTREAM_FRAME",
-                            "message": "Plugin service returned malformed stream data.",
-                            "retryable": False,
-                            "details": {"line": line},
-                        }
-                        yield ErrorFrame(content=terminal_error).serialize()
-                        break
-
-                    frame_type = frame.get("type")
-                    if frame_type == "llm":
-                        assistant_content += str(frame.get("content", ""))
-                        yield line + "\n"
-                    elif frame_type == "citation":
-                        citations.append(frame.get("content", {}))
-                        yield line + "\n"
-                    elif frame_type == "error":
-                        terminal_error = _normalize_plugin_error_content(frame.get("content"))
-                        # Preserve plugin-provided error frame for frontend UX control.
-                        normalized_line = ErrorFrame(content=terminal_error).serialize()
-                        yield normalized_line
-                        break
-                    else:
-                        pass
-    except httpx.ConnectError:
+        async with upstream_client.session() as client:
+            try:
+                upstream = await open_plugin_stream(
+                    client,
+                    plugin.service_key or "",
+                    plugin_request.model_dump(),
+                )
+            except UpstreamAttemptError as exc:
+                terminal_error = exc.error
+                yield ErrorFrame(content=terminal_error).serialize()
+                return
+
+            service_url = upstream.endpoint.url
+            async for frame, line in upstream.iter_frames():
+                frame_type = frame.get("type")
+                if frame_type == "llm":
+                    assistant_content += str(frame.get("content", ""))
+                    yield line + "\n"
+                elif frame_type == "citation":
+                    citations.append(frame.get("content", {}))
+                    yield line + "\n"
+                elif frame_type == "error":
+                    terminal_error = _normalize_plugin_error_content(frame.get("content"))
+                    # Preserve plugin-provided error frame for frontend UX control.
+                    normalized_line = ErrorFrame(content=terminal_error).serialize()
+                    yield normalized_line
+                    break
+                else:
+                    pass
+    except ServiceResolverError as exc:
         terminal_error = {
-            "code": "UPSTREAM_CONNECTION_ERROR",
-            "message": "Could not connect to plugin service.",
-            "retryable": True,
-            "details": {"service_url": service_url},
+            "code": "UPSTREAM_UNAVAILABLE",
+            "message": "No plugin service replica is available.",
+            "retryable": isinstance(exc, NoAvailableEndpointError),
+            "details": {"service_key": plugin.service_key},
+        }
+        yield ErrorFrame(content=terminal_error).serialize()
+    except MalformedFrameError as exc:
+        terminal_error = {
+            "code": "MALFORMED_UPSTREAM_FRAME",
+            "message": "Plugin service returned malformed stream data.",
+            "retryable": False,
+            "details": {"line": exc.raw},
         }
         yield ErrorFrame(content=terminal_error).serialize()
     except httpx.ReadError:
@@ -486,6 +706,17 @@ async def _proxy_plugin_stream(
         }
         yield ErrorFrame(content=terminal_error).serialize()
     finally:
+        if upstream is not None:
+            await upstream.aclose()
+
+        if terminal_error:
+            current_span().set_error(str(terminal_error.get("code", "")))
+            stream_errors_total.labels(
+                plugin.plugin_id,
+                plugin.service_key or "",
+                str(terminal_error.get("code", "")),
+            ).inc()
+
         stored_content = assistant_content.strip()
         if not stored_content and terminal_error:
             stored_content = terminal_error.get("message", "Plugin service error.")
@@ -1,7 +1,22 @@
+import json
+import struct
 from typing import Any, Literal
 
 from pydantic import BaseModel
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - v2 framing is optional
+    msgpack = None
+
+
+# Contract v1: one JSON object per line.
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Contract v2: 4-byte big-endian length prefix + MessagePack map per frame.
+MSGPACK_FRAMES_MEDIA_TYPE = "application/vnd.compass.frames+msgpack"
+
+_LENGTH_PREFIX = struct.Struct(">I")
+
 
 class BaseFrame(BaseModel):
     def serialize(self) -> str:
@@ -21,3 +36,68 @@ class CitationFrame(BaseFrame):
 class ErrorFrame(BaseFrame):
     type: Literal["error"] = "error"
     content: dict[str, Any]
+
+
+class MalformedFrameError(ValueError):
+    """Raised when upstream stream data cannot be decoded into a frame."""
+
+    def __init__(self, raw: str) -> None:
+        super().__init__("Malformed upstream frame")
+        self.raw = raw
+
+
+def msgpack_frames_supported() -> bool:
+    return msgpack is not None
+
+
+def decode_ndjson_line(line: str) -> dict[str, Any]:
+    try:
+        frame = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise MalformedFrameError(line) from exc
+    if not isinstance(frame, dict):
+        raise MalformedFrameError(line)
+    return frame
+
+
+def encode_ndjson_line(frame: dict[str, Any]) -> str:
+    """Browser-facing NDJSON line for a frame decoded from a binary upstream."""
+    return json.dumps(frame, ensure_ascii=False, separators=(",", ":"))
+
+
+class LengthPrefixedFrameDecoder:
+    """Incremental decoder for contract v2 (length-prefixed MessagePack) streams."""
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed; contract v2 framing is unavailable.")
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> list[dict[str, Any]]:
+        self._buffer += chunk
+        frames: list[dict[str, Any]] = []
+        offset = 0
+        buffered = len(self._buffer)
+        with memoryview(self._buffer) as view:
+            while buffered - offset >= _LENGTH_PREFIX.size:
+                (length,) = _LENGTH_PREFIX.unpack_from(view, offset)
+                end = offset + _LENGTH_PREFIX.size + length
+                if end > buffered:
+                    break
+                with view[offset + _LENGTH_PREFIX.size:end] as payload:
+                    try:
+                        frame = msgpack.unpackb(payload, raw=False)
+                    except Exception as exc:
+                        raise MalformedFrameError(payload.hex()) from exc
+                if not isinstance(frame, dict):
+                    raise MalformedFrameError(repr(frame))
+                frames.append(frame)
+                offset = end
+        if offset:
+            del self._buffer[:offset]
+        return frames
+
+    def close(self) -> None:
+        """Raise if the stream ended in the middle of a frame."""
+        if self._buffer:
+            raise MalformedFrameError(bytes(self._buffer).hex())
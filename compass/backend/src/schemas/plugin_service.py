@@ -7,10 +7,14 @@ class PluginServiceRequest(BaseModel):
     """
     Contract between Compass Hub and plugin service.
 
-    Contract version v1 is the first stable external plugin contract.
+    Contract version v1 is the first stable external plugin contract: the
+    service streams NDJSON frames. v2 keeps the same request envelope and lets
+    the service answer with length-prefixed MessagePack frames when the Hub
+    advertises them in `Accept`; the service may still fall back to NDJSON and
+    the Hub decodes by response Content-Type.
     """
 
-    contract_version: Literal["v1"] = "v1"
+    contract_version: Literal["v1", "v2"] = "v1"
     request_id: str
     plugin_id: str
     workspace_id: str
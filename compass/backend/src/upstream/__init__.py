@@ -0,0 +1 @@
+"""Runtime helpers for talking to upstream plugin services."""
@@ -0,0 +1,110 @@
+"""
+Background health probing of plugin service replicas.
+
+Each resolved endpoint is probed at `GET {service_url}{SERVICE_HEALTH_PATH}`
+on an interval. The default `/ready` keeps traffic off a replica that is
+still warming up (503); services without that route answer 404, which
+counts as up. Results are written onto the ServiceEndpoint objects held by
+the resolver, so `resolver.has_available` / `resolver.pick` see dead
+replicas without opening a connection on the request path. Failing
+endpoints back off exponentially (with jitter) up to
+`service_health_max_backoff_seconds`.
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+
+from config.service_resolver import ServiceEndpoint, resolver
+from config.settings import settings
+from upstream.client import upstream_client
+
+
+logger = logging.getLogger(__name__)
+
+
+# Doublings of the probe interval before the max backoff always applies;
+# keeps the power bounded for replicas that stay down for days.
+MAX_BACKOFF_EXPONENT = 16
+
+
+def _jittered(seconds: float) -> float:
+    return seconds * random.uniform(0.8, 1.2)
+
+
+class ServiceHealthMonitor:
+    """Owns the probe loop task started from the Hub lifespan."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if not settings.service_health_enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="service-health-monitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def probe_all(self) -> None:
+        """Probe every endpoint that is due; safe to call directly (e.g. at startup)."""
+        now = time.monotonic()
+        due = [endpoint for endpoint in resolver.all_endpoints() if endpoint.next_probe_at <= now]
+        if not due:
+            return
+
+        # Probes share the streams' client, so they also keep its connections warm.
+        async with upstream_client.session() as client:
+            await asyncio.gather(*(self._probe(client, endpoint) for endpoint in due))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception:  # pragma: no cover - keep the loop alive
+                logger.exception("Service health probe cycle failed")
+            await asyncio.sleep(_jittered(settings.service_health_interval_seconds))
+
+    async def _probe(self, client: httpx.AsyncClient, endpoint: ServiceEndpoint) -> None:
+        started = time.perf_counter()
+        try:
+            response = await client.get(
+                f"{endpoint.url.rstrip('/')}{settings.service_health_path}",
+                timeout=httpx.Timeout(settings.service_health_timeout_seconds),
+            )
+            healthy = response.status_code < 500
+        except httpx.HTTPError:
+            healthy = False
+
+        interval = settings.service_health_interval_seconds
+        if healthy:
+            endpoint.mark_up((time.perf_counter() - started) * 1000)
+            endpoint.next_probe_at = time.monotonic() + _jittered(interval)
+            return
+
+        was_down = endpoint.health == "down"
+        endpoint.mark_down()
+        backoff = min(
+            interval * (2 ** min(endpoint.probe_failures - 1, MAX_BACKOFF_EXPONENT)),
+            settings.service_health_max_backoff_seconds,
+        )
+        endpoint.next_probe_at = time.monotonic() + _jittered(backoff)
+        if not was_down:
+            logger.warning(
+                "Plugin service replica marked down: service_key=%s url=%s",
+                endpoint.service_key,
+                endpoint.url,
+            )
+
+
+health_monitor = ServiceHealthMonitor()
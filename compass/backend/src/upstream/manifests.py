@@ -0,0 +1,117 @@
+"""
+Background fetching of plugin service capability manifests.
+
+Every replica is asked for `GET {service_url}{SERVICE_MANIFEST_PATH}` at
+startup (Hub warm-up) and every SERVICE_MANIFEST_REFRESH_SECONDS. The parsed
+ServiceManifest is written onto the replica's ServiceEndpoint, like health
+state, and the resolver combines them per service_key:
+
+  - `resolver.serves` hides plugins their service does not host from the
+    catalog, and chats for them are refused without a round trip
+  - `resolver.supports_contract` keeps contract v2 off services that only
+    speak v1
+  - `resolver.pick(..., plugin_id=...)` skips a replica once this worker's
+    streams fill the plugin's capacity there (max_concurrency + max_queue),
+    instead of sending a request it would reject as busy
+
+Replicas are asked one by one because they may run different versions
+during a rolling deploy. A service without the route (404) has no manifest
+and is routed as before; a failed fetch keeps the replica's last manifest.
+"""
+
+import asyncio
+import logging
+import random
+
+import httpx
+
+from config.service_resolver import ServiceEndpoint, ServiceManifest, resolver
+from config.settings import settings
+from observability.metrics import service_manifest_fetches_total
+from upstream.client import upstream_client
+
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestMonitor:
+    """Owns the manifest refresh task started from the Hub lifespan."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if not settings.service_manifest_enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="service-manifest-monitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def refresh_all(self) -> dict[str, int]:
+        """Fetch every replica's manifest now; returns replica counts per result."""
+        endpoints = resolver.all_endpoints()
+        async with upstream_client.session() as client:
+            results = await asyncio.gather(*(self._fetch(client, endpoint) for endpoint in endpoints))
+        counts: dict[str, int] = {}
+        for result in results:
+            counts[result] = counts.get(result, 0) + 1
+        return counts
+
+    async def _run(self) -> None:
+        while True:
+            # The first pass belongs to the Hub warm-up; start with a wait.
+            interval = settings.service_manifest_refresh_seconds
+            await asyncio.sleep(interval * random.uniform(0.8, 1.2))
+            try:
+                await self.refresh_all()
+            except Exception:  # pragma: no cover - keep the loop alive
+                logger.exception("Service manifest refresh failed")
+
+    async def _fetch(self, client: httpx.AsyncClient, endpoint: ServiceEndpoint) -> str:
+        result = "error"
+        try:
+            response = await client.get(
+                f"{endpoint.url.rstrip('/')}{settings.service_manifest_path}",
+                timeout=httpx.Timeout(settings.service_health_timeout_seconds),
+            )
+            if response.status_code in {404, 405}:
+                # Service predates manifests: route it as before.
+                endpoint.manifest = None
+                result = "unsupported"
+            elif response.status_code == 200:
+                endpoint.manifest = ServiceManifest.from_payload(response.json())
+                result = "ok"
+            else:
+                logger.warning(
+                    "Manifest fetch failed: service_key=%s url=%s status=%s",
+                    endpoint.service_key,
+                    endpoint.url,
+                    response.status_code,
+                )
+        except httpx.HTTPError as exc:
+            logger.warning(
+                "Manifest fetch failed: service_key=%s url=%s error=%s",
+                endpoint.service_key,
+                endpoint.url,
+                exc,
+            )
+        except ValueError as exc:
+            logger.warning(
+                "Ignoring invalid manifest: service_key=%s url=%s error=%s",
+                endpoint.service_key,
+                endpoint.url,
+                exc,
+            )
+        service_manifest_fetches_total.labels(endpoint.service_key, result).inc()
+        return result
+
+
+manifest_monitor = ManifestMonitor()
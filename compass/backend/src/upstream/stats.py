@@ -0,0 +1,110 @@
+"""In-process counters and latency windows for upstream plugin calls."""
+
+from collections import deque
+
+from config.service_resolver import resolver
+from config.settings import settings
+from observability.metrics import CallbackMetric, registry
+
+
+# Samples kept per service_key for the first-byte latency quantile.
+FIRST_BYTE_WINDOW = 256
+# Minimum samples before the observed quantile replaces the configured default.
+MIN_QUANTILE_SAMPLES = 20
+
+
+class UpstreamStats:
+    """
+    Per-process upstream call statistics.
+
+    Counters are plain integers mutated on the event loop thread only.
+    """
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.retries = 0
+        self.hedges_started = 0
+        self.hedges_won = 0
+        self._first_byte: dict[str, deque[float]] = {}
+
+    def observe_first_byte(self, service_key: str, seconds: float) -> None:
+        window = self._first_byte.get(service_key)
+        if window is None:
+            window = self._first_byte[service_key] = deque(maxlen=FIRST_BYTE_WINDOW)
+        window.append(seconds)
+
+    def first_byte_quantile(self, service_key: str, quantile: float) -> float | None:
+        window = self._first_byte.get(service_key)
+        if not window or len(window) < MIN_QUANTILE_SAMPLES:
+            return None
+        ordered = sorted(window)
+        index = min(int(quantile * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+    def hedge_delay(self, service_key: str) -> float:
+        """Delay before hedging: observed first-byte quantile, floored, else the default."""
+        observed = self.first_byte_quantile(service_key, settings.plugin_stream_hedge_quantile)
+        if observed is None:
+            return settings.plugin_stream_hedge_default_delay_seconds
+        return max(observed, settings.plugin_stream_hedge_min_delay_seconds)
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges_started": self.hedges_started,
+            "hedges_won": self.hedges_won,
+        }
+
+
+upstream_stats = UpstreamStats()
+
+
+registry.register(
+    CallbackMetric(
+        "compass_hub_upstream_attempts_total",
+        "Upstream plugin requests sent, including retries and hedges.",
+        lambda: {(): upstream_stats.attempts},
+        kind="counter",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "compass_hub_upstream_retries_total",
+        "Upstream attempts retried before the first frame.",
+        lambda: {(): upstream_stats.retries},
+        kind="counter",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "compass_hub_upstream_hedges_started_total",
+        "Hedged upstream requests sent to a second replica.",
+        lambda: {(): upstream_stats.hedges_started},
+        kind="counter",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "compass_hub_upstream_hedges_won_total",
+        "Hedged upstream requests that produced the first frame before the original.",
+        lambda: {(): upstream_stats.hedges_won},
+        kind="counter",
+    )
+)
+registry.register(
+    CallbackMetric(
+        "compass_hub_upstream_outstanding_streams",
+        "Streams currently open per plugin service replica.",
+        lambda: {(e.service_key, e.url): e.outstanding for e in resolver.all_endpoints()},
+        labelnames=("service_key", "url"),
+    )
+)
+registry.register(
+    CallbackMetric(
+        "compass_hub_upstream_endpoint_available",
+        "1 when a replica is routable (breaker not open, health probe not failing).",
+        lambda: {(e.service_key, e.url): int(e.is_available()) for e in resolver.all_endpoints()},
+        labelnames=("service_key", "url"),
+    )
+)
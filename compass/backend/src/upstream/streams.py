@@ -0,0 +1,355 @@
+"""
+Opening plugin service streams with pre-first-byte retry and hedging.
+
+Nothing has been forwarded to the client until the first upstream frame
+arrives, so up to that point an attempt can safely be retried on another
+replica with the same request envelope (same `request_id`). When hedging is
+enabled, a second replica is tried if the first has not produced a frame
+within the observed first-byte quantile; the first replica to produce a frame
+wins and the other attempt is cancelled. Replicas already holding as many
+streams of the plugin as their manifest allows are not picked.
+
+Frames are decoded by response Content-Type: NDJSON (contract v1) or
+length-prefixed MessagePack (contract v2). Either way the proxy receives
+`(frame, ndjson_line)` pairs; for v1 the line is the upstream bytes as-is.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+import httpx
+
+from config.service_resolver import NoAvailableEndpointError, ServiceEndpoint, resolver
+from config.settings import settings
+from observability.metrics import upstream_first_byte_seconds
+from observability.tracing import current_span, tracer
+from schemas.frames import (
+    MSGPACK_FRAMES_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    LengthPrefixedFrameDecoder,
+    MalformedFrameError,
+    decode_ndjson_line,
+    encode_ndjson_line,
+    msgpack_frames_supported,
+)
+from upstream.stats import upstream_stats
+
+
+UpstreamFrame = tuple[dict[str, Any], str]
+
+
+class UpstreamAttemptError(Exception):
+    """An attempt failed before the first frame; carries the client-facing error payload."""
+
+    def __init__(self, error: dict[str, Any], retryable: bool) -> None:
+        super().__init__(error.get("message", "Upstream attempt failed."))
+        self.error = error
+        self.retryable = retryable
+
+
+@dataclass
+class UpstreamStream:
+    """A plugin response whose first frame has already been read."""
+
+    endpoint: ServiceEndpoint
+    response: httpx.Response
+    first_frame: UpstreamFrame | None
+    _frames: AsyncIterator[UpstreamFrame]
+    plugin_id: str = ""
+    # Token of the endpoint's half-open trial slot, if this stream holds it.
+    trial: object | None = None
+
+    async def iter_frames(self) -> AsyncIterator[UpstreamFrame]:
+        if self.first_frame is not None:
+            yield self.first_frame
+        async for frame in self._frames:
+            yield frame
+
+    async def aclose(self) -> None:
+        try:
+            await self.response.aclose()
+        finally:
+            self.endpoint.release(self.plugin_id, self.trial)
+
+
+def contract_version(service_key: str | None = None) -> str:
+    """
+    Contract version to request; v2 needs msgpack on the Hub side and, when
+    `service_key` is given, no replica whose manifest lacks v2.
+    """
+    if settings.plugin_contract_version == "v2" and msgpack_frames_supported():
+        if service_key is None or resolver.supports_contract(service_key, "v2"):
+            return "v2"
+    return "v1"
+
+
+def _accept_header(version: str) -> str:
+    if version == "v2":
+        return f"{MSGPACK_FRAMES_MEDIA_TYPE}, {NDJSON_MEDIA_TYPE};q=0.5"
+    return NDJSON_MEDIA_TYPE
+
+
+async def _iter_frames(response: httpx.Response) -> AsyncIterator[UpstreamFrame]:
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith(MSGPACK_FRAMES_MEDIA_TYPE):
+        decoder = LengthPrefixedFrameDecoder()
+        async for chunk in response.aiter_bytes():
+            for frame in decoder.feed(chunk):
+                yield frame, encode_ndjson_line(frame)
+        decoder.close()
+        return
+
+    async for line in response.aiter_lines():
+        if line:
+            yield decode_ndjson_line(line), line
+
+
+def _attempt_error(code: str, message: str, endpoint: ServiceEndpoint) -> UpstreamAttemptError:
+    return UpstreamAttemptError(
+        {
+            "code": code,
+            "message": message,
+            "retryable": True,
+            "details": {"service_url": endpoint.url},
+        },
+        retryable=True,
+    )
+
+
+async def _attempt(
+    client: httpx.AsyncClient,
+    endpoint: ServiceEndpoint,
+    payload: dict[str, Any],
+    trial: object | None = None,
+) -> UpstreamStream:
+    with tracer.span("upstream.attempt", url=endpoint.url) as span:
+        stream = await _send_attempt(client, endpoint, payload, trial)
+        span.set_attribute("status_code", stream.response.status_code)
+        return stream
+
+
+async def _send_attempt(
+    client: httpx.AsyncClient,
+    endpoint: ServiceEndpoint,
+    payload: dict[str, Any],
+    trial: object | None = None,
+) -> UpstreamStream:
+    headers = {"Accept": _accept_header(payload.get("contract_version", "v1"))}
+    traceparent = current_span().traceparent
+    if traceparent:
+        headers["traceparent"] = traceparent
+    request = client.build_request(
+        "POST",
+        f"{endpoint.url.rstrip('/')}/plugin/response",
+        json=payload,
+        headers=headers,
+    )
+    started = time.perf_counter()
+
+    try:
+        response = await client.send(request, stream=True)
+    except httpx.ConnectError as exc:
+        endpoint.record_failure(trial)
+        raise _attempt_error(
+            "UPSTREAM_CONNECTION_ERROR", "Could not connect to plugin service.", endpoint
+        ) from exc
+    except httpx.TimeoutException as exc:
+        if isinstance(exc, httpx.ConnectTimeout):
+            endpoint.record_failure(trial)
+        raise _attempt_error(
+            "UPSTREAM_TIMEOUT", "Plugin service request timed out.", endpoint
+        ) from exc
+    except httpx.TransportError as exc:
+        # Typically a pooled keep-alive connection the replica already closed
+        # (RemoteProtocolError / ReadError before any response header).
+        endpoint.record_failure(trial)
+        raise _attempt_error(
+            "UPSTREAM_CONNECTION_ERROR", "Plugin service closed the connection.", endpoint
+        ) from exc
+
+    # Replica accepted the connection; close its circuit breaker.
+    endpoint.record_success(trial)
+
+    try:
+        if response.status_code >= 400:
+            body = await response.aread()
+            raise UpstreamAttemptError(
+                {
+                    "code": "UPSTREAM_HTTP_ERROR",
+                    "message": "Plugin service returned a non-success status.",
+                    "retryable": response.status_code >= 500,
+                    "details": {
+                        "status_code": response.status_code,
+                        "response_body": body.decode("utf-8", errors="replace"),
+                    },
+                },
+                retryable=response.status_code in {502, 503, 504},
+            )
+
+        frames = _iter_frames(response)
+        first_frame: UpstreamFrame | None = None
+        try:
+            first_frame = await frames.__anext__()
+        except StopAsyncIteration:
+            pass
+        except MalformedFrameError as exc:
+            raise UpstreamAttemptError(
+                {
+                    "code": "MALFORMED_UPSTREAM_FRAME",
+                    "message": "Plugin service returned malformed stream data.",
+                    "retryable": False,
+                    "details": {"line": exc.raw},
+                },
+                retryable=False,
+            ) from exc
+        except httpx.TimeoutException as exc:
+            raise _attempt_error(
+                "UPSTREAM_TIMEOUT", "Plugin service request timed out.", endpoint
+            ) from exc
+        except httpx.TransportError as exc:
+            endpoint.record_failure(trial)
+            raise _attempt_error(
+                "UPSTREAM_READ_ERROR", "Lost connection while reading plugin stream.", endpoint
+            ) from exc
+
+        elapsed = time.perf_counter() - started
+        upstream_stats.observe_first_byte(endpoint.service_key, elapsed)
+        upstream_first_byte_seconds.labels(payload.get("plugin_id", ""), endpoint.service_key).observe(
+            elapsed
+        )
+        return UpstreamStream(
+            endpoint=endpoint,
+            response=response,
+            first_frame=first_frame,
+            _frames=frames,
+            plugin_id=payload.get("plugin_id", ""),
+            trial=trial,
+        )
+    except BaseException:
+        await response.aclose()
+        raise
+
+
+async def _race_first_byte(
+    client: httpx.AsyncClient,
+    service_key: str,
+    primary: ServiceEndpoint,
+    payload: dict[str, Any],
+    tried: list[ServiceEndpoint],
+) -> UpstreamStream:
+    """Run one attempt, adding a hedged attempt on another replica if it is slow."""
+    plugin_id = payload.get("plugin_id", "")
+    trial = primary.acquire(plugin_id)
+    upstream_stats.attempts += 1
+    primary_task = asyncio.create_task(_attempt(client, primary, payload, trial))
+    tasks: dict[asyncio.Task, tuple[ServiceEndpoint, object | None]] = {primary_task: (primary, trial)}
+    winner: asyncio.Task | None = None
+
+    try:
+        if settings.plugin_stream_hedge_enabled:
+            delay = upstream_stats.hedge_delay(service_key)
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if not done:
+                try:
+                    hedge = resolver.pick(service_key, exclude=tried, plugin_id=plugin_id)
+                except NoAvailableEndpointError:
+                    hedge = None
+                if hedge is not None:
+                    tried.append(hedge)
+                    hedge_trial = hedge.acquire(plugin_id)
+                    upstream_stats.attempts += 1
+                    upstream_stats.hedges_started += 1
+                    tasks[asyncio.create_task(_attempt(client, hedge, payload, hedge_trial))] = (hedge, hedge_trial)
+
+        pending = set(tasks)
+        last_error: UpstreamAttemptError | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                exc = task.exception()
+                if exc is None:
+                    winner = task
+                    if tasks[task][0] is not primary:
+                        upstream_stats.hedges_won += 1
+                    return task.result()
+                if not isinstance(exc, UpstreamAttemptError):
+                    raise exc
+                last_error = exc
+
+        assert last_error is not None
+        raise last_error
+    finally:
+        for task, (endpoint, endpoint_trial) in tasks.items():
+            if task is winner:
+                continue
+            if not task.done():
+                task.cancel()
+            try:
+                loser = await task
+            except BaseException:
+                pass
+            else:
+                await loser.response.aclose()
+            endpoint.release(plugin_id, endpoint_trial)
+
+
+async def open_plugin_stream(
+    client: httpx.AsyncClient,
+    service_key: str,
+    payload: dict[str, Any],
+) -> UpstreamStream:
+    """
+    Open a plugin response stream, retrying retryable failures before the first frame.
+
+    Raises NoAvailableEndpointError when no replica can be picked at all, and
+    UpstreamAttemptError with the last attempt's error once retries run out.
+    """
+    with tracer.span(
+        "upstream.connect",
+        service_key=service_key,
+        request_id=payload.get("request_id", ""),
+    ) as span:
+        stream = await _open_with_retries(client, service_key, payload)
+        span.set_attribute("url", stream.endpoint.url)
+        return stream
+
+
+async def _open_with_retries(
+    client: httpx.AsyncClient,
+    service_key: str,
+    payload: dict[str, Any],
+) -> UpstreamStream:
+    tried: list[ServiceEndpoint] = []
+    last_error: UpstreamAttemptError | None = None
+    plugin_id = payload.get("plugin_id", "")
+
+    for attempt in range(settings.plugin_stream_max_retries + 1):
+        try:
+            # Prefer replicas not tried yet; fall back to any available one.
+            endpoint = resolver.pick(service_key, exclude=tried, plugin_id=plugin_id)
+        except NoAvailableEndpointError:
+            if last_error is None:
+                raise
+            try:
+                endpoint = resolver.pick(service_key, plugin_id=plugin_id)
+            except NoAvailableEndpointError:
+                break
+
+        if attempt:
+            upstream_stats.retries += 1
+            backoff = settings.plugin_stream_retry_backoff_seconds
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.5))
+
+        tried.append(endpoint)
+        try:
+            return await _race_first_byte(client, service_key, endpoint, payload, tried)
+        except UpstreamAttemptError as exc:
+            last_error = exc
+            if not exc.retryable:
+                break
+
+    assert last_error is not None
+    raise last_error
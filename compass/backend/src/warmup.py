@@ -0,0 +1,179 @@
+"""
+Startup warm-up and readiness for Hub workers.
+
+Without it a worker starts cold: the first request builds the registry
+snapshot (hydrating the Redis cache from Databricks if it is empty), the
+first admin write imports the `databricks.sql` client and opens a
+connection, and the first chat opens fresh Redis and plugin service
+connections. The lifespan starts `hub_warmup` instead, which runs these
+steps concurrently in the background:
+
+  redis       ping the session DB                               (required)
+  registry    build the registry snapshot, after the refresher's
+              first sync when it runs                           (required)
+  databricks  open pooled connections (not for local source)    (best effort)
+  upstream    open a keep-alive connection to every replica     (best effort)
+  manifests   fetch every replica's capability manifest         (best effort)
+
+`GET /ready` answers 503 until every required step has succeeded; failed
+required steps are retried every HUB_WARMUP_RETRY_SECONDS. Best-effort steps
+run once: the registry is served from Redis without Databricks, and a down
+replica is the health monitor's business, not a reason to pull the worker.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Literal, Optional
+
+from config.service_resolver import resolver
+from config.settings import settings
+from observability.metrics import hub_warmup_seconds
+from plugin_registry.refresher import RegistryRefresher, registry_refresher
+from plugin_registry.registry import PluginRegistry, plugin_registry
+from routers import auth as auth_routes
+from upstream.client import upstream_client
+from upstream.manifests import manifest_monitor
+
+
+logger = logging.getLogger(__name__)
+
+WarmupState = Literal["pending", "ok", "failed", "skipped"]
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    required: bool
+    run: Callable[[], Awaitable[Any]]
+    state: WarmupState = "pending"
+    seconds: Optional[float] = None
+    detail: Any = None
+
+    def status(self) -> dict[str, Any]:
+        status: dict[str, Any] = {"state": self.state, "required": self.required}
+        if self.seconds is not None:
+            status["seconds"] = round(self.seconds, 4)
+        if self.detail is not None:
+            status["detail"] = self.detail
+        return status
+
+
+class HubWarmup:
+    """Owns the warm-up task started from the Hub lifespan and the readiness state."""
+
+    def __init__(
+        self,
+        registry: PluginRegistry = plugin_registry,
+        refresher: RegistryRefresher = registry_refresher,
+    ) -> None:
+        self._registry = registry
+        self._refresher = refresher
+        self._task: asyncio.Task | None = None
+        self._steps = [
+            WarmupStep("redis", True, self._warm_redis),
+            WarmupStep("registry", True, self._warm_registry),
+            WarmupStep("databricks", False, self._warm_databricks),
+            WarmupStep("upstream", False, self._warm_upstream),
+            WarmupStep("manifests", False, self._warm_manifests),
+        ]
+
+    @property
+    def ready(self) -> bool:
+        if not settings.hub_warmup_enabled:
+            return True
+        return all(step.state == "ok" for step in self._steps if step.required)
+
+    def status(self) -> dict[str, Any]:
+        if not settings.hub_warmup_enabled:
+            return {"status": "ready", "warmup": "disabled"}
+        return {
+            "status": "ready" if self.ready else "warming",
+            "steps": {step.name: step.status() for step in self._steps},
+        }
+
+    def start(self) -> None:
+        if not settings.hub_warmup_enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self.run(), name="hub-warmup")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run(self) -> None:
+        """Run every step once, then retry failed required steps until all succeed."""
+        started = time.perf_counter()
+        pending = list(self._steps)
+        while True:
+            await asyncio.gather(*(self._run_step(step) for step in pending))
+            pending = [step for step in self._steps if step.required and step.state != "ok"]
+            if not pending:
+                break
+            await asyncio.sleep(settings.hub_warmup_retry_seconds)
+
+        logger.info(
+            "Hub worker ready after %.2fs: %s",
+            time.perf_counter() - started,
+            ", ".join(f"{step.name}={step.state}" for step in self._steps),
+        )
+
+    async def _run_step(self, step: WarmupStep) -> None:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(step.run(), timeout=settings.hub_warmup_step_timeout_seconds)
+        except Exception as exc:
+            step.state = "failed"
+            step.detail = f"{type(exc).__name__}: {exc}"
+            logger.warning("Hub warm-up step %s failed: %s", step.name, step.detail)
+        else:
+            step.state = "skipped" if result is None else "ok"
+            step.detail = result
+        step.seconds = time.perf_counter() - started
+        hub_warmup_seconds.labels(step.name).set(step.seconds)
+
+    # ======================================================================
+    # STEPS (return a detail for /ready, or None when skipped)
+    # ======================================================================
+
+    async def _warm_redis(self) -> Any:
+        # Read at call time so scripts can swap the session store.
+        await asyncio.to_thread(auth_routes.session_db.ping)
+        return "pong"
+
+    async def _warm_registry(self) -> Any:
+        # The refresher's first pass hydrates an empty cache; building the
+        # snapshot before it lands would hydrate inline a second time.
+        await self._refresher.wait_first_pass()
+        snapshot = await asyncio.to_thread(self._registry.snapshot)
+        return {"plugins": len(snapshot)}
+
+    async def _warm_databricks(self) -> Any:
+        if self._registry.source == "local":
+            return None
+        opened = await asyncio.to_thread(
+            self._registry.warm_connections, settings.databricks_pool_warm_connections
+        )
+        return {"opened": opened}
+
+    async def _warm_upstream(self) -> Any:
+        endpoints = resolver.all_endpoints()
+        if not endpoints:
+            return None
+        warmed = await upstream_client.warm(endpoints)
+        return {"replicas": len(endpoints), "reachable": warmed}
+
+    async def _warm_manifests(self) -> Any:
+        if not settings.service_manifest_enabled or not resolver.all_endpoints():
+            return None
+        return await manifest_monitor.refresh_all()
+
+
+hub_warmup = HubWarmup()
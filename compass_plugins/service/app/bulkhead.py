@@ -0,0 +1,131 @@
+"""
+Per-plugin bulkheads: concurrency limits, queues and executors.
+
+Every plugin_id the service serves gets its own Bulkhead, built from the
+ExecutionProfile its handler declares:
+
+  event_loop  `run_stage` calls run inline (async I/O-only handlers)
+  thread      `run_stage` calls run in the plugin's own thread pool
+              (blocking SDK calls, light parsing)
+  process     `run_stage` calls run in the plugin's own process pool
+              (CPU-bound steps; functions and arguments must be picklable)
+
+At most `max_concurrency` requests per plugin stream at once; later ones
+wait in that plugin's queue, so a slow or CPU-heavy plugin only delays its
+own requests. A full queue or a wait past `queue_timeout_seconds` rejects
+the request as busy (retryable).
+"""
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, TypeVar
+
+from app.metrics import plugin_queue_wait_seconds, plugin_rejected_total, plugin_stage_seconds
+
+
+T = TypeVar("T")
+
+ExecutionMode = Literal["event_loop", "thread", "process"]
+
+
+@dataclass(frozen=True)
+class ExecutionProfile:
+    mode: ExecutionMode = "event_loop"
+    max_concurrency: int = 16
+    max_queue: int = 64
+    queue_timeout_seconds: float = 30.0
+
+
+class BulkheadFullError(RuntimeError):
+    """Raised when a plugin's queue is full or the wait for a slot timed out."""
+
+    def __init__(self, plugin_id: str, reason: str) -> None:
+        super().__init__(f"Plugin '{plugin_id}' is busy ({reason}).")
+        self.plugin_id = plugin_id
+        self.reason = reason
+
+
+class Bulkhead:
+    def __init__(self, plugin_id: str, profile: ExecutionProfile) -> None:
+        self.plugin_id = plugin_id
+        self.profile = profile
+        self._slots = asyncio.Semaphore(max(1, profile.max_concurrency))
+        self._executor: Executor | None = None
+        self.active = 0
+        self.waiting = 0
+
+        self._queue_wait = plugin_queue_wait_seconds.labels(plugin_id)
+        self._stage_seconds = plugin_stage_seconds.labels(plugin_id, profile.mode)
+
+    def check(self) -> None:
+        """Raise BulkheadFullError if every slot is busy and the queue is full."""
+        if self._slots.locked() and self.waiting >= self.profile.max_queue:
+            plugin_rejected_total.labels(self.plugin_id, "queue_full").inc()
+            raise BulkheadFullError(self.plugin_id, "queue_full")
+
+    async def acquire(self) -> None:
+        """Wait for a slot in this plugin's queue; raises BulkheadFullError."""
+        self.check()
+
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.profile.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            plugin_rejected_total.labels(self.plugin_id, "queue_timeout").inc()
+            raise BulkheadFullError(self.plugin_id, "queue_timeout") from None
+        finally:
+            self.waiting -= 1
+        self._queue_wait.observe(time.perf_counter() - started)
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run one handler stage where the profile says; timed per plugin and mode."""
+        started = time.perf_counter()
+        try:
+            if self.profile.mode == "event_loop":
+                return fn(*args)
+            loop = asyncio.get_running_loop()
+            if self.profile.mode == "thread":
+                # Like asyncio.to_thread: keep the request's trace span as parent.
+                call = functools.partial(contextvars.copy_context().run, fn, *args)
+                return await loop.run_in_executor(self._get_executor(), call)
+            return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args))
+        finally:
+            self._stage_seconds.observe(time.perf_counter() - started)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            workers = max(1, self.profile.max_concurrency)
+            if self.profile.mode == "process":
+                workers = min(workers, os.cpu_count() or 1)
+                # spawn: forking a process that runs the exporter and client
+                # threads can copy their locks in a held state.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=f"plugin-{self.plugin_id}"
+                )
+        return self._executor
+
+
+# Bulkhead of the plugin request being streamed; set by the dispatcher.
+current_bulkhead: ContextVar[Bulkhead | None] = ContextVar("compass_plugins_current_bulkhead", default=None)
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,9 +21,37 @@ class Settings(BaseSettings):
     databricks_vector_search_endpoint: str = ""
     databricks_vector_search_index: str = ""
     vector_search_top_k: int = 3
+    # Index columns returned with each hit (comma-separated); citations read
+    # chunk_text/text and source/document_name
+    vector_search_columns: str = "chunk_text,source"
 
     allow_mock_llm: bool = True
 
+    # Startup warm-up of the LLM and vector search clients; GET /ready is 503 until done
+    warmup_enabled: bool = True
+    warmup_prime_requests: bool = False  # also send a tiny completion and search
+    warmup_step_timeout_seconds: float = 30.0
+    warmup_retry_seconds: float = 5.0
+    # Plugin handlers loaded during warm-up instead of on their first request
+    # (comma-separated plugin_ids, or "*" for every registered plugin)
+    plugin_handlers_warm: str = ""
+
+    # Prometheus text exposition at GET /metrics (per-plugin queue and execution times)
+    metrics_enabled: bool = True
+
+    # Request tracing; sampling follows the Hub's traceparent when present
+    tracing_enabled: bool = False
+    tracing_sample_ratio: float = 0.05
+    tracing_exporter: Literal["jsonl", "otlp"] = "jsonl"
+    tracing_jsonl_path: str = "./traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_export_interval_seconds: float = 1.0
+
+    # Profiling endpoints (/debug); mounted only when enabled and a token is set
+    debug_endpoints_enabled: bool = False
+    debug_token: str = ""
+    debug_profile_max_seconds: float = 60.0
+
     model_config = SettingsConfigDict(
         env_file=Path(__file__).parent.parent.parent.parent / ".env",
         case_sensitive=False,
@@ -34,6 +63,19 @@ class Settings(BaseSettings):
     def validate_top_k(cls, value: int) -> int:
         return max(1, min(value, 20))
 
+    @field_validator("tracing_sample_ratio")
+    @classmethod
+    def clamp_sample_ratio(cls, value: float) -> float:
+        return max(0.0, min(value, 1.0))
+
+    @property
+    def warm_plugin_ids(self) -> list[str]:
+        return [plugin_id.strip() for plugin_id in self.plugin_handlers_warm.split(",") if plugin_id.strip()]
+
+    @property
+    def vector_search_column_names(self) -> list[str]:
+        return [column.strip() for column in self.vector_search_columns.split(",") if column.strip()]
+
     @property
     def has_azure_llm(self) -> bool:
         return bool(self.azure_openai_api_key and self.azure_openai_endpoint)
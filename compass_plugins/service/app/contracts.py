@@ -1,7 +1,22 @@
+import struct
 from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - v2 framing is optional
+    msgpack = None
+
+
+# Contract v1: one JSON object per line.
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Contract v2: 4-byte big-endian length prefix + MessagePack map per frame.
+MSGPACK_FRAMES_MEDIA_TYPE = "application/vnd.compass.frames+msgpack"
+SUPPORTED_CONTRACT_VERSIONS = ("v1", "v2") if msgpack is not None else ("v1",)
+
+_LENGTH_PREFIX = struct.Struct(">I")
+
 
 class ConversationMessage(BaseModel):
     role: Literal["user", "assistant", "system"]
@@ -14,7 +29,7 @@ class UserInputValue(BaseModel):
 
 
 class PluginServiceRequest(BaseModel):
-    contract_version: Literal["v1"] = "v1"
+    contract_version: Literal["v1", "v2"] = "v1"
     request_id: str
     plugin_id: str
     workspace_id: str
@@ -32,6 +47,10 @@ class BaseFrame(BaseModel):
     def serialize(self) -> str:
         return f"{self.model_dump_json()}\n"
 
+    def serialize_v2(self) -> bytes:
+        payload = msgpack.packb(self.model_dump(), use_bin_type=True)
+        return _LENGTH_PREFIX.pack(len(payload)) + payload
+
 
 class LLMFrame(BaseFrame):
     type: Literal["llm"] = "llm"
@@ -46,3 +65,12 @@ class CitationFrame(BaseFrame):
 class ErrorFrame(BaseFrame):
     type: Literal["error"] = "error"
     content: dict[str, Any] = Field(default_factory=dict)
+
+
+def wants_msgpack_frames(request: PluginServiceRequest, accept: str) -> bool:
+    """Negotiate v2 framing: the Hub asked for v2 and accepts it, and msgpack is installed."""
+    return (
+        request.contract_version == "v2"
+        and "v2" in SUPPORTED_CONTRACT_VERSIONS
+        and MSGPACK_FRAMES_MEDIA_TYPE in accept
+    )
@@ -0,0 +1,73 @@
+"""
+Token-guarded profiling endpoints (/debug).
+
+Mounted only when DEBUG_ENDPOINTS_ENABLED=true and DEBUG_TOKEN is set.
+Callers send the token in the `X-Debug-Token` header.
+"""
+
+import hmac
+import os
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.config.settings import settings
+from app.profiling import (
+    MemoryGroupBy,
+    MemoryTrackingError,
+    ProfilerBusyError,
+    ProfileSort,
+    memory_tracker,
+    profiler,
+)
+
+
+def _require_debug_token(x_debug_token: str = Header(default="")) -> None:
+    if not hmac.compare_digest(x_debug_token.encode(), settings.debug_token.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid debug token")
+
+
+debug_router = APIRouter(prefix="/debug", dependencies=[Depends(_require_debug_token)])
+
+
+@debug_router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(default=10.0, gt=0),
+    mode: Literal["sampling", "cprofile"] = "sampling",
+    interval_ms: float = Query(default=5.0, ge=1.0, le=1000.0),
+    sort: ProfileSort = "cumulative",
+    limit: int = Query(default=50, ge=1, le=500),
+) -> PlainTextResponse:
+    seconds = min(seconds, settings.debug_profile_max_seconds)
+    try:
+        if mode == "cprofile":
+            body = await profiler.cprofile(seconds, sort=sort, limit=limit)
+        else:
+            body = await profiler.sample(seconds, interval_ms / 1000)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+    return PlainTextResponse(body, headers={"X-Worker-Pid": str(os.getpid())})
+
+
+@debug_router.post("/memory/start")
+def start_memory_tracking(frames: int = Query(default=10, ge=1, le=100)) -> dict[str, Any]:
+    return {"pid": os.getpid(), **memory_tracker.start(frames)}
+
+
+@debug_router.get("/memory/diff")
+def memory_diff(
+    top: int = Query(default=25, ge=1, le=500),
+    group_by: MemoryGroupBy = "lineno",
+    reset: bool = False,
+) -> dict[str, Any]:
+    try:
+        return {"pid": os.getpid(), **memory_tracker.diff(top, group_by, reset)}
+    except MemoryTrackingError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+
+@debug_router.post("/memory/stop")
+def stop_memory_tracking() -> dict[str, Any]:
+    return {"pid": os.getpid(), **memory_tracker.stop()}
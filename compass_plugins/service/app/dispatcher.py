@@ -1,9 +1,24 @@
-from typing import AsyncGenerator
+"""
+Routes requests to plugin handlers by plugin_id.
 
+Handlers are discovered as import targets (app/plugins/discovery.py) and
+imported on the first request for one of their plugin_ids, or ahead of time
+by `warm()`. Each served plugin_id gets a bulkhead once its handler is loaded.
+"""
+
+import logging
+import threading
+import time
+from typing import AsyncGenerator, Iterable
+
+from app.bulkhead import Bulkhead, BulkheadFullError, current_bulkhead
 from app.contracts import BaseFrame, ErrorFrame, PluginServiceRequest
+from app.metrics import CallbackMetric, plugin_execution_seconds, registry as metrics_registry
 from app.plugins.base import PluginHandler
-from app.plugins.compass_assistant import CompassAssistantHandler
-from app.plugins.document_search_assistant import DocumentSearchAssistantHandler
+from app.plugins.discovery import HandlerLoadError, discover_handlers, load_handler
+
+
+logger = logging.getLogger(__name__)
 
 
 class UnknownPluginHandler(PluginHandler):
@@ -21,21 +36,202 @@ class UnknownPluginHandler(PluginHandler):
         )
 
 
+class UnavailablePluginHandler(PluginHandler):
+    """Stands in for a registered handler that failed to load."""
+
+    def __init__(self, error: str) -> None:
+        self.error = error
+
+    @property
+    def plugin_ids(self) -> set[str]:
+        return set()
+
+    async def stream(self, request: PluginServiceRequest) -> AsyncGenerator[BaseFrame, None]:
+        yield ErrorFrame(
+            content={
+                "code": "PLUGIN_UNAVAILABLE",
+                "message": f"Plugin '{request.plugin_id}' could not be loaded in this service.",
+                "retryable": False,
+                "details": {"error": self.error},
+            }
+        )
+
+
+def busy_error(exc: BulkheadFullError) -> dict:
+    return {
+        "code": "PLUGIN_BUSY",
+        "message": f"Plugin '{exc.plugin_id}' is at capacity in this service replica.",
+        "retryable": True,
+        "details": {"reason": exc.reason},
+    }
+
+
 class PluginDispatcher:
-    def __init__(self) -> None:
-        handlers: list[PluginHandler] = [
-            CompassAssistantHandler(),
-            DocumentSearchAssistantHandler(),
-        ]
-        mapping: dict[str, PluginHandler] = {}
-        for handler in handlers:
-            for plugin_id in handler.plugin_ids:
-                mapping[plugin_id] = handler
-        self._handlers = mapping
+    def __init__(
+        self,
+        handlers: list[PluginHandler] | None = None,
+        targets: dict[str, str] | None = None,
+    ) -> None:
+        """
+        `handlers` registers ready instances; otherwise `targets` (plugin_id ->
+        "module:Class", default: discovered) are loaded lazily.
+        """
+        self._targets: dict[str, str] = {}
+        self._handlers: dict[str, PluginHandler] = {}
+        self._instances: dict[str, PluginHandler] = {}  # by target; plugin_ids may share one
+        # One bulkhead per plugin_id, so plugins sharing a handler still queue separately.
+        self._bulkheads: dict[str, Bulkhead] = {}
+        self._lock = threading.Lock()
         self._unknown = UnknownPluginHandler()
+        if handlers is not None:
+            for handler in handlers:
+                for plugin_id in handler.plugin_ids:
+                    self._register(plugin_id, handler)
+        else:
+            self._targets = discover_handlers() if targets is None else dict(targets)
+
+    @property
+    def plugin_ids(self) -> set[str]:
+        """Every plugin_id this service serves, loaded or not."""
+        return set(self._targets) | set(self._handlers)
+
+    def loaded(self) -> set[str]:
+        return set(self._handlers)
 
     def resolve(self, plugin_id: str) -> PluginHandler:
-        return self._handlers.get(plugin_id, self._unknown)
+        handler = self._handlers.get(plugin_id)
+        if handler is not None:
+            return handler
+        target = self._targets.get(plugin_id)
+        if target is None:
+            return self._unknown
+        return self._load(plugin_id, target)
+
+    def manifest(self) -> dict[str, dict | None]:
+        """
+        plugin_id -> execution limits, for GET /manifest.
+
+        Limits are known once a plugin's handler is loaded; until then (and for
+        a handler that failed to load) the entry is None.
+        """
+        plugins: dict[str, dict | None] = {}
+        for plugin_id in sorted(self.plugin_ids):
+            bulkhead = self._bulkheads.get(plugin_id)
+            plugins[plugin_id] = None if bulkhead is None else {
+                "mode": bulkhead.profile.mode,
+                "max_concurrency": bulkhead.profile.max_concurrency,
+                "max_queue": bulkhead.profile.max_queue,
+            }
+        return plugins
+
+    def warm(self, plugin_ids: Iterable[str]) -> list[str]:
+        """
+        Load the handlers of `plugin_ids` now instead of on their first request.
+
+        Returns the plugin_ids loaded; raises HandlerLoadError naming the ones
+        that are not registered or failed to load.
+        """
+        failed: list[str] = []
+        warmed: list[str] = []
+        for plugin_id in plugin_ids:
+            handler = self.resolve(plugin_id)
+            if plugin_id in handler.plugin_ids:
+                warmed.append(plugin_id)
+            else:
+                failed.append(plugin_id)
+        if failed:
+            raise HandlerLoadError(f"Could not load plugin handlers for: {', '.join(sorted(failed))}")
+        return warmed
+
+    def check_capacity(self, plugin_id: str) -> None:
+        """Raise BulkheadFullError if a request for `plugin_id` would be rejected right away."""
+        bulkhead = self._bulkheads.get(plugin_id)
+        if bulkhead is not None:
+            bulkhead.check()
+
+    async def stream(self, request: PluginServiceRequest) -> AsyncGenerator[BaseFrame, None]:
+        """Stream the handler's frames once the plugin's bulkhead grants a slot."""
+        handler = self.resolve(request.plugin_id)
+        bulkhead = self._bulkheads.get(request.plugin_id)
+        if bulkhead is None:
+            async for frame in handler.stream(request):
+                yield frame
+            return
+
+        try:
+            await bulkhead.acquire()
+        except BulkheadFullError as exc:
+            yield ErrorFrame(content=busy_error(exc))
+            return
+
+        token = current_bulkhead.set(bulkhead)
+        started = time.perf_counter()
+        try:
+            async for frame in handler.stream(request):
+                yield frame
+        finally:
+            plugin_execution_seconds.labels(bulkhead.plugin_id, bulkhead.profile.mode).observe(
+                time.perf_counter() - started
+            )
+            bulkhead.release()
+            try:
+                current_bulkhead.reset(token)
+            except ValueError:
+                # Streaming generators may be closed from another context.
+                pass
+
+    def shutdown(self) -> None:
+        for bulkhead in list(self._bulkheads.values()):
+            bulkhead.shutdown()
+
+    def bulkhead_state(self) -> dict[tuple[str, str], float]:
+        state: dict[tuple[str, str], float] = {}
+        # Copied: warm() may load handlers from a worker thread meanwhile.
+        for plugin_id, bulkhead in list(self._bulkheads.items()):
+            state[(plugin_id, "active")] = bulkhead.active
+            state[(plugin_id, "waiting")] = bulkhead.waiting
+        return state
+
+    # ======================================================================
+    # PRIVATE
+    # ======================================================================
+
+    def _load(self, plugin_id: str, target: str) -> PluginHandler:
+        with self._lock:
+            handler = self._handlers.get(plugin_id)
+            if handler is not None:
+                return handler
+            handler = self._instances.get(target)
+            if handler is None:
+                started = time.perf_counter()
+                try:
+                    handler = load_handler(target)
+                except HandlerLoadError as exc:
+                    # Kept, so a broken plugin is not re-imported on every request.
+                    logger.exception("Plugin %s is unavailable", plugin_id)
+                    handler = UnavailablePluginHandler(str(exc))
+                else:
+                    logger.info("Loaded plugin handler %s in %.1f ms", target, (time.perf_counter() - started) * 1000)
+                self._instances[target] = handler
+            if not isinstance(handler, UnavailablePluginHandler) and plugin_id not in handler.plugin_ids:
+                logger.error("Plugin handler %s does not serve registered plugin %s", target, plugin_id)
+                handler = UnavailablePluginHandler(f"'{target}' does not serve plugin '{plugin_id}'")
+            self._register(plugin_id, handler)
+            return handler
+
+    def _register(self, plugin_id: str, handler: PluginHandler) -> None:
+        if plugin_id in handler.plugin_ids:
+            self._bulkheads[plugin_id] = Bulkhead(plugin_id, handler.execution_profile)
+        self._handlers[plugin_id] = handler
 
 
 dispatcher = PluginDispatcher()
+
+metrics_registry.register(
+    CallbackMetric(
+        "compass_plugins_requests",
+        "Requests per plugin holding a slot (active) or queued for one (waiting).",
+        dispatcher.bulkhead_state,
+        ("plugin_id", "state"),
+    )
+)
@@ -1,11 +1,41 @@
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from app.bulkhead import BulkheadFullError
 from app.config.settings import settings
-from app.contracts import ErrorFrame, PluginServiceRequest
-from app.dispatcher import dispatcher
+from app.contracts import (
+    MSGPACK_FRAMES_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    SUPPORTED_CONTRACT_VERSIONS,
+    ErrorFrame,
+    PluginServiceRequest,
+    wants_msgpack_frames,
+)
+from app.debug import debug_router
+from app.dispatcher import busy_error, dispatcher
+from app.metrics import registry as metrics_registry
+from app.services.llm import llm_service
+from app.tracing import tracer
+from app.warmup import service_warmup
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    service_warmup.start()
+    try:
+        yield
+    finally:
+        await service_warmup.stop()
+        dispatcher.shutdown()
+        await llm_service.aclose()
+        tracer.shutdown()
+
 
-app = FastAPI(title=settings.plugin_service_name)
+app = FastAPI(title=settings.plugin_service_name, lifespan=lifespan)
+if settings.debug_endpoints_enabled and settings.debug_token:
+    app.include_router(debug_router)
 
 
 @app.get("/")
@@ -13,22 +43,74 @@ def health() -> dict[str, str]:
     return {"status": "ok", "service": settings.plugin_service_name}
 
 
+@app.get("/ready")
+def ready() -> JSONResponse:
+    """Per-dependency warm-up state; 503 until the LLM and vector search clients are warm."""
+    return JSONResponse(service_warmup.status(), status_code=200 if service_warmup.ready else 503)
+
+
+@app.get("/manifest")
+def manifest() -> dict:
+    """What this service serves; the Hub caches it per service_key to route and size streams."""
+    features = ["bulkheads", "traceparent"]
+    if "v2" in SUPPORTED_CONTRACT_VERSIONS:
+        features.append("msgpack_frames")
+    return {
+        "service": settings.plugin_service_name,
+        "contract_versions": list(SUPPORTED_CONTRACT_VERSIONS),
+        "features": features,
+        "plugins": dispatcher.manifest(),
+    }
+
+
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> PlainTextResponse:
+        return PlainTextResponse(
+            metrics_registry.render(),
+            media_type="text/plain; version=0.0.4",
+        )
+
+
 @app.post("/plugin/response")
-async def plugin_response(request: PluginServiceRequest):
-    handler = dispatcher.resolve(request.plugin_id)
+async def plugin_response(
+    request: PluginServiceRequest,
+    accept: str = Header(default=NDJSON_MEDIA_TYPE),
+    traceparent: str | None = Header(default=None),
+):
+    try:
+        dispatcher.check_capacity(request.plugin_id)
+    except BulkheadFullError as exc:
+        # Rejected before streaming, so the Hub retries another replica.
+        return JSONResponse(busy_error(exc), status_code=503)
+
+    use_v2 = wants_msgpack_frames(request, accept)
 
     async def stream():
-        try:
-            async for frame in handler.stream(request):
-                yield frame.serialize()
-        except Exception as exc:  # pragma: no cover - defensive fallback
-            yield ErrorFrame(
-                content={
-                    "code": "UNHANDLED_PLUGIN_SERVICE_ERROR",
-                    "message": "Plugin service failed unexpectedly.",
-                    "retryable": False,
-                    "details": {"error": str(exc)},
-                }
-            ).serialize()
-
-    return StreamingResponse(stream(), media_type="application/x-ndjson")
+        with tracer.span(
+            "plugin.response",
+            traceparent=traceparent,
+            request_id=request.request_id,
+            plugin_id=request.plugin_id,
+        ) as span:
+            frame_count = 0
+            try:
+                async for frame in dispatcher.stream(request):
+                    frame_count += 1
+                    yield frame.serialize_v2() if use_v2 else frame.serialize()
+            except Exception as exc:  # pragma: no cover - defensive fallback
+                span.set_error(str(exc))
+                error_frame = ErrorFrame(
+                    content={
+                        "code": "UNHANDLED_PLUGIN_SERVICE_ERROR",
+                        "message": "Plugin service failed unexpectedly.",
+                        "retryable": False,
+                        "details": {"error": str(exc)},
+                    }
+                )
+                yield error_frame.serialize_v2() if use_v2 else error_frame.serialize()
+            span.set_attribute("frames", frame_count)
+
+    media_type = MSGPACK_FRAMES_MEDIA_TYPE if use_v2 else NDJSON_MEDIA_TYPE
+    return StreamingResponse(stream(), media_type=media_type)
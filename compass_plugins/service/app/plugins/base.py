@@ -1,12 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Callable, TypeVar
 
+from app.bulkhead import ExecutionProfile, current_bulkhead
 from app.contracts import BaseFrame, PluginServiceRequest
 
 
+T = TypeVar("T")
+
+
 class PluginHandler(ABC):
     """Base plugin handler interface."""
 
+    # Where run_stage() calls run and how many requests per plugin_id may
+    # stream at once; enforced by the dispatcher (see app/bulkhead.py).
+    execution_profile = ExecutionProfile()
+
     @property
     @abstractmethod
     def plugin_ids(self) -> set[str]:
@@ -15,3 +23,11 @@ class PluginHandler(ABC):
     @abstractmethod
     async def stream(self, request: PluginServiceRequest) -> AsyncGenerator[BaseFrame, None]:
         raise NotImplementedError
+
+    async def run_stage(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a blocking or CPU-bound step of `stream` per the execution profile."""
+        bulkhead = current_bulkhead.get()
+        if bulkhead is None:
+            # Outside the dispatcher (scripts, direct calls): run inline.
+            return fn(*args)
+        return await bulkhead.run(fn, *args)
@@ -1,11 +1,14 @@
 from typing import AsyncGenerator
 
 from app.contracts import BaseFrame, ErrorFrame, LLMFrame, PluginServiceRequest
-from app.plugins.base import PluginHandler
+from app.plugins.base import ExecutionProfile, PluginHandler
 from app.services.llm import llm_service
 
 
 class CompassAssistantHandler(PluginHandler):
+    # Async LLM streaming only; nothing to offload.
+    execution_profile = ExecutionProfile(mode="event_loop", max_concurrency=32)
+
     @property
     def plugin_ids(self) -> set[str]:
         return {"compass_assistant"}
@@ -0,0 +1,63 @@
+"""
+Plugin handler discovery without importing the handlers.
+
+Handlers are registered by plugin_id as "module:Class" targets:
+
+  built-in      BUILTIN_HANDLERS below
+  entry points  the `compass_plugins.handlers` group of installed packages,
+                one entry per plugin_id, e.g. in the package's pyproject.toml:
+
+                  [project.entry-points."compass_plugins.handlers"]
+                  my_plugin = "my_package.handler:MyPluginHandler"
+
+An entry point replaces a built-in target of the same plugin_id. The
+dispatcher imports and instantiates a handler on the first request for one
+of its plugin_ids (or at startup, see PLUGIN_HANDLERS_WARM), so a replica
+only pays for the plugins it actually serves.
+"""
+
+import importlib
+import logging
+from importlib.metadata import entry_points
+
+from app.plugins.base import PluginHandler
+
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "compass_plugins.handlers"
+
+BUILTIN_HANDLERS: dict[str, str] = {
+    "compass_assistant": "app.plugins.compass_assistant:CompassAssistantHandler",
+    "dscoe_search_assistant": "app.plugins.document_search_assistant:DocumentSearchAssistantHandler",
+    "document_search_assistant": "app.plugins.document_search_assistant:DocumentSearchAssistantHandler",
+}
+
+
+class HandlerLoadError(RuntimeError):
+    """Raised when a handler target cannot be imported or instantiated."""
+
+
+def discover_handlers() -> dict[str, str]:
+    """plugin_id -> handler target, from the built-ins and installed entry points."""
+    targets = dict(BUILTIN_HANDLERS)
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name in targets and targets[entry_point.name] != entry_point.value:
+            logger.info("Plugin %s: entry point %s replaces %s", entry_point.name, entry_point.value, targets[entry_point.name])
+        targets[entry_point.name] = entry_point.value
+    return targets
+
+
+def load_handler(target: str) -> PluginHandler:
+    """Import `module:Class` and instantiate it; raises HandlerLoadError."""
+    module_name, _, attribute = target.partition(":")
+    try:
+        value = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            value = getattr(value, part)
+        handler = value()
+    except Exception as exc:
+        raise HandlerLoadError(f"Could not load plugin handler '{target}': {exc}") from exc
+    if not isinstance(handler, PluginHandler):
+        raise HandlerLoadError(f"Plugin handler '{target}' is not a PluginHandler.")
+    return handler
@@ -1,7 +1,7 @@
 from typing import AsyncGenerator
 
 from app.contracts import BaseFrame, CitationFrame, ErrorFrame, LLMFrame, PluginServiceRequest
-from app.plugins.base import PluginHandler
+from app.plugins.base import ExecutionProfile, PluginHandler
 from app.services.llm import llm_service
 from app.services.vector_search import vector_search_service
 
@@ -24,6 +24,9 @@ def _build_context_block(citations: list[dict]) -> str:
 
 
 class DocumentSearchAssistantHandler(PluginHandler):
+    # The vector search client is blocking; its calls go to this plugin's threads.
+    execution_profile = ExecutionProfile(mode="thread", max_concurrency=8)
+
     @property
     def plugin_ids(self) -> set[str]:
         return {"dscoe_search_assistant", "document_search_assistant"}
@@ -37,7 +40,7 @@ class DocumentSearchAssistantHandler(PluginHandler):
             messages = seed_messages + messages
 
         user_prompt = messages[-1]["content"] if messages else ""
-        citations = vector_search_service.search(query=user_prompt, plugin_id=request.plugin_id)
+        citations = await self.run_stage(vector_search_service.search, user_prompt, request.plugin_id)
 
         # Inject retrieved context as a system message for better grounding.
         context_block = _build_context_block(citations)
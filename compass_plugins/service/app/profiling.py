@@ -0,0 +1,196 @@
+"""
+On-demand CPU profiling and memory snapshots for the plugin service.
+
+Mirrors the Hub's observability/profiling.py. Nothing runs until a debug
+endpoint is called: the sampler thread lives only for one profile and
+tracemalloc is only started on request.
+"""
+
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Iterator, Literal
+
+
+ProfileSort = Literal["cumulative", "tottime", "calls"]
+MemoryGroupBy = Literal["lineno", "traceback", "filename"]
+
+_MAX_STACK_DEPTH = 128
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+class MemoryTrackingError(RuntimeError):
+    """Raised when a memory diff is requested before tracking was started."""
+
+
+# ==========================================================================
+# CPU
+# ==========================================================================
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{module}:{code.co_name}"
+
+
+def _collapse(frame, thread_name: str) -> str:
+    labels: list[str] = []
+    while frame is not None and len(labels) < _MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+def sample_stacks(seconds: float, interval_seconds: float) -> Counter[str]:
+    """Sample every thread's stack for `seconds`; blocks the calling thread."""
+    own_id = threading.get_ident()
+    stacks: Counter[str] = Counter()
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stacks[_collapse(frame, names.get(thread_id, f"thread-{thread_id}"))] += 1
+        time.sleep(interval_seconds)
+
+    return stacks
+
+
+def format_collapsed(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class Profiler:
+    """Runs at most one time-boxed profile per worker at a time."""
+
+    def __init__(self) -> None:
+        self._busy = False
+
+    async def sample(self, seconds: float, interval_seconds: float) -> str:
+        with self._claim():
+            stacks = await asyncio.to_thread(sample_stacks, seconds, interval_seconds)
+        return format_collapsed(stacks)
+
+    async def cprofile(self, seconds: float, sort: ProfileSort = "cumulative", limit: int = 50) -> str:
+        with self._claim():
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as exc:
+                # Another profiler (e.g. a debugger or coverage) owns the hook.
+                raise ProfilerBusyError(str(exc)) from exc
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+
+        output = io.StringIO()
+        stats = pstats.Stats(profile, stream=output)
+        stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    @contextmanager
+    def _claim(self) -> Iterator[None]:
+        if self._busy:
+            raise ProfilerBusyError("A profile is already running in this worker.")
+        self._busy = True
+        try:
+            yield
+        finally:
+            self._busy = False
+
+
+# ==========================================================================
+# Memory
+# ==========================================================================
+
+
+class MemoryTracker:
+    """tracemalloc baseline/diff; tracing is only active between start and stop."""
+
+    def __init__(self) -> None:
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._started_here = False
+
+    @property
+    def active(self) -> bool:
+        return tracemalloc.is_tracing() and self._baseline is not None
+
+    def start(self, frames: int = 10) -> dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_here = True
+        self._baseline = self._snapshot()
+        return self.status()
+
+    def diff(self, top: int = 25, group_by: MemoryGroupBy = "lineno", reset: bool = False) -> dict[str, Any]:
+        if not self.active:
+            raise MemoryTrackingError("Memory tracking is not started; call start first.")
+
+        assert self._baseline is not None
+        current = self._snapshot()
+        stats = current.compare_to(self._baseline, group_by)
+        if reset:
+            self._baseline = current
+
+        return {
+            **self.status(),
+            "group_by": group_by,
+            "top": [
+                {
+                    "location": [str(frame) for frame in stat.traceback.format()]
+                    if group_by == "traceback"
+                    else str(stat.traceback),
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                }
+                for stat in stats[:top]
+            ],
+        }
+
+    def stop(self) -> dict[str, Any]:
+        self._baseline = None
+        if self._started_here and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_here = False
+        return self.status()
+
+    def status(self) -> dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+        }
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+
+
+profiler = Profiler()
+memory_tracker = MemoryTracker()
@@ -1,6 +1,8 @@
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator
 
 from app.config.settings import settings
+from app.tracing import tracer
 
 
 def _build_prompt(conversation: list[dict[str, str]], instructions: str) -> list[dict[str, str]]:
@@ -37,10 +39,52 @@ class LLMService:
                     azure_endpoint=settings.azure_openai_endpoint,
                 )
 
+    async def warm(self, prime: bool = False) -> dict[str, Any] | None:
+        """
+        Open a pooled connection to Azure OpenAI and check the credentials.
+
+        With `prime`, also send a one-token completion so a missing
+        deployment shows up here instead of on the first user request.
+        Returns None when the mock fallback is used.
+        """
+        if self._client is None:
+            if settings.allow_mock_llm:
+                return None
+            raise RuntimeError("No LLM provider configured and ALLOW_MOCK_LLM=false.")
+
+        await self._client.models.list()
+        if prime:
+            await self._client.chat.completions.create(
+                model=settings.azure_openai_model,
+                messages=[{"role": "user", "content": "ping"}],
+                max_tokens=1,
+            )
+        return {"provider": "azure", "model": settings.azure_openai_model, "primed": prime}
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+
     async def stream_chat(
         self,
         conversation: list[dict[str, str]],
         instructions: str = "",
+    ) -> AsyncGenerator[str, None]:
+        provider = "azure" if self._client is not None else "mock"
+        with tracer.span("llm.stream", provider=provider) as span:
+            started = time.perf_counter()
+            chunks = 0
+            async for text in self._stream_provider(conversation, instructions):
+                if chunks == 0:
+                    span.set_attribute("ttft_ms", round((time.perf_counter() - started) * 1000, 3))
+                chunks += 1
+                yield text
+            span.set_attribute("chunks", chunks)
+
+    async def _stream_provider(
+        self,
+        conversation: list[dict[str, str]],
+        instructions: str,
     ) -> AsyncGenerator[str, None]:
         messages = _build_prompt(conversation, instructions)
 
@@ -1,6 +1,8 @@
+import threading
 from typing import Any
 
 from app.config.settings import settings
+from app.tracing import tracer
 
 
 def _safe_preview(text: str, limit: int = 180) -> str:
@@ -25,7 +27,10 @@ def _extract_rows(raw_result: Any) -> list[dict[str, Any]]:
     if isinstance(raw_result.get("result"), dict):
         result = raw_result["result"]
         if isinstance(result.get("data_array"), list):
-            columns = result.get("manifest", {}).get("columns", [])
+            # The query API sends the manifest next to `result`; older
+            # responses nested it inside.
+            manifest = raw_result.get("manifest") or result.get("manifest") or {}
+            columns = manifest.get("columns", [])
             column_names = [col.get("name") for col in columns if isinstance(col, dict)]
             rows: list[dict[str, Any]] = []
             for values in result["data_array"]:
@@ -43,11 +48,26 @@ def _extract_rows(raw_result: Any) -> list[dict[str, Any]]:
     return []
 
 
+def _similarity_search(index: Any, query: str, num_results: int, filters: dict[str, Any] | None = None) -> Any:
+    """One `similarity_search` call shape for searches and warm-up priming."""
+    return index.similarity_search(
+        columns=settings.vector_search_column_names,
+        query_text=query,
+        filters=filters,
+        num_results=num_results,
+        disable_notice=True,
+    )
+
+
 class VectorSearchService:
     """Databricks Vector Search adapter used by search-oriented plugins."""
 
     def __init__(self) -> None:
         self._client = None
+        # `get_index` is a REST round trip; the handle is resolved once and
+        # reused until a search on it fails.
+        self._index = None
+        self._index_lock = threading.Lock()
         if settings.has_vector_search:
             try:
                 from databricks.vector_search.client import VectorSearchClient
@@ -57,6 +77,7 @@ class VectorSearchService:
                 self._client = VectorSearchClient(
                     workspace_url=settings.databricks_host,
                     personal_access_token=settings.databricks_token,
+                    disable_notice=True,
                 )
 
     @property
@@ -64,24 +85,59 @@ class VectorSearchService:
         return self._client is not None and settings.has_vector_search
 
     def search(self, query: str, plugin_id: str) -> list[dict[str, Any]]:
+        with tracer.span("vector_search", plugin_id=plugin_id, top_k=settings.vector_search_top_k) as span:
+            citations = self._search(query, plugin_id)
+            span.set_attribute("results", len(citations))
+            return citations
+
+    def warm(self, prime: bool = False) -> dict[str, Any] | None:
+        """
+        Resolve the index handle and check that the index is online.
+
+        With `prime`, also run a one-result search so the first user query
+        does not pay for a cold index. Returns None when not configured.
+        """
+        if not self.is_configured:
+            return None
+
+        index = self._get_index()
+        status = index.describe().get("status", {})
+        if status.get("ready") is False:
+            raise RuntimeError(
+                f"Vector index {settings.databricks_vector_search_index} is not ready: "
+                f"{status.get('message') or status.get('detailed_state')}"
+            )
+        if prime:
+            # Same call as `_search`, which swallows errors; here they surface.
+            _similarity_search(index, "warm-up", num_results=1)
+        return {"index": settings.databricks_vector_search_index, "state": status.get("detailed_state")}
+
+    def _get_index(self) -> Any:
+        with self._index_lock:
+            if self._index is None:
+                self._index = self._client.get_index(
+                    endpoint_name=settings.databricks_vector_search_endpoint,
+                    index_name=settings.databricks_vector_search_index,
+                )
+            return self._index
+
+    def _search(self, query: str, plugin_id: str) -> list[dict[str, Any]]:
         if not self.is_configured:
             return []
 
         try:
-            index = self._client.get_index(
-                endpoint_name=settings.databricks_vector_search_endpoint,
-                index_name=settings.databricks_vector_search_index,
-            )
+            index = self._get_index()
 
-            # API signature differs by SDK versions; use keyword style that is
-            # compatible with current releases and fail gracefully if mismatched.
-            raw = index.similarity_search(
-                query_text=query,
+            raw = _similarity_search(
+                index,
+                query,
                 num_results=settings.vector_search_top_k,
                 filters={"plugin_id": plugin_id},
             )
             rows = _extract_rows(raw)
         except Exception:
+            # Resolve the handle again next time, e.g. after the index was recreated.
+            self._index = None
             return []
 
         citations: list[dict[str, Any]] = []
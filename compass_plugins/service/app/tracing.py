@@ -0,0 +1,277 @@
+"""
+Request tracing for the plugin service.
+
+Continues the Hub's W3C `traceparent` so plugin spans (vector search, LLM
+time-to-first-token) land in the same trace as the Hub's upstream call. The
+sampling decision comes from the incoming header; requests without one are
+sampled locally at TRACING_SAMPLE_RATIO. Spans are exported off the event
+loop by a daemon thread, as JSONL or OTLP/HTTP JSON.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.config.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or parts[0] != "00" or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        sampled = bool(int(parts[3], 16) & 0x01)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class NonRecordingSpan:
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+_NOOP_SPAN = NonRecordingSpan()
+
+
+class Span:
+    recording = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict[str, Any]) -> None:
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.error: str | None = None
+        self._start_ns = time.time_ns()
+        self._ended = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def end(self) -> None:
+        if self._ended:
+            return
+        self._ended = True
+        end_ns = time.time_ns()
+        tracer.export(
+            {
+                "service": settings.plugin_service_name,
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start_unix_nano": self._start_ns,
+                "end_unix_nano": end_ns,
+                "duration_ms": round((end_ns - self._start_ns) / 1_000_000, 3),
+                "attributes": self.attributes,
+                "status": "error" if self.error else "ok",
+                "error": self.error,
+            }
+        )
+
+
+_current_span: ContextVar[Span | NonRecordingSpan | None] = ContextVar(
+    "compass_plugins_current_span", default=None
+)
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _to_otlp(spans: list[dict[str, Any]]) -> dict[str, Any]:
+    otlp_spans = []
+    for span in spans:
+        otlp_span = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 2,
+            "startTimeUnixNano": str(span["start_unix_nano"]),
+            "endTimeUnixNano": str(span["end_unix_nano"]),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span["attributes"].items()],
+            "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1},
+        }
+        if span["parent_id"]:
+            otlp_span["parentSpanId"] = span["parent_id"]
+        otlp_spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": settings.plugin_service_name}}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": "compass.tracing"}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+class _SpanExporter(ABC):
+    """Drains finished spans on a daemon thread so the event loop never blocks on I/O."""
+
+    def __init__(self) -> None:
+        self._queue: queue.SimpleQueue[dict[str, Any]] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def submit(self, span: dict[str, Any]) -> None:
+        self._queue.put(span)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+
+    def flush(self) -> None:
+        batch: list[dict[str, Any]] = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        try:
+            self._write(batch)
+        except Exception:
+            logger.exception("Dropped %d spans: export failed", len(batch))
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(settings.tracing_export_interval_seconds):
+            self.flush()
+
+    @abstractmethod
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        """Export one batch; called on the exporter thread, exceptions drop the batch."""
+
+
+class _JsonlSpanExporter(_SpanExporter):
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        self._path = path
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        with self._lock, self._path.open("a", encoding="utf-8") as handle:
+            handle.writelines(json.dumps(span, default=str) + "\n" for span in batch)
+
+
+class _OtlpHttpSpanExporter(_SpanExporter):
+    def __init__(self, endpoint: str) -> None:
+        super().__init__()
+        self._endpoint = endpoint
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        request = urllib.request.Request(
+            self._endpoint,
+            data=json.dumps(_to_otlp(batch)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=5.0):
+            return
+
+
+def _build_exporter() -> _SpanExporter:
+    if settings.tracing_exporter == "otlp":
+        return _OtlpHttpSpanExporter(settings.tracing_otlp_endpoint)
+    return _JsonlSpanExporter(Path(settings.tracing_jsonl_path).expanduser())
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.enabled = settings.tracing_enabled
+        self._exporter = _build_exporter() if self.enabled else None
+
+    def start_span(self, name: str, traceparent: str | None = None, **attributes: Any) -> Span | NonRecordingSpan:
+        if not self.enabled:
+            return _NOOP_SPAN
+
+        parent = _current_span.get()
+        if parent is not None:
+            if not parent.recording:
+                return parent
+            return Span(name, parent.trace_id, parent.span_id, attributes)
+
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            sampled = random.random() < settings.tracing_sample_ratio
+        return Span(name, trace_id, parent_id, attributes) if sampled else _NOOP_SPAN
+
+    @contextmanager
+    def span(self, name: str, traceparent: str | None = None, **attributes: Any) -> Iterator[Span | NonRecordingSpan]:
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        span = self.start_span(name, traceparent=traceparent, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.set_error(f"{type(exc).__name__}: {exc}")
+            raise
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Streaming generators may be closed from another context.
+                pass
+            span.end()
+
+    def export(self, span: dict[str, Any]) -> None:
+        if self._exporter is not None:
+            self._exporter.submit(span)
+
+    def shutdown(self) -> None:
+        if self._exporter is not None:
+            self._exporter.shutdown()
+
+
+tracer = Tracer()
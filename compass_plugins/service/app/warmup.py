@@ -0,0 +1,125 @@
+"""
+Startup warm-up of the service's external clients, reported on GET /ready.
+
+`llm_service` and `vector_search_service` are built at import without
+touching the network, so bad credentials, a missing index or slow DNS used
+to surface on the first user request. The lifespan starts `service_warmup`,
+which checks each configured dependency in the background:
+
+  llm            list models (opens a pooled connection, checks the key)
+  vector_search  resolve the index handle, check the index is ready
+  handlers       import the plugin handlers listed in PLUGIN_HANDLERS_WARM
+
+With WARMUP_PRIME_REQUESTS=true each step also sends a minimal real request
+(one-token completion, one-result search). Unconfigured dependencies are
+"skipped". Failed steps are retried every WARMUP_RETRY_SECONDS; /ready
+answers 503 until none is left failing, so the Hub's health probe and
+rolling deploys keep traffic off a cold replica.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from app.config.settings import settings
+from app.dispatcher import dispatcher
+from app.services.llm import llm_service
+from app.services.vector_search import vector_search_service
+
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_handlers() -> list[str] | None:
+    plugin_ids = settings.warm_plugin_ids
+    if not plugin_ids:
+        return None
+    if "*" in plugin_ids:
+        plugin_ids = sorted(dispatcher.plugin_ids)
+    return dispatcher.warm(plugin_ids)
+
+
+class DependencyWarmup:
+    """Warm-up state of one dependency."""
+
+    def __init__(self, name: str, run: Callable[[], Awaitable[Any]]) -> None:
+        self.name = name
+        self.state = "pending"  # pending | ok | failed | skipped
+        self.seconds: float | None = None
+        self.detail: Any = None
+        self._run = run
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._run(), timeout=settings.warmup_step_timeout_seconds)
+        except Exception as exc:
+            self.state = "failed"
+            self.detail = f"{type(exc).__name__}: {exc}"
+            logger.warning("Warm-up of %s failed: %s", self.name, self.detail)
+        else:
+            self.state = "skipped" if result is None else "ok"
+            self.detail = result
+        self.seconds = time.perf_counter() - started
+
+    def status(self) -> dict[str, Any]:
+        status: dict[str, Any] = {"state": self.state}
+        if self.seconds is not None:
+            status["seconds"] = round(self.seconds, 4)
+        if self.detail is not None:
+            status["detail"] = self.detail
+        return status
+
+
+class ServiceWarmup:
+    def __init__(self) -> None:
+        prime = settings.warmup_prime_requests
+        self._dependencies = [
+            DependencyWarmup("llm", lambda: llm_service.warm(prime)),
+            DependencyWarmup("vector_search", lambda: asyncio.to_thread(vector_search_service.warm, prime)),
+            DependencyWarmup("handlers", lambda: asyncio.to_thread(_warm_handlers)),
+        ]
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        if not settings.warmup_enabled:
+            return True
+        return all(dependency.state in {"ok", "skipped"} for dependency in self._dependencies)
+
+    def status(self) -> dict[str, Any]:
+        if not settings.warmup_enabled:
+            return {"status": "ready", "warmup": "disabled"}
+        return {
+            "status": "ready" if self.ready else "warming",
+            "dependencies": {dependency.name: dependency.status() for dependency in self._dependencies},
+        }
+
+    def start(self) -> None:
+        if settings.warmup_enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="service-warmup")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        started = time.perf_counter()
+        pending = self._dependencies
+        while True:
+            await asyncio.gather(*(dependency.run() for dependency in pending))
+            pending = [dependency for dependency in self._dependencies if dependency.state == "failed"]
+            if not pending:
+                break
+            await asyncio.sleep(settings.warmup_retry_seconds)
+        logger.info("Plugin service ready after %.2fs", time.perf_counter() - started)
+
+
+service_warmup = ServiceWarmup()